@@ -9,14 +9,20 @@ DEPENDENCIES:
     - Python 2.7
 """
 
+import multiprocessing
 import sys
-from bin.ui.ui import start
 
 __author__ = 'Pedro HC David, https://github.com/Kronopt'
 __credits__ = ['Pedro HC David']
 
-# log errors
-sys.stderr = open('errorlog.txt', 'a')
+if __name__ == "__main__":
+    # background simulation workers are started as new processes (which import this module) in Windows, so the UI is
+    # only imported here: a worker importing it would open another window
+    multiprocessing.freeze_support()
+    from bin.ui.ui import start
 
-# run App
-start()
+    # log errors
+    sys.stderr = open('errorlog.txt', 'a')
+
+    # run App
+    start()
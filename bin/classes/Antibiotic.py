@@ -34,7 +34,7 @@ class Antibiotic(object):
         self._id = 'ant' + str(Antibiotic._total_antibiotics)  # str
         self._name = name  # str
         self._line_color = hsv_to_rgb(*NewColor.new_color())  # (R,G,B)
-        self._plot = SmoothLinePlot(points=[(0, 0)], color=self._line_color, line_width=1.01)  # SmoothLinePlot
+        self._plot = None  # SmoothLinePlot, created by get_plot()
 
         Antibiotic._total_antibiotics += 1
 
@@ -77,9 +77,17 @@ class Antibiotic(object):
 
     def get_plot(self):
         """
-        Gets antibiotic plot
+        Gets antibiotic plot, creating it if it does not exist (see release_plot())
 
         RETURNS: SmoothLinePlot
             Antibiotic Plot
         """
+        if self._plot is None:
+            self._plot = SmoothLinePlot(points=[(0, 0)], color=self._line_color, line_width=1.01)
         return self._plot
+
+    def release_plot(self):
+        """
+        Discards the antibiotic plot (a new one is created by the next call to get_plot())
+        """
+        self._plot = None
@@ -9,9 +9,9 @@ DEPENDENCIES:
     - Python 2.7
 """
 
-from kivy.clock import Clock
+from bin.classes.AxisManager import AxisManager
 from bin.deps.kivy_graph import Graph
-from bin.functions.graphs import xy_max_resize
+from bin.functions.graphs import release_trajectory_plots, trajectory_plots
 
 __author__ = 'Pedro HC David, https://github.com/Kronopt'
 __credits__ = ['Pedro HC David']
@@ -33,35 +33,101 @@ class AntibioticAssortment(object):
             graph_y_axis : str
                 Y-axis label id in the language dict
         """
-        self._graph_widget =\
-            Graph(xlabel=language["graph_x_axis"], ylabel=language[graph_y_axis],
-                  xmin=0, xmax=10, x_ticks_major=1, x_ticks_minor=4, x_grid_label=True,
-                  ymin=0, ymax=20, y_ticks_major=4, y_ticks_minor=5, y_grid_label=True,
-                  padding=5, **{'background_color': (0.15, 0.15, 0.15),
-                                'border_color': (0.17, 0.17, 0.17),
-                                'tick_color': (0.5, 0.5, 0.5)})  # Graph
-
         self._antibiotics = antibiotics  # dict[Antibiotic]
+        self._labels = {"xlabel": language["graph_x_axis"],
+                        "ylabel": language[graph_y_axis]}  # dict[str], graph widget labels (see set_labels())
+        self._trajectory = None  # Trajectory, whose columns the antibiotic plots are views of (see set_trajectory())
+        self._series = {}  # dict[str], {antibiotic name: trajectory series, ...}
 
-        # scheduled function calls (clocks) must be strong referenced, otherwise will not work
-        self._clocks = []  # list[Clock]
-        for _antibiotic in self._antibiotics.itervalues():
-            self._clocks.append(
-                Clock.schedule_interval(
-                    xy_max_resize(_antibiotic.get_plot(), self._graph_widget), 1/60.))
-
-            # add each antibiotic plot to the main graph
-            self._graph_widget.add_plot(_antibiotic.get_plot())
+        # graph widget and plots are only created when shown (see get_graph_widget())
+        self._graph_widget = None  # Graph
+        self._axis_manager = None  # AxisManager
 
     def get_graph_widget(self):
         """
-        Gets the Antibiotic Assortment graph widget
+        Gets the Antibiotic Assortment graph widget, creating it (and the antibiotic plots) if it does not exist (see
+        release())
 
         RETURNS: Graph
             Antibiotic Assortment graph widget
         """
+        if self._graph_widget is None:
+            self._graph_widget =\
+                Graph(xmin=0, xmax=10, x_ticks_major=1, x_ticks_minor=4, x_grid_label=True,
+                      ymin=0, ymax=20, y_ticks_major=4, y_ticks_minor=5, y_grid_label=True,
+                      padding=5, background_color=(0.15, 0.15, 0.15), border_color=(0.17, 0.17, 0.17),
+                      tick_color=(0.5, 0.5, 0.5), **self._labels)  # Graph
+
+            # resizes the graph axis as points are added to the plots
+            self._axis_manager = AxisManager(self._graph_widget)
+            for _antibiotic in self._antibiotics.itervalues():
+                self._axis_manager.watch(_antibiotic.get_plot())
+
+                # add each antibiotic plot to the main graph
+                self._graph_widget.add_plot(_antibiotic.get_plot())
+
+            if self._trajectory is not None:
+                self.set_trajectory(self._trajectory, self._series)
+
         return self._graph_widget
 
+    def has_graph_widget(self):
+        """
+        Checks whether the graph widget exists (without creating it)
+
+        RETURNS: bool
+            True if the graph widget exists
+        """
+        return self._graph_widget is not None
+
+    def release(self):
+        """
+        Discards the graph widget and the antibiotic plots, while the assortment is not shown (they are created again,
+        from the trajectory, by the next call to get_graph_widget())
+        """
+        if self._graph_widget is None:
+            return
+
+        if self._graph_widget.parent is not None:
+            self._graph_widget.parent.remove_widget(self._graph_widget)
+        if self._trajectory is not None:
+            release_trajectory_plots(self._trajectory,
+                                     [_antibiotic.get_plot() for _antibiotic in self._antibiotics.itervalues()])
+        for _antibiotic in self._antibiotics.itervalues():
+            _antibiotic.release_plot()
+
+        self._graph_widget = None
+        self._axis_manager = None
+
+    def set_trajectory(self, trajectory, series):
+        """
+        Makes the antibiotic plots views of the columns of a trajectory (see graphs.trajectory_plots())
+
+        PARAMETERS:
+            trajectory : Trajectory
+                Trajectory of the simulation runs
+            series : dict[str]
+                {antibiotic name: trajectory series, ...}
+        """
+        self._trajectory = trajectory
+        self._series = series
+        if self._graph_widget is not None:
+            trajectory_plots(trajectory, dict((series[name], _antibiotic.get_plot())
+                                              for name, _antibiotic in self._antibiotics.iteritems()))
+
+    def set_labels(self, **labels):
+        """
+        Sets graph widget labels (kept when the graph widget is released)
+
+        PARAMETERS:
+            labels : str
+                xlabel and/or ylabel
+        """
+        self._labels.update(labels)
+        if self._graph_widget is not None:
+            for label, text in labels.iteritems():
+                setattr(self._graph_widget, label, text)
+
     def get_antibiotics(self):
         """
         Gets antibiotics belonging to this antibiotic assortment
@@ -71,10 +137,11 @@ class AntibioticAssortment(object):
         """
         return self._antibiotics
 
-    def get_clocks(self):
+    def get_axis_manager(self):
         """
-        Gets scheduled function calls to xy_max_resize() of every plot
-        
-        RETURNS: list[Clock]
+        Gets the axis manager of the Antibiotic Assortment graph widget
+
+        RETURNS: AxisManager
+            Axis manager of the graph widget (None while the graph widget does not exist)
         """
-        return self._clocks
+        return self._axis_manager
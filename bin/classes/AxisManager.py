@@ -0,0 +1,144 @@
+#!python2
+# coding: utf-8
+
+"""
+AXIS MANAGER
+Class that resizes the axis of a graph as points are added to its plots
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+from math import ceil, isinf, isnan, log10
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# growth of each resize step: xmax grows 10 at a time (one more major tick), linear ymax grows 20 at a time (four
+# more major ticks) and log ymax grows one decade at a time
+X_STEP = 10
+X_TICKS_STEP = 1
+Y_LINEAR_STEP = 20
+Y_LINEAR_TICKS_STEP = 4
+Y_LOG_STEP = 10
+
+
+def _finite_max(values):
+    # maximum of values, ignoring infinite and nan values (None if there are none)
+    maximum = max(values) if values else None
+    if maximum is not None and (isinf(maximum) or isnan(maximum)):
+        values = [value for value in values if not (isinf(value) or isnan(value))]
+        maximum = max(values) if values else None
+    return maximum
+
+
+class AxisManager(object):
+    """
+    Resizes the x and y axis of a graph whenever points are added to (or removed from) one of its watched plots, to
+    the smallest size that fits every point, in a single step
+    Keeps the running maxima of each plot, so that only new points are looked at, and does nothing while no points
+    are added
+    The x-axis represents time and is always linear
+    """
+    def __init__(self, graph_widget, axis_type="linear"):
+        """
+        Instantiates axis manager, the current axis of the graph being its minimum size
+
+        PARAMETERS:
+            graph_widget : Graph
+                Graph to be resized
+            axis_type : str
+                Y-axis type, "linear" or "log" (defaults to "linear")
+        """
+        self._graph_widget = graph_widget  # Graph
+        self._axis_type = axis_type  # str
+        self._xmax = graph_widget.xmax  # float
+        self._x_ticks_major = graph_widget.x_ticks_major  # float
+        self._ymax = graph_widget.ymax  # float
+        self._y_ticks_major = graph_widget.y_ticks_major  # float
+        self._maxima = {}  # dict[list], {plot: [number of points seen, x maximum, y maximum], ...}
+
+    def get_graph_widget(self):
+        """
+        Gets the graph widget being resized
+
+        RETURNS: Graph
+            Graph widget
+        """
+        return self._graph_widget
+
+    def watch(self, plot):
+        """
+        Resizes the axis whenever the points of a plot change
+
+        PARAMETERS:
+            plot : Plot
+                Plot of the graph
+        """
+        self._maxima[plot] = [0, None, None]
+        plot.bind(points=self._points_changed)
+        self._points_changed(plot, plot.points)
+
+    def unwatch(self, plot):
+        """
+        Stops resizing the axis when the points of a plot change
+
+        PARAMETERS:
+            plot : Plot
+                Plot of the graph
+        """
+        if self._maxima.pop(plot, None) is not None:
+            plot.unbind(points=self._points_changed)
+
+    def _points_changed(self, plot, points):
+        # updates the running maxima of the plot with its new points (all of them, if points were removed)
+        maxima = self._maxima[plot]
+        seen = maxima[0]
+        if len(points) < seen:
+            maxima[:] = [0, None, None]
+            seen = 0
+        if len(points) == seen:
+            return
+
+        for axis, column in ((1, points.xs[seen:]), (2, points.ys[seen:])):
+            maximum = _finite_max(column)
+            if maxima[axis] is None or (maximum is not None and maximum > maxima[axis]):
+                maxima[axis] = maximum
+        maxima[0] = len(points)
+
+        self.resize()
+
+    def resize(self):
+        """
+        Resizes the axis to fit the points of every watched plot
+        """
+        x_maxima = [maxima[1] for maxima in self._maxima.itervalues() if maxima[1] is not None]
+        y_maxima = [maxima[2] for maxima in self._maxima.itervalues() if maxima[2] is not None]
+
+        # x-axis
+        steps = 0
+        if x_maxima and max(x_maxima) > self._xmax:
+            steps = int(ceil((max(x_maxima) - self._xmax) / float(X_STEP)))
+        self._set("xmax", self._xmax + steps * X_STEP)
+        self._set("x_ticks_major", self._x_ticks_major + steps * X_TICKS_STEP)
+
+        # y-axis
+        steps = 0
+        if y_maxima and max(y_maxima) > self._ymax:
+            if self._axis_type == "linear":
+                steps = int(ceil((max(y_maxima) - self._ymax) / float(Y_LINEAR_STEP)))
+            elif self._axis_type == "log":
+                steps = int(ceil(log10(max(y_maxima) / float(self._ymax))))
+                if self._ymax * Y_LOG_STEP**(steps - 1) >= max(y_maxima):  # rounding errors of log10
+                    steps -= 1
+        if self._axis_type == "linear":
+            self._set("ymax", self._ymax + steps * Y_LINEAR_STEP)
+            self._set("y_ticks_major", self._y_ticks_major + steps * Y_LINEAR_TICKS_STEP)
+        elif self._axis_type == "log":
+            self._set("ymax", self._ymax * Y_LOG_STEP**steps)
+
+    def _set(self, name, value):
+        # sets a graph property only if it changes, as each change redraws the graph
+        if getattr(self._graph_widget, name) != value:
+            setattr(self._graph_widget, name, value)
@@ -39,7 +39,7 @@ class Bacteria(object):
             self._line_color = hsv_to_rgb(*NewColor.new_color(genus))  # (R,G,B)
         else:
             self._line_color = color
-        self._plot = SmoothLinePlot(points=[(0, 1)], color=self._line_color, line_width=1.01)  # SmoothLinePlot
+        self._plot = None  # SmoothLinePlot, created by get_plot()
 
         Bacteria._total_bacteria_populations += 1
 
@@ -82,9 +82,17 @@ class Bacteria(object):
 
     def get_plot(self):
         """
-        Gets antibiotic plot
+        Gets bacteria plot, creating it if it does not exist (see release_plot())
 
         RETURNS: SmoothLinePlot
-            Antibiotic Plot
+            Bacteria Plot
         """
+        if self._plot is None:
+            self._plot = SmoothLinePlot(points=[(0, 1)], color=self._line_color, line_width=1.01)
         return self._plot
+
+    def release_plot(self):
+        """
+        Discards the bacteria plot (a new one is created by the next call to get_plot())
+        """
+        self._plot = None
@@ -9,9 +9,9 @@ DEPENDENCIES:
     - Python 2.7
 """
 
-from kivy.clock import Clock
+from bin.classes.AxisManager import AxisManager
 from bin.deps.kivy_graph import Graph
-from bin.functions.graphs import xy_max_resize
+from bin.functions.graphs import release_trajectory_plots, trajectory_plots
 
 __author__ = 'Pedro HC David, https://github.com/Kronopt'
 __credits__ = ['Pedro HC David']
@@ -46,27 +46,19 @@ class Microbiome(object):
             ymin = 1
             ymax = 10**3
 
-        self._graph_widget = Graph(ylabel=language[graph_y_axis],
-                                   xmin=0, xmax=10, x_ticks_major=1, x_ticks_minor=4, x_grid_label=True,
-                                   ymin=ymin, ymax=ymax, y_ticks_major=1, y_ticks_minor=7, y_grid_label=True,
-                                   ylog=True,
-                                   padding=5, **{'background_color': (0.15, 0.15, 0.15),
-                                                 'border_color': (0.17, 0.17, 0.17),
-                                                 'tick_color': (0.5, 0.5, 0.5)})  # Graph
-
         self._id = 'mic' + str(Microbiome._total_microbiomes)  # str
         self._name = name  # str
         self._bacteria = bacteria  # dict[Bacteria]
+        self._ymin = ymin  # float
+        self._ymax = ymax  # float
+        self._labels = {"ylabel": language[graph_y_axis]}  # dict[str], graph widget labels (see set_labels())
+        self._plots = []  # list[(Plot, bool)], other plots of the graph widget, and whether they resize its axis
+        self._trajectory = None  # Trajectory, whose columns the bacteria plots are views of (see set_trajectory())
+        self._series = {}  # dict[str], {bacteria name: trajectory series, ...}
 
-        # scheduled function calls (clocks) must be strong referenced, otherwise will not work
-        self._clocks = []  # list[Clock]
-        for _bacteria in sorted(self._bacteria.iterkeys(), reverse=True):  # sorted so that "total" plots come in first
-            self._clocks.append(
-                Clock.schedule_interval(xy_max_resize(self._bacteria[_bacteria].get_plot(), self._graph_widget,
-                                                      "log"), 1/60.))
-
-            # add each bacteria plot to the main graph
-            self._graph_widget.add_plot(self._bacteria[_bacteria].get_plot())
+        # graph widget and plots are only created when shown (see get_graph_widget())
+        self._graph_widget = None  # Graph
+        self._axis_manager = None  # AxisManager
 
         Microbiome._total_microbiomes += 1
 
@@ -82,13 +74,114 @@ class Microbiome(object):
 
     def get_graph_widget(self):
         """
-        Gets microbiome graph widget
+        Gets microbiome graph widget, creating it (and the bacteria plots) if it does not exist (see release())
 
         RETURNS: Graph object
             Microbiome graph widget
         """
+        if self._graph_widget is None:
+            self._graph_widget = Graph(xmin=0, xmax=10, x_ticks_major=1, x_ticks_minor=4, x_grid_label=True,
+                                       ymin=self._ymin, ymax=self._ymax, y_ticks_major=1, y_ticks_minor=7,
+                                       y_grid_label=True, ylog=True,
+                                       padding=5, background_color=(0.15, 0.15, 0.15),
+                                       border_color=(0.17, 0.17, 0.17), tick_color=(0.5, 0.5, 0.5),
+                                       **self._labels)  # Graph
+
+            # resizes the graph axis as points are added to the plots
+            self._axis_manager = AxisManager(self._graph_widget, "log")
+            # sorted so that "total" plots come in first
+            for _bacteria in sorted(self._bacteria.iterkeys(), reverse=True):
+                self._axis_manager.watch(self._bacteria[_bacteria].get_plot())
+
+                # add each bacteria plot to the main graph
+                self._graph_widget.add_plot(self._bacteria[_bacteria].get_plot())
+
+            if self._trajectory is not None:
+                self.set_trajectory(self._trajectory, self._series)
+
+            for plot, watch in self._plots:
+                self._graph_widget.add_plot(plot)
+                if watch:
+                    self._axis_manager.watch(plot)
+
         return self._graph_widget
 
+    def has_graph_widget(self):
+        """
+        Checks whether the graph widget exists (without creating it)
+
+        RETURNS: bool
+            True if the graph widget exists
+        """
+        return self._graph_widget is not None
+
+    def release(self):
+        """
+        Discards the graph widget and the bacteria plots, while the microbiome is not shown (they are created again,
+        from the trajectory, by the next call to get_graph_widget())
+        """
+        if self._graph_widget is None:
+            return
+
+        if self._graph_widget.parent is not None:
+            self._graph_widget.parent.remove_widget(self._graph_widget)
+        for plot, watch in self._plots:
+            self._axis_manager.unwatch(plot)
+            self._graph_widget.remove_plot(plot)
+        if self._trajectory is not None:
+            release_trajectory_plots(self._trajectory,
+                                     [_bacteria.get_plot() for _bacteria in self._bacteria.itervalues()])
+        for _bacteria in self._bacteria.itervalues():
+            _bacteria.release_plot()
+
+        self._graph_widget = None
+        self._axis_manager = None
+
+    def add_plot(self, plot, watch=False):
+        """
+        Adds another plot to the graph widget (kept when the graph widget is released)
+
+        PARAMETERS:
+            plot : Plot
+                Plot
+            watch : bool
+                Whether the graph axis are resized to fit the plot points
+        """
+        self._plots.append((plot, watch))
+        if self._graph_widget is not None:
+            self._graph_widget.add_plot(plot)
+            if watch:
+                self._axis_manager.watch(plot)
+
+    def set_trajectory(self, trajectory, series):
+        """
+        Makes the bacteria plots views of the columns of a trajectory (see graphs.trajectory_plots())
+
+        PARAMETERS:
+            trajectory : Trajectory
+                Trajectory of the microbiome simulation runs
+            series : dict[str]
+                {bacteria name: trajectory series, ...}
+        """
+        self._trajectory = trajectory
+        self._series = series
+        if self._graph_widget is not None:
+            trajectory_plots(trajectory, dict((series[name], _bacteria.get_plot())
+                                              for name, _bacteria in self._bacteria.iteritems()))
+
+    def set_labels(self, **labels):
+        """
+        Sets graph widget labels (kept when the graph widget is released)
+
+        PARAMETERS:
+            labels : str
+                xlabel and/or ylabel
+        """
+        self._labels.update(labels)
+        if self._graph_widget is not None:
+            for label, text in labels.iteritems():
+                setattr(self._graph_widget, label, text)
+
     def get_id(self):
         """
         Gets id of microbiome
@@ -116,10 +209,11 @@ class Microbiome(object):
         """
         return self._bacteria
 
-    def get_clocks(self):
+    def get_axis_manager(self):
         """
-        Gets scheduled function calls to xy_max_resize() of every plot
+        Gets the axis manager of the microbiome graph widget
 
-        RETURNS: list[Clock]
+        RETURNS: AxisManager
+            Axis manager of the graph widget (None while the graph widget does not exist)
         """
-        return self._clocks
+        return self._axis_manager
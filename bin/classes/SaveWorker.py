@@ -0,0 +1,125 @@
+#!python2
+# coding: utf-8
+
+"""
+SAVE WORKER
+Class that writes saved files in a background thread
+The UI thread only gathers what is saved (graph pixels, snapshots of the plotted values, options text) and queues the
+file writing, so that saving never blocks rendering
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+import Queue
+import threading
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+def write_lines(path, lines):
+    """
+    Writes lines of text to a file
+
+    PARAMETERS:
+        path : str
+            File path
+        lines : iterable[str]
+            Lines, with line endings
+    """
+    with open(path, "wb") as text_file:
+        text_file.writelines(lines)
+
+
+class SaveWorker(object):
+    """
+    Runs file writing functions in a background (daemon) thread, one at a time, in the order they are queued, so that
+    repeated saves queue up instead of stalling the UI
+    Progress is reported after each function, through a function called from the background thread (the UI wraps it
+    to run in its own thread)
+    """
+    def __init__(self, progress=None):
+        """
+        Instantiates save worker (the thread is started by the first queued function)
+
+        PARAMETERS:
+            progress : function or None
+                Called from the background thread after each queued function, as progress(done, queued, error):
+                number of functions done and queued since the worker was last idle, and the exception raised by the
+                function (or None)
+        """
+        self._progress = progress  # function or None
+        self._queue = Queue.Queue()  # Queue.Queue[tuple], (function, args, kwargs)
+        self._lock = threading.Lock()  # threading.Lock, guards the counters
+        self._queued = 0  # int, functions queued since the worker was last idle
+        self._done = 0  # int, functions done since the worker was last idle
+        self._thread = None  # threading.Thread
+
+    def set_progress(self, progress):
+        """
+        Sets the function that reports progress (see __init__())
+
+        PARAMETERS:
+            progress : function or None
+                Called from the background thread after each queued function, as progress(done, queued, error)
+        """
+        self._progress = progress
+
+    def put(self, function, *args, **kwargs):
+        """
+        Queues a file writing function
+
+        PARAMETERS:
+            function : function
+                Function to run in the background thread
+            args : object
+                Arguments of function
+            kwargs : object
+                Keyword arguments of function
+        """
+        with self._lock:
+            self._queued += 1
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SaveWorker")
+            self._thread.daemon = True
+            self._thread.start()
+        self._queue.put((function, args, kwargs))
+
+    def progress(self):
+        """
+        Gets the progress of the worker
+
+        RETURNS: (int, int)
+            Number of functions done and queued since the worker was last idle
+        """
+        with self._lock:
+            return self._done, self._queued
+
+    def join(self):
+        """
+        Waits until every queued function is done (so that files are complete before the application exits)
+        """
+        self._queue.join()
+
+    def _run(self):
+        # background thread, runs queued functions forever
+        while True:
+            function, args, kwargs = self._queue.get()
+            error = None
+            try:
+                try:
+                    function(*args, **kwargs)
+                except Exception as exception:
+                    # reported instead of ending the thread, so that later saves still run
+                    error = exception
+
+                with self._lock:
+                    self._done += 1
+                    done, queued = self._done, self._queued
+                    if done == queued:
+                        self._queued = self._done = 0
+                if self._progress is not None:
+                    self._progress(done, queued, error)
+            finally:
+                self._queue.task_done()
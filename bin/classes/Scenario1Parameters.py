@@ -0,0 +1,169 @@
+#!python2
+# coding: utf-8
+
+"""
+SCENARIO 1 PARAMETERS
+Class that defines the parameters of a scenario 1 (single population) simulation
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+class Scenario1Parameters(object):
+    """
+    Defines every parameter needed to simulate a single bacterial population (scenario 1)
+    Attribute names are the same as the SimulATeApp properties they mirror
+    Values are read at every time step, so they can be changed while a simulation is running
+    """
+    # attribute names, in the order they are documented in __init__
+    FIELDS = ("sensitive_initial_density", "sensitive_growth_rate", "sensitive_antibiotic_inhibition",
+              "resistant_initial_density", "resistant_growth_rate", "resistant_antibiotic_inhibition",
+              "lymphocyte_inhibition", "host_death_density", "initial_precursor_cell_density",
+              "immune_cell_proliferation_rate", "immune_cell_half_maximum_growth", "effector_decay_rate",
+              "memory_cell_conversion_rate", "antibiotic_mean_concentration", "treatment_type", "classic_delay",
+              "classic_duration", "adaptive_symptoms_at_bacteria_density", "user_administer", "time_step")
+
+    # range of each numeric parameter that varies between simulations
+    # {"parameter_name": (min, max, scale), ...}, scale is 'linear' or 'log' (values span orders of magnitude)
+    # documented in equations.py: growth rates, lymphocyte_inhibition, initial_precursor_cell_density, the immune cell
+    # rates, antibiotic_mean_concentration and adaptive_symptoms_at_bacteria_density; not documented, taken from the
+    # SimulATeApp sliders: the initial densities (slider default maximum, 100), the minimums of the resistant
+    # parameters, classic_delay, classic_duration and host_death_density (the exponents offered, 10**3 to 10**14, with
+    # mantissa 1)
+    # sensitive_antibiotic_inhibition is documented as 1, so it has no range; the resistant parameters are also bounded
+    # by the sensitive ones (see UPPER_BOUNDS)
+    RANGES = {"sensitive_initial_density": (1, 100, "linear"),
+              "sensitive_growth_rate": (1, 8, "linear"),
+              "resistant_initial_density": (1, 100, "linear"),
+              "resistant_growth_rate": (0.1, 8, "linear"),
+              "resistant_antibiotic_inhibition": (0, 1, "linear"),
+              "lymphocyte_inhibition": (10**-5, 10**-4, "log"),
+              "host_death_density": (10**3, 10**14, "log"),
+              "initial_precursor_cell_density": (15, 1500, "linear"),
+              "immune_cell_proliferation_rate": (1.2, 3, "linear"),
+              "immune_cell_half_maximum_growth": (10**4, 10**5, "log"),
+              "effector_decay_rate": (0.1, 0.8, "linear"),
+              "memory_cell_conversion_rate": (0.05, 0.1, "linear"),
+              "antibiotic_mean_concentration": (0.03, 128, "log"),
+              "classic_delay": (1, 15, "linear"),
+              "classic_duration": (3, 15, "linear"),
+              "adaptive_symptoms_at_bacteria_density": (10**3, 10**7, "log")}
+
+    # parameters whose maximum is the value of another one (see equations.py; the SimulATeApp sliders of the resistant
+    # strain end at the values of the sensitive one): a resistant strain grows at most as fast, and is inhibited by
+    # antibiotic at most as much, as the sensitive strain
+    # {"parameter_name": "bounding_parameter_name", ...}
+    UPPER_BOUNDS = {"resistant_growth_rate": "sensitive_growth_rate",
+                    "resistant_antibiotic_inhibition": "sensitive_antibiotic_inhibition"}
+
+    def __init__(self, sensitive_initial_density=10, sensitive_growth_rate=3.3, sensitive_antibiotic_inhibition=1,
+                 resistant_initial_density=2, resistant_growth_rate=1.1, resistant_antibiotic_inhibition=0.1,
+                 lymphocyte_inhibition=10**-5, host_death_density=10**14, initial_precursor_cell_density=200,
+                 immune_cell_proliferation_rate=2, immune_cell_half_maximum_growth=10**5, effector_decay_rate=0.35,
+                 memory_cell_conversion_rate=0.1, antibiotic_mean_concentration=6, treatment_type="Classic",
+                 classic_delay=3.5, classic_duration=7, adaptive_symptoms_at_bacteria_density=10**6,
+                 user_administer=False, time_step=1/(24*5.0)):
+        """
+        Instantiates scenario 1 parameters
+        Defaults are the same as the SimulATeApp default values (see equations.py for each parameter range)
+
+        PARAMETERS:
+            sensitive_initial_density : int/float
+                Initial antibiotic sensitive bacteria density
+            sensitive_growth_rate : int/float
+                Growth rate of antibiotic sensitive bacteria
+            sensitive_antibiotic_inhibition : int/float
+                Rate at which antibiotic inhibits sensitive bacteria
+            resistant_initial_density : int/float
+                Initial antibiotic resistant bacteria density
+            resistant_growth_rate : int/float
+                Growth rate of antibiotic resistant bacteria
+            resistant_antibiotic_inhibition : int/float
+                Rate at which antibiotic inhibits resistant bacteria
+            lymphocyte_inhibition : int/float
+                Rate at which lymphocytes kill bacteria
+            host_death_density : int/float
+                Total bacteria density at which the host dies
+            initial_precursor_cell_density : int/float
+                Initial naive precursor cells density
+            immune_cell_proliferation_rate : int/float
+                Max proliferation rate of immune cells
+            immune_cell_half_maximum_growth : int/float
+                Bacteria density at which the immune response grows at half its maximum rate
+            effector_decay_rate : int/float
+                Max decay rate of effector cells
+            memory_cell_conversion_rate : int/float
+                Fraction of effector cells which convert to memory cells
+            antibiotic_mean_concentration : int/float
+                Mean antibiotic concentration, mg/l
+            treatment_type : str
+                'Classic', 'Adaptive' or 'User'
+            classic_delay : int/float
+                Classic treatment, initial time delay before starting treatment
+            classic_duration : int/float
+                Classic treatment, duration of treatment
+            adaptive_symptoms_at_bacteria_density : int/float
+                Adaptive treatment, density of total bacteria which causes symptoms to appear
+            user_administer : bool
+                User treatment, True if antibiotic is being administered
+            time_step : int/float
+                Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        """
+        self.sensitive_initial_density = sensitive_initial_density  # int/float
+        self.sensitive_growth_rate = sensitive_growth_rate  # int/float
+        self.sensitive_antibiotic_inhibition = sensitive_antibiotic_inhibition  # int/float
+        self.resistant_initial_density = resistant_initial_density  # int/float
+        self.resistant_growth_rate = resistant_growth_rate  # int/float
+        self.resistant_antibiotic_inhibition = resistant_antibiotic_inhibition  # int/float
+        self.lymphocyte_inhibition = lymphocyte_inhibition  # int/float
+        self.host_death_density = host_death_density  # int/float
+        self.initial_precursor_cell_density = initial_precursor_cell_density  # int/float
+        self.immune_cell_proliferation_rate = immune_cell_proliferation_rate  # int/float
+        self.immune_cell_half_maximum_growth = immune_cell_half_maximum_growth  # int/float
+        self.effector_decay_rate = effector_decay_rate  # int/float
+        self.memory_cell_conversion_rate = memory_cell_conversion_rate  # int/float
+        self.antibiotic_mean_concentration = antibiotic_mean_concentration  # int/float
+        self.treatment_type = treatment_type  # str
+        self.classic_delay = classic_delay  # int/float
+        self.classic_duration = classic_duration  # int/float
+        self.adaptive_symptoms_at_bacteria_density = adaptive_symptoms_at_bacteria_density  # int/float
+        self.user_administer = user_administer  # bool
+        self.time_step = time_step  # float
+
+    def copy(self, **changes):
+        """
+        Copies these parameters, optionally changing some of them
+
+        PARAMETERS:
+            changes : kwargs
+                Parameters to change in the copy, {"parameter_name": value, ...}
+
+        RETURNS: Scenario1Parameters
+            New parameters object
+        """
+        values = self.as_dict()
+        values.update(changes)
+        return Scenario1Parameters(**values)
+
+    def within_bounds(self):
+        """
+        Checks that no parameter is above the parameter bounding it (see UPPER_BOUNDS)
+
+        RETURNS: bool
+            True if every bounded parameter is at most its bound
+        """
+        return all(getattr(self, parameter) <= getattr(self, bound)
+                   for parameter, bound in Scenario1Parameters.UPPER_BOUNDS.iteritems())
+
+    def as_dict(self):
+        """
+        Gets every parameter as a dictionary
+
+        RETURNS: dict
+            {"parameter_name": value, ...}
+        """
+        return dict((field, getattr(self, field)) for field in Scenario1Parameters.FIELDS)
@@ -0,0 +1,133 @@
+#!python2
+# coding: utf-8
+
+"""
+SCENARIO 2 PARAMETERS
+Class that defines the parameters of a scenario 2 (microbiome) simulation
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+from bin.functions.equations import nutrients_for_bacteria_duplication_eq
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# every antibiotic available in scenario 2
+ANTIBIOTICS = ("lincosamides", "macrolides", "penicillins", "quinolones", "streptogramins", "sulfonamides",
+               "tetacyclines", "trimethoprims")
+
+# genera of each gut enterotype, in the same order as they are shown and saved
+ENTEROTYPE_GENERA = {
+    "gut_enterotype_1": ("bacteroides", "faecalibacterium", "roseburia", "bifidobacterium", "lachnospiraceae",
+                         "parabacteroides", "alistipes", "anaerostipes", "acidaminococcus", "collinsella"),
+    "gut_enterotype_2": ("prevotella", "bacteroides", "faecalibacterium", "lachnospiraceae", "roseburia",
+                         "collinsella", "bifidobacterium", "alistipes", "streptococcus", "coprococcus"),
+    "gut_enterotype_3": ("bacteroides", "bifidobacterium", "faecalibacterium", "lachnospiraceae", "alistipes",
+                         "akkermansia", "ruminococcus", "collinsella", "blautia", "roseburia")}
+
+# default densities calculated from:
+#   Arumugam et al (2011). Enterotypes of the human gut microbiome.
+#   Nature, 473(7346), 174–180. https://doi.org/10.1038/nature09944
+ENTEROTYPE_DENSITIES = {
+    "gut_enterotype_1": {"bacteroides": 5793111, "faecalibacterium": 1166914, "roseburia": 832900,
+                         "bifidobacterium": 623495, "lachnospiraceae": 464077, "parabacteroides": 322975,
+                         "alistipes": 221911, "anaerostipes": 208595, "acidaminococcus": 208271,
+                         "collinsella": 157744},
+    "gut_enterotype_2": {"prevotella": 5141001, "bacteroides": 1591226, "faecalibacterium": 771497,
+                         "lachnospiraceae": 706805, "roseburia": 461321, "collinsella": 381627,
+                         "bifidobacterium": 255327, "alistipes": 246779, "streptococcus": 231394,
+                         "coprococcus": 213016},
+    "gut_enterotype_3": {"bacteroides": 2585052, "bifidobacterium": 1571051, "faecalibacterium": 1449116,
+                         "lachnospiraceae": 913032, "alistipes": 909552, "akkermansia": 588316,
+                         "ruminococcus": 553816, "collinsella": 506545, "blautia": 455794, "roseburia": 467722}}
+
+# default growth rate is the same as in scenario 1
+DEFAULT_GROWTH_RATE = 3.3
+
+
+class Scenario2Parameters(object):
+    """
+    Defines every parameter needed to simulate a microbiome (scenario 2)
+    Dictionaries are read at every time step, so they can be changed while a simulation is running
+    """
+    def __init__(self, genera, initial_densities, antibiotic_inhibition, antibiotic_concentrations=None,
+                 antibiotic_uptakes=None, growth_rates=None, flow_rate=0.01, half_saturation=5,
+                 nutrients_for_bacteria_duplication=None, time_step=1/(24*5.0)):
+        """
+        Instantiates scenario 2 parameters
+
+        PARAMETERS:
+            genera : iterable[str]
+                Bacteria genera in the microbiome, in the order in which values are yielded
+            initial_densities : dict[int/float]
+                Initial density of each bacteria, {"bacteria": float}
+            antibiotic_inhibition : dict[dict[float]]
+                Each bacteria's inhibition parameter for each antibiotic
+                {"bacteria": {"antibiotic_1": float, ...}, ...}
+            antibiotic_concentrations : dict[float] or None
+                Concentration of each antibiotic, {"antibiotic_1": float, ...} (defaults to 6 for every antibiotic)
+            antibiotic_uptakes : dict[int] or None
+                Uptake status of each antibiotic, {"antibiotic_1": int(0 or 1), ...} (defaults to 0 for every
+                antibiotic)
+            growth_rates : dict[float] or None
+                Growth rate of each bacteria, {"bacteria": float} (defaults to 3.3 for every bacteria)
+            flow_rate : int/float
+                Rate of nutrient flow
+            half_saturation : int/float
+                Constant that makes (N/(Q+N)) = 1/2 when Q=C
+            nutrients_for_bacteria_duplication : dict[float] or None
+                Nutrients necessary for bacteria duplication, {"bacteria": float}
+                (defaults to the value which keeps each bacteria stable at its initial density)
+            time_step : int/float
+                Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        """
+        self.genera = tuple(genera)  # tuple[str]
+        self.initial_densities = initial_densities  # dict[int/float]
+        self.antibiotic_inhibition = antibiotic_inhibition  # dict[dict[float]]
+
+        if antibiotic_concentrations is None:
+            antibiotic_concentrations = dict((antibiotic, 6) for antibiotic in ANTIBIOTICS)
+        self.antibiotic_concentrations = antibiotic_concentrations  # dict[float]
+
+        if antibiotic_uptakes is None:
+            antibiotic_uptakes = dict((antibiotic, 0) for antibiotic in antibiotic_concentrations)
+        self.antibiotic_uptakes = antibiotic_uptakes  # dict[int]
+
+        if growth_rates is None:
+            growth_rates = dict((bacteria, DEFAULT_GROWTH_RATE) for bacteria in self.genera)
+        self.growth_rates = growth_rates  # dict[float]
+
+        self.flow_rate = flow_rate  # int/float
+        self.half_saturation = half_saturation  # int/float
+
+        if nutrients_for_bacteria_duplication is None:
+            nutrients_for_bacteria_duplication = dict(
+                (bacteria, nutrients_for_bacteria_duplication_eq(growth_rates[bacteria], flow_rate, half_saturation,
+                                                                 initial_densities[bacteria]))
+                for bacteria in self.genera)
+        self.nutrients_for_bacteria_duplication = nutrients_for_bacteria_duplication  # dict[float]
+
+        self.time_step = time_step  # float
+
+    @staticmethod
+    def enterotype(enterotype, antibiotic_inhibition, **kwargs):
+        """
+        Instantiates the parameters of one of the default gut enterotypes
+
+        PARAMETERS:
+            enterotype : str
+                "gut_enterotype_1", "gut_enterotype_2" or "gut_enterotype_3"
+            antibiotic_inhibition : dict[dict[float]]
+                Each bacteria's inhibition parameter for each antibiotic
+                {"bacteria": {"antibiotic_1": float, ...}, ...}
+            kwargs
+                Any other Scenario2Parameters argument
+
+        RETURNS: Scenario2Parameters
+            Parameters of the given enterotype
+        """
+        return Scenario2Parameters(ENTEROTYPE_GENERA[enterotype], dict(ENTEROTYPE_DENSITIES[enterotype]),
+                                   antibiotic_inhibition, **kwargs)
@@ -0,0 +1,253 @@
+#!python2
+# coding: utf-8
+
+"""
+SIMULATION WORKER
+Class that runs a simulation in a separate process
+The worker process steps the engine and writes rows of plotted values into a ring buffer in shared memory, which the
+UI drains once per frame; pause, resume, stop and parameter changes are sent to it through a control queue
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+import copy
+import multiprocessing
+import Queue
+from bin.functions.engine import BACTERIA_DEATH, HOST_DEATH, SCENARIO_1_SERIES, scenario_1_generator, scenario_1_row,\
+    scenario_2_generator, scenario_2_row, scenario_2_series
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# scenarios
+SCENARIO_1 = "scenario_1"
+SCENARIO_2 = "scenario_2"
+
+# outcomes, as stored in the last column of each ring buffer row (index of the outcome)
+OUTCOMES = (None, HOST_DEATH, BACTERIA_DEATH)
+
+# whether the row that ends a simulation is plotted, for each scenario (as when simulating in the UI process)
+PLOT_LAST_ROW = {SCENARIO_1: False, SCENARIO_2: True}
+
+# parameters that can change while a simulation is running, sent to the worker process when they do
+LIVE_PARAMETERS = ("time_step", "user_administer", "antibiotic_concentrations", "antibiotic_uptakes")
+
+# control commands
+PAUSE = "pause"
+RESUME = "resume"
+STOP = "stop"
+SET = "set"
+
+# rows of the ring buffer (~2 MB for scenario 2), rows written between control queue checks and seconds the worker
+# waits for a control command when paused or when the ring buffer is full
+RING_BUFFER_ROWS = 2**13
+ROWS_PER_BATCH = 64
+CONTROL_TIMEOUT = 0.005
+
+
+def run_worker(scenario, parameters, ring_buffer, capacity, written, read, control):
+    """
+    Steps a simulation and writes its rows into the ring buffer, until stopped or until the simulation ends (runs
+    inside the worker process)
+    Each row is [time, value_1, value_2, ..., outcome index], see OUTCOMES
+
+    PARAMETERS:
+        scenario : str
+            SCENARIO_1 or SCENARIO_2
+        parameters : Scenario1Parameters or Scenario2Parameters
+            Simulation parameters
+        ring_buffer : multiprocessing.RawArray
+            capacity rows of doubles
+        capacity : int
+            Number of rows of the ring buffer
+        written : multiprocessing.Value
+            Number of rows written, so far (updated by the worker)
+        read : multiprocessing.Value
+            Number of rows read, so far (updated by the UI)
+        control : multiprocessing.Queue
+            Control commands, (PAUSE,), (RESUME,), (STOP,) or (SET, parameter_name, value)
+    """
+    if scenario == SCENARIO_1:
+        generator = scenario_1_generator(parameters)
+        row_function = scenario_1_row
+        row_size = len(SCENARIO_1_SERIES) + 2
+    else:
+        generator = scenario_2_generator(parameters)
+        row_function = scenario_2_row
+        row_size = len(scenario_2_series(parameters)) + 2
+
+    paused = False
+    position = 0
+    while True:
+        free = capacity - (position - read.value)
+        waiting = paused or free == 0
+        try:
+            command = control.get(True, CONTROL_TIMEOUT) if waiting else control.get_nowait()
+        except Queue.Empty:
+            command = None
+
+        if command is not None:
+            if command[0] == STOP:
+                return
+            elif command[0] == PAUSE:
+                paused = True
+            elif command[0] == RESUME:
+                paused = False
+            elif command[0] == SET:
+                setattr(parameters, command[1], command[2])
+            continue
+        if waiting:
+            continue
+
+        outcome = None
+        for _ in xrange(min(free, ROWS_PER_BATCH)):
+            time, values, outcome = row_function(parameters, generator.next())
+            offset = (position % capacity) * row_size
+            ring_buffer[offset:offset + row_size] = [time] + list(values) + [OUTCOMES.index(outcome)]
+            position += 1
+            if outcome is not None:
+                break
+        written.value = position
+
+        if outcome is not None:
+            return
+
+
+class SimulationWorker(object):
+    """
+    Runs a simulation in a separate process, so that stepping the engine does not compete with drawing and input
+    handling; rows are read with drain(), once per frame
+    """
+    def __init__(self, scenario, parameters, capacity=RING_BUFFER_ROWS):
+        """
+        Instantiates worker (the process is started by start())
+
+        PARAMETERS:
+            scenario : str
+                SCENARIO_1 or SCENARIO_2
+            parameters : Scenario1Parameters or Scenario2Parameters
+                Simulation parameters, changes made to LIVE_PARAMETERS are sent to the worker process by drain()
+            capacity : int
+                Number of rows of the ring buffer
+        """
+        self._scenario = scenario  # str
+        self._parameters = parameters  # Scenario1Parameters or Scenario2Parameters
+        self._capacity = capacity  # int
+        if scenario == SCENARIO_1:
+            self._row_size = len(SCENARIO_1_SERIES) + 2  # int
+        else:
+            self._row_size = len(scenario_2_series(parameters)) + 2
+        self._ring_buffer = multiprocessing.RawArray('d', capacity * self._row_size)  # RawArray
+        self._written = multiprocessing.Value('l', 0)  # Value
+        self._read = multiprocessing.Value('l', 0)  # Value
+        self._read_count = 0  # int, same as self._read, without locking
+        self._control = multiprocessing.Queue()  # Queue
+        self._live_values = self._current_live_values()  # dict
+        self._process = None  # multiprocessing.Process
+        self._outcome = None  # str or None
+
+    def _current_live_values(self):
+        # copies of the current values of LIVE_PARAMETERS (dicts shared with the UI become plain dicts)
+        values = {}
+        for name in LIVE_PARAMETERS:
+            if hasattr(self._parameters, name):
+                value = getattr(self._parameters, name)
+                values[name] = dict(value) if isinstance(value, dict) else value
+        return values
+
+    def start(self):
+        """
+        Starts the worker process
+        """
+        # copy of the parameters with plain dicts, as dicts shared with the UI can not be sent to another process
+        parameters = copy.copy(self._parameters)
+        for name, value in vars(parameters).items():
+            if isinstance(value, dict):
+                setattr(parameters, name, dict((key, dict(item) if isinstance(item, dict) else item)
+                                               for key, item in value.iteritems()))
+
+        self._process = multiprocessing.Process(target=run_worker, args=(
+            self._scenario, parameters, self._ring_buffer, self._capacity, self._written, self._read, self._control))
+        self._process.daemon = True
+        self._process.start()
+
+    def pause(self):
+        """
+        Pauses the simulation
+        """
+        self._control.put((PAUSE,))
+
+    def resume(self):
+        """
+        Resumes the simulation
+        """
+        self._control.put((RESUME,))
+
+    def stop(self):
+        """
+        Stops the worker process
+        """
+        if self._process is not None:
+            self._control.put((STOP,))
+            self._process.join(1)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def set_parameter(self, name, value):
+        """
+        Changes a parameter of the running simulation
+
+        PARAMETERS:
+            name : str
+                Parameter name
+            value : object
+                New value
+        """
+        self._control.put((SET, name, value))
+
+    def drain(self, trajectory, limit=float("inf")):
+        """
+        Appends the rows written by the worker process to a trajectory (notifying its listeners once), and sends the
+        LIVE_PARAMETERS that changed since the last call to the worker process
+
+        PARAMETERS:
+            trajectory : Trajectory
+                Trajectory whose series are the ones of the scenario (see engine.SCENARIO_1_SERIES and
+                engine.scenario_2_series())
+            limit : int or float
+                Maximum number of rows to read
+
+        RETURNS: (int, str or None)
+            Number of rows read, and outcome of the simulation (see engine.scenario_1_outcome() and
+            engine.scenario_2_outcome()) if it has ended
+        """
+        live_values = self._current_live_values()
+        for name, value in live_values.iteritems():
+            if value != self._live_values[name]:
+                self.set_parameter(name, value)
+        self._live_values = live_values
+
+        ring_buffer = self._ring_buffer
+        capacity = self._capacity
+        row_size = self._row_size
+        count = int(min(self._written.value - self._read_count, limit))
+
+        for position in xrange(self._read_count, self._read_count + count):
+            offset = (position % capacity) * row_size
+            row = ring_buffer[offset:offset + row_size]
+            outcome = OUTCOMES[int(row[-1])]
+            if outcome is not None:
+                self._outcome = outcome
+                if PLOT_LAST_ROW[self._scenario]:
+                    trajectory.append(row[0], row[1:-1], notify=False)
+                break
+            trajectory.append(row[0], row[1:-1], notify=False)
+
+        self._read_count += count
+        self._read.value = self._read_count
+        if count:
+            trajectory.notify()
+        return count, self._outcome
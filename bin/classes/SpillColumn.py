@@ -0,0 +1,214 @@
+#!python2
+# coding: utf-8
+
+"""
+SPILL COLUMN
+Class that defines a column of values that spills its older values to disk
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+from array import array
+import mmap
+import tempfile
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# values kept in memory (~128 KB per column) and values spilled to disk at a time
+WINDOW_ROWS = 2**14
+CHUNK_ROWS = 2**12
+
+# bytes per value (double)
+VALUE_SIZE = array('d').itemsize
+
+
+class SpillColumn(object):
+    """
+    Column of doubles that keeps its most recent values in memory and moves older ones, a chunk at a time, to a
+    temporary file read through a memory map, so that memory use does not grow with the number of values
+    Supports the part of array.array('d') used by trajectories and plots: len(), indexing, slicing (which returns an
+    array.array('d')), iteration, append(), extend() and clearing (del column[:])
+    """
+    def __init__(self, window=WINDOW_ROWS, chunk=CHUNK_ROWS):
+        """
+        Instantiates an empty column
+
+        PARAMETERS:
+            window : int
+                Minimum number of (most recent) values kept in memory
+            chunk : int
+                Number of values moved to disk at a time
+        """
+        self._window = window  # int
+        self._chunk = chunk  # int
+        self._values = array('d')  # array[float], values in memory, the most recent ones
+        self._spilled = 0  # int, number of values on disk, the oldest ones
+        self._file = None  # file, temporary file, created by the first spill
+        self._map = None  # mmap, memory map of the file, created when values on disk are read
+
+    def __len__(self):
+        """
+        RETURNS: int
+            Number of values
+        """
+        return self._spilled + len(self._values)
+
+    def __iter__(self):
+        """
+        RETURNS: iterator[float]
+            Values, in order
+        """
+        for values in self.chunks():
+            for value in values:
+                yield value
+
+    def __getitem__(self, index):
+        """
+        PARAMETERS:
+            index : int or slice
+                Index, or slice, of the values
+
+        RETURNS: float or array[float]
+            Value, or array of the values of the slice
+        """
+        spilled = self._spilled
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return array('d', (self[k] for k in xrange(start, stop, step)))
+            values = array('d')
+            if start < min(stop, spilled):
+                values = self._read(start, min(stop, spilled))
+            if stop > spilled:
+                values.extend(self._values[max(start - spilled, 0):stop - spilled])
+            return values
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column index out of range")
+        if index >= spilled:
+            return self._values[index - spilled]
+        return self._read(index, index + 1)[0]
+
+    def __delitem__(self, index):
+        """
+        Removes every value (only del column[:] is supported)
+
+        PARAMETERS:
+            index : slice
+                slice(None, None, None)
+        """
+        if not isinstance(index, slice) or index.indices(len(self)) != (0, len(self), 1):
+            raise TypeError("only every value can be removed from a SpillColumn")
+        del self._values[:]
+        self._close_map()
+        # the next spill creates a new file, snapshots keep reading the current one (closed when no longer used)
+        self._file = None
+        self._spilled = 0
+
+    def __repr__(self):
+        return "SpillColumn(%d values, %d on disk)" % (len(self), self._spilled)
+
+    def new_column(self):
+        """
+        Gets a new, empty, column with the same window and chunk size (for values derived from this column's)
+
+        RETURNS: SpillColumn
+            Empty column
+        """
+        return SpillColumn(self._window, self._chunk)
+
+    def snapshot(self):
+        """
+        Gets a read only copy of the column as it is now, unchanged by values appended later or by clearing the column,
+        that can be read from another thread
+        Only the values in memory are copied, values on disk are shared (appending never changes them)
+
+        RETURNS: SpillColumn
+            Copy of the column (do not modify)
+        """
+        snapshot = SpillColumn(self._window, self._chunk)
+        snapshot._values = self._values[:]
+        snapshot._spilled = self._spilled
+        snapshot._file = self._file
+        return snapshot
+
+    def append(self, value):
+        """
+        Appends a value
+
+        PARAMETERS:
+            value : float
+                Value
+        """
+        self._values.append(value)
+        if len(self._values) >= self._window + self._chunk:
+            self._spill()
+
+    def extend(self, values):
+        """
+        Appends several values
+
+        PARAMETERS:
+            values : iterable[float]
+                Values, an array, a SpillColumn or any other iterable of floats
+        """
+        for chunk in (values.chunks() if isinstance(values, SpillColumn) else (values,)):
+            self._values.extend(chunk)
+            self._spill()
+
+    def chunks(self, start=0):
+        """
+        Iterates over the values from index start on, a chunk at a time, without reading every value at once
+
+        PARAMETERS:
+            start : int
+                First index
+
+        RETURNS: iterator[array[float]]
+            Arrays of consecutive values
+        """
+        spilled = self._spilled
+        for chunk_start in xrange(start, spilled, self._chunk):
+            yield self._read(chunk_start, min(chunk_start + self._chunk, spilled))
+        yield self._values[max(start - spilled, 0):]
+
+    def close(self):
+        """
+        Removes the temporary file (the column can not be used afterwards)
+        """
+        self._close_map()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _spill(self):
+        # moves the oldest values in memory to disk, a chunk at a time, while more than window values are in memory
+        if len(self._values) < self._window + self._chunk:
+            return
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="simulate_")
+        self._close_map()
+        self._file.seek(0, 2)
+        while len(self._values) >= self._window + self._chunk:
+            self._values[:self._chunk].tofile(self._file)
+            del self._values[:self._chunk]
+            self._spilled += self._chunk
+        self._file.flush()
+
+    def _read(self, start, stop):
+        # values on disk from start to stop (excluded)
+        if self._map is None:
+            self._map = mmap.mmap(self._file.fileno(), self._spilled * VALUE_SIZE, access=mmap.ACCESS_READ)
+        values = array('d')
+        values.fromstring(self._map[start * VALUE_SIZE:stop * VALUE_SIZE])
+        return values
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
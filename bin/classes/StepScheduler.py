@@ -0,0 +1,111 @@
+#!python2
+# coding: utf-8
+
+"""
+STEP SCHEDULER
+Class that decides how many simulation steps are run in each frame
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+from timeit import default_timer
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# default wall time spent simulating per frame, in seconds (half a 60 fps frame, the rest is left for drawing)
+FRAME_BUDGET = 1/120.0
+
+# simulation_rate that runs as many steps as fit in the frame budget
+AS_FAST_AS_POSSIBLE = float("inf")
+
+# steps per second of wall time when following the time step (simulation_rate 0), the old 1/60 s clock rate
+STEPS_PER_SECOND = 60
+
+
+class StepScheduler(object):
+    """
+    Runs as many simulation steps per frame as needed to keep a simulation rate, within a per frame time budget, so
+    that the simulation rate does not depend on the frame rate
+    Steps that do not fit in the budget are dropped (the simulation runs slower) instead of piling up
+    """
+    def __init__(self, frame_budget=FRAME_BUDGET):
+        """
+        Instantiates scheduler
+
+        PARAMETERS:
+            frame_budget : float
+                Maximum wall time spent simulating per frame, in seconds
+        """
+        self._frame_budget = frame_budget  # float
+        self._pending = 0.0  # float, fraction of a step carried over to the next frame
+
+    def steps(self, frame_time, time_step, rate):
+        """
+        Gets the number of steps that the last frame time is worth
+
+        PARAMETERS:
+            frame_time : float
+                Wall time since the last frame, in seconds
+            time_step : float
+                Simulation time step, in days
+            rate : float
+                Simulated days per second of wall time; 0 runs STEPS_PER_SECOND steps per second (so the time step
+                sets the speed) and AS_FAST_AS_POSSIBLE fills the frame budget
+
+        RETURNS: float
+            Number of steps (infinite if rate is AS_FAST_AS_POSSIBLE)
+        """
+        if rate == AS_FAST_AS_POSSIBLE:
+            return AS_FAST_AS_POSSIBLE
+        if rate > 0:
+            self._pending += rate * frame_time / time_step
+        else:
+            self._pending += STEPS_PER_SECOND * frame_time
+        return self._pending
+
+    def run(self, step, frame_time, time_step, rate):
+        """
+        Runs the steps of a frame
+
+        PARAMETERS:
+            step : function
+                step() -> bool, runs one simulation step, False if the simulation has ended
+            frame_time : float
+                Wall time since the last frame, in seconds
+            time_step : float
+                Simulation time step, in days
+            rate : float
+                Simulated days per second of wall time (see steps())
+
+        RETURNS: int
+            Number of steps run
+        """
+        wanted = self.steps(frame_time, time_step, rate)
+        deadline = default_timer() + self._frame_budget
+        done = 0
+        while done + 1 <= wanted:
+            done += 1
+            if not step():
+                break
+            if default_timer() >= deadline:
+                break
+
+        self.consume(done)
+        return done
+
+    def consume(self, count):
+        """
+        Takes the steps run in a frame off the steps returned by steps()
+        Whole steps left over (out of time, or no more steps available) are dropped, only a fraction of a step is
+        carried over to the next frame
+
+        PARAMETERS:
+            count : int
+                Number of steps run
+        """
+        self._pending -= count
+        if not 0 <= self._pending < 1:
+            self._pending = 0.0
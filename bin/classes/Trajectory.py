@@ -0,0 +1,186 @@
+#!python2
+# coding: utf-8
+
+"""
+TRAJECTORY
+Class that defines the table of values of a simulation run
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+from array import array
+from itertools import izip
+from bin.classes.SpillColumn import CHUNK_ROWS, SpillColumn
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+class Trajectory(object):
+    """
+    Defines the values of a simulation run: a single time column, shared by every series, plus one value column per
+    series (arrays of doubles), so that every series is aligned with time by construction
+    Plots are views of its columns (see graphs.trajectory_plots())
+    Columns can keep only their most recent rows in memory, older rows being read from disk (see SpillColumn)
+    """
+    def __init__(self, series, initial_values, window=None):
+        """
+        Instantiates trajectory, with its initial row at time 0
+
+        PARAMETERS:
+            series : iterable[str]
+                Name of each series, in the order values are appended
+            initial_values : iterable[float]
+                Value of each series at time 0 (plots need a first point)
+            window : int or None
+                Rows of each column kept in memory, older rows are spilled to disk (None keeps every row in memory)
+        """
+        self._series = tuple(series)  # tuple[str]
+        self._initial_values = tuple(initial_values)  # tuple[float]
+        if len(self._initial_values) != len(self._series):
+            raise ValueError("one initial value per series is needed")
+        if window is None:
+            new_column = lambda: array('d')
+        else:
+            new_column = lambda: SpillColumn(window)
+        self._time = new_column()  # array[float] or SpillColumn
+        self._columns = dict((name, new_column()) for name in self._series)  # dict[array[float] or SpillColumn]
+        self._ordered_columns = [self._columns[name] for name in self._series]  # list[array[float] or SpillColumn]
+        self._listeners = []  # list[function]
+
+        self.reset()
+
+    def __len__(self):
+        """
+        RETURNS: int
+            Number of rows, including the initial one
+        """
+        return len(self._time)
+
+    def get_series(self):
+        """
+        Gets series names
+
+        RETURNS: tuple[str]
+            Name of each series, in the order values are appended
+        """
+        return self._series
+
+    def get_time(self):
+        """
+        Gets the time column (changes in place as rows are appended, do not modify)
+
+        RETURNS: array[float] or SpillColumn
+            Time of each row
+        """
+        return self._time
+
+    def get_column(self, series):
+        """
+        Gets the value column of a series (changes in place as rows are appended, do not modify)
+
+        PARAMETERS:
+            series : str
+                Series name
+
+        RETURNS: array[float] or SpillColumn
+            Value of the series in each row
+        """
+        return self._columns[series]
+
+    def bind(self, listener):
+        """
+        Registers a function to be called, without arguments, whenever rows are appended or removed
+
+        PARAMETERS:
+            listener : function
+                Function to call
+        """
+        self._listeners.append(listener)
+
+    def unbind(self, listener):
+        """
+        Unregisters a function registered by bind()
+
+        PARAMETERS:
+            listener : function
+                Function to stop calling
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def append(self, time, values, notify=True):
+        """
+        Appends a row
+
+        PARAMETERS:
+            time : float
+                Time, in days
+            values : iterable[float]
+                Value of each series, in the same order as get_series()
+            notify : bool
+                Whether listeners are called (False to append several rows and call notify() once)
+        """
+        values = tuple(values)
+        if len(values) != len(self._series):
+            raise ValueError("one value per series is needed")
+        self._time.append(time)
+        for column, value in izip(self._ordered_columns, values):
+            column.append(value)
+        if notify:
+            self.notify()
+
+    def reset(self):
+        """
+        Removes every row but the initial one
+        """
+        del self._time[:]
+        for column in self._ordered_columns:
+            del column[:]
+        self.append(0, self._initial_values)
+
+    def rows(self, start=0, series=None):
+        """
+        Iterates over rows, reading the columns a chunk of rows at a time (not one row at a time, nor every row at once)
+
+        PARAMETERS:
+            start : int
+                First row (1 skips the initial row)
+            series : iterable[str] or None
+                Series to include, in order (defaults to every series)
+
+        RETURNS: iterator[tuple[float]]
+            (time, value_1, value_2, ...) of each row
+        """
+        if series is None:
+            columns = self._ordered_columns
+        else:
+            columns = [self._columns[name] for name in series]
+        for chunk_start in xrange(start, len(self._time), CHUNK_ROWS):
+            chunk_stop = chunk_start + CHUNK_ROWS
+            for row in izip(self._time[chunk_start:chunk_stop],
+                            *[column[chunk_start:chunk_stop] for column in columns]):
+                yield row
+
+    def snapshot(self):
+        """
+        Gets a copy of the trajectory as it is now, unchanged by rows appended later or by a reset, that can be read
+        from another thread (see SpillColumn.snapshot(), rows on disk are not copied)
+
+        RETURNS: Trajectory
+            Copy of the trajectory (do not modify)
+        """
+        snapshot = Trajectory(self._series, self._initial_values)
+        snapshot._time = self._time.snapshot() if isinstance(self._time, SpillColumn) else self._time[:]
+        snapshot._columns = dict((name, column.snapshot() if isinstance(column, SpillColumn) else column[:])
+                                 for name, column in self._columns.iteritems())
+        snapshot._ordered_columns = [snapshot._columns[name] for name in self._series]
+        return snapshot
+
+    def notify(self):
+        """
+        Calls every listener
+        """
+        for listener in self._listeners:
+            listener()
@@ -0,0 +1,199 @@
+#!python2
+# coding: utf-8
+
+"""
+TRAJECTORY RECORDER
+Class that records a trajectory to a csv file while the simulation runs
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# temporary directory of the recording files, one per trajectory simulation run, one directory per session
+RECORDINGS_DIRECTORY = os.path.join(tempfile.gettempdir(), "simulate_recordings_" + str(os.getpid()))
+
+# bytes copied at a time from a running recording
+COPY_CHUNK_SIZE = 2**20
+
+
+def remove_recordings():
+    """
+    Removes the recording files that were not saved, and their directory (when the application exits, after every
+    recorder is released and every queued save is done)
+    """
+    shutil.rmtree(RECORDINGS_DIRECTORY, ignore_errors=True)
+
+
+def _copy_head(source, path, size):
+    # copies the first size bytes of a file (the part of a running recording written when it was saved)
+    with open(source, "rb") as source_file, open(path, "wb") as csv_file:
+        while size > 0:
+            data = source_file.read(min(size, COPY_CHUNK_SIZE))
+            if not data:
+                break
+            csv_file.write(data)
+            size -= len(data)
+
+
+def _remove(path):
+    # removes a recording file of a previous run, if it was not moved by a save
+    if os.path.isfile(path):
+        os.remove(path)
+
+
+def _write_header(path, header):
+    # writes a csv file with only the header
+    with open(path, "wb") as csv_file:
+        csv.writer(csv_file).writerow(header)
+
+
+class TrajectoryRecorder(object):
+    """
+    Records the rows of a trajectory to a csv file as they are appended (once per notification, so once per frame),
+    so that saving only has to move or copy the file, and a simulation that ends or crashes leaves a complete file
+    The initial row of the trajectory is not recorded, as it exists only to allow plot instantiation
+    Each simulation run is recorded to a new file, so that files of previous runs can still be moved or copied (by a
+    SaveWorker) while the next run is recorded
+    """
+    def __init__(self, trajectory, name, header, series=None, save_worker=None):
+        """
+        Instantiates recorder, listening to the trajectory (the file is created when the first rows are appended)
+
+        PARAMETERS:
+            trajectory : Trajectory
+                Trajectory to record
+            name : str
+                Name of the recording file, without extension, in RECORDINGS_DIRECTORY
+            header : list[str]
+                Csv header, time first
+            series : iterable[str] or None
+                Series to record, in order (defaults to every series)
+            save_worker : SaveWorker or None
+                Worker that moves, copies and removes recording files, in order (None does it right away)
+        """
+        self._trajectory = trajectory  # Trajectory
+        self._name = name  # str
+        self._run = 0  # int, simulation runs recorded
+        self._path = self._run_path()  # str
+        self._header = header  # list[str]
+        self._series = series  # iterable[str] or None
+        self._file = None  # file
+        self._csv_writer = None  # csv.writer
+        self._recorded = 1  # int, rows of the trajectory recorded (the initial row is never recorded)
+        self._closed = False  # bool, True after close(), until the trajectory is reset
+        self._saved_path = None  # str, where save() moved the recording file, after close()
+        self._save_worker = save_worker  # SaveWorker or None
+
+        trajectory.bind(self.record)
+
+    def get_path(self):
+        """
+        Gets the path of the recording file
+
+        RETURNS: str
+            Recording file path
+        """
+        return self._path
+
+    def _run_path(self):
+        # recording file path of the current run
+        return os.path.join(RECORDINGS_DIRECTORY, self._name + "_" + str(self._run) + ".csv")
+
+    def _file_work(self, function, *args):
+        # runs a function that moves, copies or removes files in the save worker, or right away if there is none
+        if self._save_worker is None:
+            function(*args)
+        else:
+            self._save_worker.put(function, *args)
+
+    def _open(self, mode):
+        # opens the recording file, "wb" writes the header of a new recording, "ab" continues the current one
+        if not os.path.isdir(RECORDINGS_DIRECTORY):
+            os.mkdir(RECORDINGS_DIRECTORY)
+        self._file = open(self._path, mode)
+        self._csv_writer = csv.writer(self._file)
+        if mode == "wb":
+            self._csv_writer.writerow(self._header)
+
+    def record(self):
+        """
+        Writes the rows appended to the trajectory since the last call to the recording file
+        Starts a new recording if the trajectory was reset
+        """
+        rows = len(self._trajectory)
+        if rows < self._recorded:
+            # trajectory reset, a new simulation run, recorded to a new file (the previous one is removed after any
+            # queued save of it)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._file_work(_remove, self._path)
+            self._run += 1
+            self._path = self._run_path()
+            self._recorded = 1
+            self._closed = False
+            self._saved_path = None
+        if rows == self._recorded:
+            return
+
+        if self._file is None:
+            self._open("wb" if self._recorded == 1 else "ab")
+        self._csv_writer.writerows(self._trajectory.rows(self._recorded, self._series))
+        self._file.flush()
+        self._recorded = rows
+
+    def close(self):
+        """
+        Writes the remaining rows and closes the recording file, when the simulation ends
+        """
+        self.record()
+        if self._file is None and self._recorded == 1:
+            # nothing recorded, an empty recording (header only)
+            self._open("wb")
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        self._closed = True
+
+    def release(self):
+        """
+        Closes the recording file without recording the remaining rows, when the application exits (see
+        remove_recordings())
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def save(self, path):
+        """
+        Saves the recording to a csv file: a closed recording is moved (no copy is made), a running (or paused) one is
+        copied, up to its current size, as it keeps growing
+        Files are moved or copied by the save worker, if there is one
+
+        PARAMETERS:
+            path : str
+                Csv file path
+        """
+        self.record()
+        if self._closed:
+            if self._saved_path is None:
+                self._file_work(shutil.move, self._path, path)
+            else:
+                self._file_work(shutil.copyfile, self._saved_path, path)
+            self._saved_path = path
+        elif self._file is not None:
+            self._file_work(_copy_head, self._path, path, self._file.tell())
+        else:
+            # nothing recorded yet, header only
+            self._file_work(_write_header, path, self._header)
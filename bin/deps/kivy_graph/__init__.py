@@ -27,7 +27,8 @@ a red line plot containing a sin wave on this range::
 
 The MeshLinePlot plot is a particular plot which draws a set of points using
 a mesh object. The points are given as a list of tuples, with each tuple
-being a (x, y) coordinate in the graph's units.
+being a (x, y) coordinate in the graph's units, and are stored by the plot in
+a :class:`PointList` (two columns of doubles).
 
 You can create different types of plots other than MeshLinePlot by inheriting
 from the Plot class and implementing the required functions. The Graph object
@@ -50,10 +51,11 @@ The current availables plots are:
 
 '''
 
-__all__ = ('Graph', 'Plot', 'MeshLinePlot', 'MeshStemPlot', 'LinePlot', 'SmoothLinePlot', 'ContourPlot')
+__all__ = ('Graph', 'Plot', 'PointList', 'RenderScheduler', 'MeshLinePlot', 'MeshStemPlot', 'LinePlot', 'SmoothLinePlot', 'ContourPlot')
 __version__ = '0.4-dev'
 
 from math import radians
+from array import array
 from kivy.uix.widget import Widget
 from kivy.uix.label import Label
 from kivy.uix.stencilview import StencilView
@@ -74,6 +76,10 @@ try:
     import numpy as np
 except ImportError as e:
     np = None
+try:
+    from itertools import izip
+except ImportError:
+    izip = zip
 
 
 def identity(x):
@@ -101,8 +107,75 @@ class RotateLabel(Label):
     transform = ObjectProperty(Matrix())
 
 
+class RenderScheduler(object):
+    '''Coalesces the graph relayouts and plot draws requested during a frame,
+    across all graphs: each requested callback is called once, just before
+    the frame is drawn (after the data and axis changes of the frame), the
+    relayouts first, as they update the params of the plots, then the draws.
+
+    A request for a callback that is already pending is skipped, and counted
+    in :attr:`skipped`. :attr:`layouts` and :attr:`draws` count the callbacks
+    called.
+
+    The scheduler used by :class:`Graph` and :class:`Plot` is
+    `render_scheduler`.
+    '''
+
+    def __init__(self):
+        self.layouts = 0
+        self.draws = 0
+        self.skipped = 0
+        self._pending_layouts = []
+        self._pending_draws = []
+        self._pending = set()
+        self._trigger = Clock.create_trigger(self.flush, -1)
+
+    def request_layout(self, callback):
+        '''Requests a call to callback (a graph relayout) before the next
+        frame.
+        '''
+        self._request(self._pending_layouts, callback)
+
+    def request_draw(self, callback):
+        '''Requests a call to callback (a plot draw) before the next frame,
+        after the relayouts.
+        '''
+        self._request(self._pending_draws, callback)
+
+    def _request(self, pending, callback):
+        if callback in self._pending:
+            self.skipped += 1
+            return
+        self._pending.add(callback)
+        pending.append(callback)
+        self._trigger()
+
+    def flush(self, *largs):
+        '''Calls the pending callbacks, relayouts first. Requests made by the
+        relayouts are called in the same flush, the others in the next one.
+        '''
+        layouts = self._pending_layouts
+        self._pending_layouts = []
+        for callback in layouts:
+            self._pending.discard(callback)
+            callback()
+        self.layouts += len(layouts)
+
+        draws = self._pending_draws
+        self._pending_draws = []
+        for callback in draws:
+            self._pending.discard(callback)
+            callback()
+        self.draws += len(draws)
+
+
+render_scheduler = RenderScheduler()
+
+
 class Graph(Widget):
     '''Graph class, see module documentation for more information.
+
+    Relayouts are done by :data:`render_scheduler`, at most once per frame.
     '''
 
     # triggers a full reload of graphics
@@ -129,6 +202,12 @@ class Graph(Widget):
     _ticks_minorx = ListProperty([])
     _ticks_majory = ListProperty([])
     _ticks_minory = ListProperty([])
+    # tick mark labels removed from the graph, kept to be reused
+    _label_pool = ListProperty([])
+    # tick locations of each axis setting, shared by all graphs, as the same
+    # ranges come back (e.g. when an axis grows back after being reset)
+    _ticks_cache = {}
+    _ticks_cache_size = 128
 
     tick_color = ListProperty([.25, .25, .25, 1])
     '''Color of the grid/ticks, default to 1/4. grey.
@@ -182,8 +261,8 @@ class Graph(Widget):
         self._plot_area = StencilView()
         self.add_widget(self._plot_area)
 
-        t = self._trigger = Clock.create_trigger(self._redraw_all)
-        ts = self._trigger_size = Clock.create_trigger(self._redraw_size)
+        t = self._trigger = self._ask_redraw_all
+        ts = self._trigger_size = self._ask_redraw_size
         tc = self._trigger_color = Clock.create_trigger(self._update_colors)
 
         self.bind(center=ts, padding=ts, precision=ts, plots=ts, x_grid=ts,
@@ -195,6 +274,12 @@ class Graph(Widget):
         self.bind(tick_color=tc, background_color=tc, border_color=tc)
         self._trigger()
 
+    def _ask_redraw_all(self, *largs):
+        render_scheduler.request_layout(self._redraw_all)
+
+    def _ask_redraw_size(self, *largs):
+        render_scheduler.request_layout(self._redraw_size)
+
     def add_widget(self, widget):
         if widget is self._plot_area:
             canvas = self.canvas
@@ -212,6 +297,17 @@ class Graph(Widget):
             self.canvas = canvas
 
     def _get_ticks(self, major, minor, log, s_min, s_max):
+        key = (major, minor, log, s_min, s_max)
+        ticks = Graph._ticks_cache.get(key)
+        if ticks is None:
+            ticks = self._compute_ticks(major, minor, log, s_min, s_max)
+            ticks = tuple(ticks[0]), tuple(ticks[1])
+            if len(Graph._ticks_cache) >= Graph._ticks_cache_size:
+                Graph._ticks_cache.clear()
+            Graph._ticks_cache[key] = ticks
+        return list(ticks[0]), list(ticks[1])
+
+    def _compute_ticks(self, major, minor, log, s_min, s_max):
         if major and s_max > s_min:
             if log:
                 s_min = log10(s_min)
@@ -304,6 +400,32 @@ class Graph(Widget):
             points_minor = []
         return points_major, points_minor
 
+    @staticmethod
+    def _set_label_text(label, text):
+        # renders the label texture only when its text changes
+        if label.text != text:
+            label.text = text
+            label.texture_update()
+
+    def _set_grid_labels(self, grids, n_labels):
+        # adds/removes tick mark labels until there are n_labels of them,
+        # removed labels are pooled and reused instead of created again
+        pool = self._label_pool
+        for k in range(n_labels, len(grids)):
+            self.remove_widget(grids[k])
+            pool.append(grids[k])
+        del grids[n_labels:]
+        while len(grids) < n_labels:
+            if pool:
+                label = pool.pop()
+                label.font_size = self.font_size
+                # rendered again when its text is set
+                label.text = ''
+            else:
+                label = Label(font_size=self.font_size, **self.label_options)
+            grids.append(label)
+            self.add_widget(label)
+
     def _update_labels(self):
         xlabel = self._xlabel
         ylabel = self._ylabel
@@ -346,8 +468,7 @@ class Graph(Widget):
             # horizontal size of the largest tick label, to have enough room
             funcexp = exp10 if self.ylog else identity
             funclog = log10 if self.ylog else identity
-            ylabels[0].text = precision % funcexp(ypoints[0])
-            ylabels[0].texture_update()
+            self._set_label_text(ylabels[0], precision % funcexp(ypoints[0]))
             y1 = ylabels[0].texture_size
             y_start = y_next + (padding + y1[1] if len(xlabels) and xlabel_grid
                                 else 0) + \
@@ -359,8 +480,8 @@ class Graph(Widget):
             y_start -= y1[1] / 2.
             y1 = y1[0]
             for k in range(len(ylabels)):
-                ylabels[k].text = precision % funcexp(ypoints[k])
-                ylabels[k].texture_update()
+                self._set_label_text(ylabels[k],
+                                     precision % funcexp(ypoints[k]))
                 ylabels[k].size = ylabels[k].texture_size
                 y1 = max(y1, ylabels[k].texture_size[0])
                 ylabels[k].pos = tuple(map(int, (x_next, y_start +
@@ -373,21 +494,20 @@ class Graph(Widget):
             funcexp = exp10 if self.xlog else identity
             funclog = log10 if self.xlog else identity
             # find the distance from the end that'll fit the last tick label
-            xlabels[0].text = precision % funcexp(xpoints[-1])
-            xlabels[0].texture_update()
+            self._set_label_text(xlabels[0], precision % funcexp(xpoints[-1]))
             xextent = x + width - xlabels[0].texture_size[0] / 2. - padding
             # find the distance from the start that'll fit the first tick label
             if not x_next:
-                xlabels[0].text = precision % funcexp(xpoints[0])
-                xlabels[0].texture_update()
+                self._set_label_text(xlabels[0],
+                                     precision % funcexp(xpoints[0]))
                 x_next = padding + xlabels[0].texture_size[0] / 2.
             xmin = funclog(xmin)
             ratio = (xextent - x_next) / float(funclog(self.xmax) - xmin)
             right = -1
             for k in range(len(xlabels)):
-                xlabels[k].text = precision % funcexp(xpoints[k])
                 # update the size so we can center the labels on ticks
-                xlabels[k].texture_update()
+                self._set_label_text(xlabels[k],
+                                     precision % funcexp(xpoints[k]))
                 xlabels[k].size = xlabels[k].texture_size
                 xlabels[k].pos = tuple(map(int, (x_next + (xpoints[k] - xmin)
                     * ratio - xlabels[k].texture_size[0] / 2., y_next)))
@@ -532,14 +652,7 @@ class Graph(Widget):
             n_labels = 0
         else:
             n_labels = len(xpoints_major)
-        for k in range(n_labels, len(grids)):
-            self.remove_widget(grids[k])
-        del grids[n_labels:]
-        grid_len = len(grids)
-        grids.extend([None] * (n_labels - len(grids)))
-        for k in range(grid_len, n_labels):
-            grids[k] = Label(font_size=font_size, **self.label_options)
-            self.add_widget(grids[k])
+        self._set_grid_labels(grids, n_labels)
 
         if self.ylabel:
             if not self._ylabel:
@@ -562,20 +675,15 @@ class Graph(Widget):
             n_labels = 0
         else:
             n_labels = len(ypoints_major)
-        for k in range(n_labels, len(grids)):
-            self.remove_widget(grids[k])
-        del grids[n_labels:]
-        grid_len = len(grids)
-        grids.extend([None] * (n_labels - len(grids)))
-        for k in range(grid_len, n_labels):
-            grids[k] = Label(font_size=font_size, **self.label_options)
-            self.add_widget(grids[k])
+        self._set_grid_labels(grids, n_labels)
 
         mesh = self._mesh_ticks
         n_points = (len(xpoints_major) + len(xpoints_minor) +
                     len(ypoints_major) + len(ypoints_minor))
-        mesh.vertices = [0] * (n_points * 8)
-        mesh.indices = [k for k in range(n_points * 2)]
+        # reallocated only when the number of ticks changes
+        if len(mesh.vertices) != n_points * 8:
+            mesh.vertices = [0] * (n_points * 8)
+            mesh.indices = [k for k in range(n_points * 2)]
         self._redraw_size()
 
     def _redraw_size(self, *args):
@@ -872,6 +980,130 @@ class Graph(Widget):
     '''
 
 
+class PointList(object):
+    '''Sequence of (x, y) points stored as two columns of doubles, `xs` and
+    `ys` (:class:`array.array`, which grow in amortized constant time), used
+    by :data:`Plot.points`.
+
+    Indexing returns an (x, y) tuple and slicing a list of tuples, so it can
+    be used as the list of tuples it replaces; columns can be read (and
+    sliced) directly through `xs` and `ys`, without creating a tuple per
+    point. Each point takes 16 bytes and no Python objects.
+
+    Existing columns can be given as `xs` and `ys`, to make the point list a
+    view of them (e.g. several plots sharing a single x column). Points of a
+    view are then added to the columns by their owner, which calls
+    :meth:`changed` afterwards, instead of through the view.
+
+    The log10 of the columns, used by log axis, are kept in two more columns
+    (see :meth:`log_xs`), so that each log is computed once per point rather
+    than once per point per draw.
+
+    Columns only need to support the part of the :class:`array.array`
+    interface used here (len, indexing, slicing into an array, iteration,
+    append, extend and `del column[:]`); columns with a `new_column()`
+    method (e.g. columns that spill older values to disk) use it to create
+    the log columns.
+    '''
+
+    # number of values read at a time when extending the log columns
+    log_chunk = 2 ** 14
+
+    def __init__(self, points=(), callback=None, xs=None, ys=None):
+        self.xs = array('d') if xs is None else xs
+        self.ys = array('d') if ys is None else ys
+        # log10 of xs and ys, extended when read
+        self._log_xs = self._new_column(self.xs)
+        self._log_ys = self._new_column(self.ys)
+        # called whenever points are added or removed
+        self.callback = None
+        self.extend(points)
+        self.callback = callback
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __iter__(self):
+        return izip(self.xs, self.ys)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(izip(self.xs[index], self.ys[index]))
+        return self.xs[index], self.ys[index]
+
+    def __repr__(self):
+        return 'PointList(%r)' % (list(self),)
+
+    def append(self, point):
+        x, y = point
+        self.xs.append(x)
+        self.ys.append(y)
+        self.changed()
+
+    def extend(self, points):
+        if isinstance(points, PointList):
+            self.xs.extend(points.xs)
+            self.ys.extend(points.ys)
+        else:
+            xs = self.xs
+            ys = self.ys
+            for x, y in points:
+                xs.append(x)
+                ys.append(y)
+        self.changed()
+
+    def extend_columns(self, xs, ys):
+        '''Appends the points of two equally long sequences of x and y
+        values.
+        '''
+        if len(xs) != len(ys):
+            raise ValueError('xs and ys must have the same length')
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        self.changed()
+
+    def clear(self):
+        del self.xs[:]
+        del self.ys[:]
+        self.changed()
+
+    def changed(self):
+        '''Lets the callback know that points were added or removed.
+        '''
+        if len(self._log_xs) > len(self.xs):
+            del self._log_xs[:]
+        if len(self._log_ys) > len(self.ys):
+            del self._log_ys[:]
+        if self.callback is not None:
+            self.callback()
+
+    def log_xs(self):
+        '''Returns the log10 of the x values, as an :class:`array.array`
+        (changes in place as points are added, do not modify). The log of
+        each value is computed once, the first time it is read.
+        '''
+        return self._log_column(self.xs, self._log_xs)
+
+    def log_ys(self):
+        '''Returns the log10 of the y values, see :meth:`log_xs`.
+        '''
+        return self._log_column(self.ys, self._log_ys)
+
+    def _log_column(self, column, logs):
+        if len(logs) > len(column):
+            del logs[:]
+        while len(logs) < len(column):
+            logs.extend(map(log10, column[len(logs):len(logs) +
+                                          self.log_chunk]))
+        return logs
+
+    @staticmethod
+    def _new_column(column):
+        # empty column of the same kind as column
+        new_column = getattr(column, 'new_column', None)
+        return new_column() if new_column is not None else array('d')
+
+
 class Plot(EventDispatcher):
     '''Plot class, see module documentation for more information.
 
@@ -894,22 +1126,55 @@ class Plot(EventDispatcher):
     '''Color of the plot.
     '''
 
-    points = ListProperty([])
-    '''List of (x, y) points to be displayed in the plot.
-
-    The elements of points are 2-tuples, (x, y). The points are displayed
+    def _get_points(self):
+        return self._points
+
+    def _set_points(self, points):
+        if points is self._points:
+            return True
+        if isinstance(points, PointList):
+            # shared, not copied
+            points.callback = self._points.callback
+            self._points.callback = None
+            self._points = points
+            return True
+        callback = self._points.callback
+        self._points.callback = None
+        self._points.clear()
+        self._points.extend(points)
+        self._points.callback = callback
+        return True
+
+    points = AliasProperty(_get_points, _set_points)
+    ''':class:`PointList` of the (x, y) points to be displayed in the plot.
+
+    Points are added with `points.append((x, y))` (or `extend`), and can be
+    replaced by assigning any iterable of 2-tuples, (x, y), which is copied,
+    or a :class:`PointList`, which is used as is. The points are displayed
     based on the mode setting.
 
-    :data:`points` is a :class:`~kivy.properties.ListProperty`, defaults to
-    [].
+    :data:`points` is a :class:`~kivy.properties.AliasProperty`, defaults to
+    an empty :class:`PointList`.
     '''
 
     def __init__(self, **kwargs):
+        self._points = PointList()
         super(Plot, self).__init__(**kwargs)
-        self.ask_draw = Clock.create_trigger(self.draw)
+        self._points.callback = self._dispatch_points
         self.bind(params=self.ask_draw, points=self.ask_draw)
         self._drawings = self.create_drawings()
 
+    def _dispatch_points(self):
+        # points were added or removed in place
+        self.property('points').dispatch(self)
+
+    def ask_draw(self, *largs):
+        '''Requests a draw of the plot before the next frame, from
+        :data:`render_scheduler`, so that the plot is drawn at most once per
+        frame.
+        '''
+        render_scheduler.request_draw(self.draw)
+
     # this function is called by graph whenever any of the parameters
     # change. The plot should be recalculated then.
     # log, min, max indicate the axis settings.
@@ -955,10 +1220,74 @@ class Plot(EventDispatcher):
         size = params['size']
         ratiox = (size[2] - size[0]) / float(funcx(params['xmax']) - xmin)
         ratioy = (size[3] - size[1]) / float(funcy(params['ymax']) - ymin)
-        for x, y in self.points:
+        xs, ys = self._columns(params)
+        for x, y in izip(xs, ys):
             yield (
-                (funcx(x) - xmin) * ratiox + size[0],
-                (funcy(y) - ymin) * ratioy + size[1])
+                (x - xmin) * ratiox + size[0],
+                (y - ymin) * ratioy + size[1])
+
+    def _columns(self, params):
+        # x and y columns of the points, in the scale of the axis (the log
+        # columns are cached by the points)
+        points = self.points
+        xs = points.log_xs() if params['xlog'] else points.xs
+        ys = points.log_ys() if params['ylog'] else points.ys
+        return xs, ys
+
+    transform_chunk = 2 ** 14
+    '''Number of points transformed at a time by
+    :meth:`iterate_transformed`.
+    '''
+
+    def transform_points(self, start=0, params=None, stop=None):
+        '''Returns the flattened list [x0, y0, x1, y1, ...] of the points
+        from index start on (up to index stop, excluded), adjusted to the
+        graph settings (same as iterate_points), or to the given params.
+        Reads the columns of the points directly (the log columns, for log
+        axis).
+        '''
+        if params is None:
+            params = self._params
+        funcx = log10 if params['xlog'] else identity
+        funcy = log10 if params['ylog'] else identity
+        xmin = funcx(params['xmin'])
+        ymin = funcy(params['ymin'])
+        size = params['size']
+        x0 = size[0]
+        y0 = size[1]
+        ratiox = (size[2] - size[0]) / float(funcx(params['xmax']) - xmin)
+        ratioy = (size[3] - size[1]) / float(funcy(params['ymax']) - ymin)
+        xs, ys = self._columns(params)
+        xs = xs[start:stop]
+        ys = ys[start:stop]
+        if np is not None and len(xs):
+            # same affine transform, on (transient) numpy views of the columns
+            flat = np.empty(2 * len(xs))
+            flat[0::2] = np.frombuffer(xs)
+            flat[1::2] = np.frombuffer(ys)
+            flat[0::2] -= xmin
+            flat[0::2] *= ratiox
+            flat[0::2] += x0
+            flat[1::2] -= ymin
+            flat[1::2] *= ratioy
+            flat[1::2] += y0
+            return flat.tolist()
+        flat = []
+        append = flat.append
+        for x, y in izip(xs, ys):
+            append((x - xmin) * ratiox + x0)
+            append((y - ymin) * ratioy + y0)
+        return flat
+
+    def iterate_transformed(self, start=0, params=None):
+        '''Iterates on :meth:`transform_points` of the points from index
+        start on, :attr:`transform_chunk` points at a time, so that the
+        flattened list of every point is never built at once.
+        '''
+        for chunk_start in range(start, len(self.points),
+                                 self.transform_chunk):
+            yield self.transform_points(
+                chunk_start, params, chunk_start + self.transform_chunk)
 
     def on_clear_plot(self, *largs):
         pass
@@ -1000,9 +1329,10 @@ class MeshLinePlot(Plot):
         elif diff > 0:
             ind.extend(range(len(ind), len(ind) + diff))
             vert.extend([0] * (diff * 4))
+        xs, ys = self._columns(params)
         for k in range(len(points)):
-            vert[k * 4] = (funcx(points[k][0]) - xmin) * ratiox + size[0]
-            vert[k * 4 + 1] = (funcy(points[k][1]) - ymin) * ratioy + size[1]
+            vert[k * 4] = (xs[k] - xmin) * ratiox + size[0]
+            vert[k * 4 + 1] = (ys[k] - ymin) * ratioy + size[1]
         mesh.vertices = vert
 
     def _set_mode(self, value):
@@ -1044,48 +1374,254 @@ class MeshStemPlot(MeshLinePlot):
         elif diff > 0:
             ind.extend(range(len(ind), len(ind) + diff))
             vert.extend([0] * (diff * 4))
+        xs, ys = self._columns(params)
         for k in range(len(points)):
-            vert[k * 8] = (funcx(points[k][0]) - xmin) * ratiox + size[0]
+            vert[k * 8] = (xs[k] - xmin) * ratiox + size[0]
             vert[k * 8 + 1] = (0 - ymin) * ratioy + size[1]
-            vert[k * 8 + 4] = (funcx(points[k][0]) - xmin) * ratiox + size[0]
-            vert[k * 8 + 5] = (funcy(points[k][1]) - ymin) * ratioy + size[1]
+            vert[k * 8 + 4] = (xs[k] - xmin) * ratiox + size[0]
+            vert[k * 8 + 5] = (ys[k] - ymin) * ratioy + size[1]
         mesh.vertices = vert
 
 
 class LinePlot(Plot):
     '''LinePlot draws using a standard Line object.
+
+    Points are drawn incrementally: when points are only appended and the
+    graph settings (`params`) did not change since the last draw, only the
+    new points are transformed. The line is split in segments of at most
+    `segment_points` points (consecutive segments share their end points),
+    so that only the last, open, segment is uploaded again.
+
+    If `decimation` is True, only the lowest and highest point of each pixel
+    column are drawn (in the order they were added), so the number of
+    vertices is bounded by the plot width rather than by the number of
+    points. Columns are completed as points arrive; the column of the last
+    point stays open until a point falls in the next one.
+
+    When only the axis ranges or the graph size change (e.g. the axis grows
+    while points are added), the points already drawn are not transformed
+    again: a matrix maps them from the settings they were drawn with to the
+    new ones, on the GPU, and new points keep being drawn with the old
+    settings. As the matrix also scales the line width, everything is drawn
+    again with the new settings `rebase_delay` seconds later.
     '''
     
     '''Args:
     line_width (float) - the width of the graph line
     '''
+
+    segment_points = 512
+    '''Maximum number of points of each Line instruction.
+    '''
+
+    decimation = True
+    '''Whether to draw only the min/max points of each pixel column.
+    '''
+
+    rebase_delay = .5
+    '''Seconds after a rescale until the points are drawn again with the
+    new settings, at most once per delay while the axis keep changing.
+    '''
+
     def __init__(self, **kwargs):
         self._line_width = kwargs.get('line_width', 1)
+        # params the points were drawn with (params of the last full draw),
+        # number of points, first and last point of the last draw
+        self._drawn_params = None
+        self._drawn_count = 0
+        self._drawn_first = None
+        self._drawn_last = None
+        # flattened screen coordinates of the open (last) segment
+        self._open_segment = []
+        # pixel column being decimated, its lowest and highest points
+        # (x, y, order) and the number of coordinates decimated so far
+        self._column = None
+        self._column_low = None
+        self._column_high = None
+        self._decimated = 0
+        # params the transform matrix maps the drawn points to
+        self._transform_params = None
         super(LinePlot, self).__init__(**kwargs)
+        self._ask_rebase = Clock.create_trigger(self._rebase,
+                                                self.rebase_delay)
     
     def create_drawings(self):
-        from kivy.graphics import Line, RenderContext
+        from kivy.graphics import RenderContext, MatrixInstruction
 
         self._grc = RenderContext(
                 use_parent_modelview=True,
                 use_parent_projection=True)
         with self._grc:
             self._gcolor = Color(*self.color)
-            self._gline = Line(points=[], cap='none', width=self._line_width, joint='round')
+            self._gtransform = MatrixInstruction()
+            self._gline = self.create_line()
+        self._glines = [self._gline]
 
         return [self._grc]
-    
+
+    def create_line(self):
+        '''Returns a new, empty, Line instruction for a segment of the plot.
+        '''
+        from kivy.graphics import Line
+
+        return Line(points=[], cap='none', width=self._line_width,
+                    joint='round')
+
+    def _set_segments(self, flat):
+        # (re)distributes all the screen coordinates among the segments
+        step = 2 * (self.segment_points - 1)
+        segments = [flat[k:k + step + 2]
+                    for k in range(0, max(len(flat) - 2, 1), step)]
+        lines = self._glines
+        while len(lines) > len(segments):
+            self._grc.remove(lines.pop())
+        while len(lines) < len(segments):
+            lines.append(self.create_line())
+            self._grc.add(lines[-1])
+        for line, segment in zip(lines, segments):
+            line.points = segment
+        self._open_segment = segments[-1]
+        lines[-1].points = segments[-1] + self._column_points()
+
+    def _extend_segments(self, flat):
+        # appends screen coordinates to the open segment, closing it (and
+        # opening new ones) when it is full
+        open_segment = self._open_segment
+        open_segment.extend(flat)
+        lines = self._glines
+        size = 2 * self.segment_points
+        while len(open_segment) > size:
+            lines[-1].points = open_segment[:size]
+            open_segment = open_segment[size - 2:]
+            lines.append(self.create_line())
+            self._grc.add(lines[-1])
+        self._open_segment = open_segment
+        lines[-1].points = open_segment + self._column_points()
+
+    def _column_points(self):
+        # flattened min/max points of the open pixel column, in order
+        low = self._column_low
+        high = self._column_high
+        if low is None:
+            return []
+        if low is high:
+            return [low[0], low[1]]
+        if low[2] < high[2]:
+            return [low[0], low[1], high[0], high[1]]
+        return [high[0], high[1], low[0], low[1]]
+
+    def _decimate(self, flat):
+        # feeds screen coordinates to the pixel columns, returns the
+        # flattened min/max points of every column completed by them
+        done = []
+        column = self._column
+        low = self._column_low
+        high = self._column_high
+        order = self._decimated
+        for k in range(0, len(flat), 2):
+            x = flat[k]
+            y = flat[k + 1]
+            if int(floor(x)) != column:
+                if low is not None:
+                    done.extend(self._column_points())
+                column = int(floor(x))
+                low = high = self._column_low = self._column_high = (
+                    x, y, order + k)
+            elif y < low[1]:
+                low = self._column_low = (x, y, order + k)
+            elif y > high[1]:
+                high = self._column_high = (x, y, order + k)
+        self._column = column
+        self._decimated += len(flat)
+        return done
+
+    def _reset_columns(self):
+        self._column = None
+        self._column_low = None
+        self._column_high = None
+        self._decimated = 0
+
+    @staticmethod
+    def _rescalable(drawn, params):
+        # whether points drawn with the drawn params can be mapped to params
+        # by a matrix (the axis types are the same, and the drawn area is
+        # not empty)
+        size = drawn['size']
+        return (drawn['xlog'] == params['xlog'] and
+                drawn['ylog'] == params['ylog'] and
+                size[2] > size[0] and size[3] > size[1])
+
+    @staticmethod
+    def _rescale_matrix(drawn, params):
+        # matrix mapping the screen coordinates of points drawn with the
+        # drawn params to the ones they have with params
+        scale = []
+        offset = []
+        for log, low, high, axis in (('xlog', 'xmin', 'xmax', 0),
+                                     ('ylog', 'ymin', 'ymax', 1)):
+            func = log10 if params[log] else identity
+            old_min = func(drawn[low])
+            new_min = func(params[low])
+            old_ratio = ((drawn['size'][axis + 2] - drawn['size'][axis]) /
+                         float(func(drawn[high]) - old_min))
+            new_ratio = ((params['size'][axis + 2] - params['size'][axis]) /
+                         float(func(params[high]) - new_min))
+            scale.append(new_ratio / old_ratio)
+            offset.append(params['size'][axis] - drawn['size'][axis] *
+                          scale[-1] + (old_min - new_min) * new_ratio)
+        return Matrix().scale(scale[0], scale[1], 1).translate(
+            offset[0], offset[1], 0)
+
+    def _rebase(self, *largs):
+        # draws everything again with the current params
+        self._drawn_params = None
+        self.ask_draw()
+
     def draw(self, *args):
         super(LinePlot, self).draw(*args)
-        # flatten the list
-        points = []
-        for x, y in self.iterate_points():
-            points += [x, y]
-        self._gline.points = points
+        points = self.points
+        params = dict(self._params)
+        drawn = self._drawn_params
+        count = self._drawn_count
+        appended = (drawn is not None and
+                    (params == drawn or self._rescalable(drawn, params)) and
+                    0 < count <= len(points) and
+                    points[0] == self._drawn_first and
+                    points[count - 1] == self._drawn_last)
+        if appended:
+            # only the axis ranges or the size may have changed, new points
+            # are drawn with the same params as the old ones
+            if params != self._transform_params:
+                self._gtransform.matrix = self._rescale_matrix(drawn, params)
+                self._transform_params = params
+                if params != drawn:
+                    self._ask_rebase()
+            if count < len(points):
+                flat = self.transform_points(count, drawn)
+                if self.decimation:
+                    flat = self._decimate(flat)
+                self._extend_segments(flat)
+        else:
+            # settings changed or points were replaced, draw everything,
+            # decimating a chunk of points at a time
+            self._reset_columns()
+            flat = []
+            for chunk in self.iterate_transformed():
+                flat.extend(self._decimate(chunk) if self.decimation
+                            else chunk)
+            self._set_segments(flat)
+            self._gtransform.matrix = Matrix()
+            self._drawn_params = params
+            self._transform_params = params
+        self._drawn_count = len(points)
+        self._drawn_first = points[0] if len(points) else None
+        self._drawn_last = points[-1] if len(points) else None
+
         
-class SmoothLinePlot(Plot):
+class SmoothLinePlot(LinePlot):
     '''Smooth Plot class, see module documentation for more information.
     This plot use a specific Fragment shader for a custom anti aliasing.
+    Drawn incrementally, see :class:`LinePlot`.
     '''
 
     SMOOTH_FS = '''
@@ -1114,7 +1650,7 @@ class SmoothLinePlot(Plot):
         b"\x08\x08\x08\x00\x00\x00")
 
     def create_drawings(self):
-        from kivy.graphics import Line, RenderContext
+        from kivy.graphics import RenderContext, MatrixInstruction
 
         # very first time, create a texture for the shader
         if not hasattr(SmoothLinePlot, '_texture'):
@@ -1128,23 +1664,22 @@ class SmoothLinePlot(Plot):
                 use_parent_projection=True)
         with self._grc:
             self._gcolor = Color(*self.color)
-            self._gline = Line(points=[], cap='none', width=2.,
-                    texture=SmoothLinePlot._texture)
+            self._gtransform = MatrixInstruction()
+            self._gline = self.create_line()
+        self._glines = [self._gline]
 
         return [self._grc]
 
+    def create_line(self):
+        from kivy.graphics import Line
+
+        return Line(points=[], cap='none', width=2.,
+                    texture=SmoothLinePlot._texture)
+
     @staticmethod
     def _smooth_reload_observer(texture):
         texture.blit_buffer(SmoothLinePlot.GRADIENT_DATA, colorfmt="rgb")
 
-    def draw(self, *args):
-        super(SmoothLinePlot, self).draw(*args)
-        # flatten the list
-        points = []
-        for x, y in self.iterate_points():
-            points += [x, y]
-        self._gline.points = points
-
 
 class ContourPlot(Plot):
     """
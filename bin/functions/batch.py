@@ -0,0 +1,435 @@
+#!python2
+# coding: utf-8
+
+"""
+BATCH
+Vectorized equations
+Scenario 1 equations advance many parameter sets (virtual patients) at once: each variable and parameter is a NumPy
+array with one element per parameter set, so each time step costs one vector operation per term of the equations in
+equations.py, instead of one interpreter round-trip per parameter set
+Scenario 2 equations keep bacteria densities and nutrient concentrations as vectors (one element per genus) and
+antibiotic inhibition as a genus x antibiotic matrix, so antibiotic pressure is a single matrix-vector product
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy
+    - SciPy (optional, for sparse inhibition matrices)
+"""
+
+import numpy as np
+from bin.classes.Scenario1Parameters import Scenario1Parameters
+from bin.classes.Scenario2Parameters import ANTIBIOTICS
+from bin.functions.engine import SCENARIO_2_DEATH_FREQUENCY, SCENARIO_2_DEAD_VALUE
+from bin.functions.equations import nutrient_concentration_eq
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# treatment type codes, as used in the "treatment_type" parameter array
+CLASSIC = 0
+ADAPTIVE = 1
+USER = 2
+TREATMENT_CODES = {"Classic": CLASSIC, "Adaptive": ADAPTIVE, "User": USER}
+
+# outcome codes
+OUTCOME_NONE = 0
+OUTCOME_HOST_DEATH = 1
+OUTCOME_BACTERIA_DEATH = 2
+
+# state rows, in order
+STATE_VARIABLES = ("sensitive", "resistant", "naive_precursor", "effector", "memory")
+
+
+def batch_parameters(parameter_sets=None, size=None, **arrays):
+    """
+    Builds the parameter arrays used by every batch function
+    Parameters can come from a list of Scenario1Parameters, from arrays (or scalars) given as kwargs, or both (kwargs
+    override the values taken from parameter_sets)
+
+    PARAMETERS:
+        parameter_sets : list[Scenario1Parameters] or None
+            One Scenario1Parameters per element of the batch
+        size : int or None
+            Number of parameter sets, needed when parameter_sets is None and every kwarg is a scalar
+        arrays : kwargs
+            Any Scenario1Parameters field (except time_step), as a scalar or array with one value per parameter set
+            treatment_type may be given as a code (CLASSIC, ADAPTIVE, USER) or as 'Classic', 'Adaptive' or 'User'
+
+    RETURNS: dict[numpy.ndarray]
+        {"parameter_name": array, ...}, every array with the same length
+    """
+    if parameter_sets is not None:
+        size = len(parameter_sets)
+        values = dict((field, [getattr(parameters, field) for parameters in parameter_sets])
+                      for field in Scenario1Parameters.FIELDS if field != "time_step")
+    else:
+        default_parameters = Scenario1Parameters()
+        values = dict((field, getattr(default_parameters, field))
+                      for field in Scenario1Parameters.FIELDS if field != "time_step")
+    values.update(arrays)
+
+    if size is None:
+        size = max(np.size(value) for value in values.itervalues())
+
+    treatment_type = values["treatment_type"]
+    if isinstance(treatment_type, basestring):
+        treatment_type = TREATMENT_CODES[treatment_type]
+    elif np.size(treatment_type) and isinstance(np.ravel(treatment_type)[0], basestring):
+        treatment_type = [TREATMENT_CODES[treatment] for treatment in treatment_type]
+    values["treatment_type"] = treatment_type
+
+    parameters = {}
+    for field, value in values.iteritems():
+        dtype = bool if field == "user_administer" else int if field == "treatment_type" else float
+        parameters[field] = np.array(np.broadcast_to(np.asarray(value, dtype=dtype), (size,)))
+
+    return parameters
+
+
+def initial_state(parameters):
+    """
+    Builds the initial state of a batch
+
+    PARAMETERS:
+        parameters : dict[numpy.ndarray]
+            Parameter arrays, as returned by batch_parameters()
+
+    RETURNS: numpy.ndarray
+        Array of shape (5, N), rows in the order of STATE_VARIABLES
+    """
+    size = parameters["sensitive_initial_density"].shape[0]
+    state = np.zeros((len(STATE_VARIABLES), size))
+    state[0] = parameters["sensitive_initial_density"]
+    state[1] = parameters["resistant_initial_density"]
+    state[2] = parameters["initial_precursor_cell_density"]
+    return state
+
+
+def antibiotic_uptake_batch(current_time_point, total_bacteria_density, parameters):
+    """
+    Vectorized antibiotic_uptake_eq(), using one mask per treatment type
+
+    PARAMETERS:
+        current_time_point : float
+            Current time point of the simulation (shared by the whole batch)
+        total_bacteria_density : numpy.ndarray
+            Total bacteria density (Bs + Br) of each parameter set
+        parameters : dict[numpy.ndarray]
+            Parameter arrays, as returned by batch_parameters()
+
+    RETURNS: numpy.ndarray
+        Boolean array, antibiotic uptake of each parameter set for the given time step
+    """
+    treatment_type = parameters["treatment_type"]
+    delay = parameters["classic_delay"]
+
+    classic = ((treatment_type == CLASSIC) & (delay <= current_time_point) &
+               (current_time_point <= delay + parameters["classic_duration"]))
+    adaptive = ((treatment_type == ADAPTIVE) &
+                (total_bacteria_density >= parameters["adaptive_symptoms_at_bacteria_density"]))
+    user = (treatment_type == USER) & parameters["user_administer"]
+
+    return classic | adaptive | user
+
+
+def calculate_next_time_step_batch(current_time_point, state, parameters, time_step=1/(24*60.0)):
+    """
+    Vectorized calculate_next_time_step(); calculates all equations for every parameter set, for the given time_step
+
+    PARAMETERS:
+        current_time_point : float
+            Current time point of the simulation (shared by the whole batch)
+        state : numpy.ndarray
+            Array of shape (5, N), as returned by initial_state()
+        parameters : dict[numpy.ndarray]
+            Parameter arrays, as returned by batch_parameters()
+        time_step : int/float
+            x/(24*60) (step per day) (defaults to 1 minute)
+
+    RETURNS: (float, numpy.ndarray)
+        New time point and new state array
+    """
+    sensitive, resistant, precursor, effector, memory = state
+
+    total_bacteria_density = sensitive + resistant
+    total_immune_cells = precursor + effector + memory
+    antibiotic = antibiotic_uptake_batch(current_time_point, total_bacteria_density, parameters) * \
+        parameters["antibiotic_mean_concentration"]
+    immune_killing = parameters["lymphocyte_inhibition"] * total_immune_cells
+
+    # If there are less than 1 bacteria, then there are ~0 bacterias (same as bacteria_density_eq())
+    sensitive = np.where(sensitive < 1.0, 0.0001, sensitive)
+    resistant = np.where(resistant < 1.0, 0.0001, resistant)
+
+    # B/(k+B) and (1 - B/(k+B))
+    saturation = total_bacteria_density / (parameters["immune_cell_half_maximum_growth"] + total_bacteria_density)
+    unsaturation = 1 - saturation
+
+    proliferation_rate = parameters["immune_cell_proliferation_rate"]
+    effector_decay = parameters["effector_decay_rate"] * effector * unsaturation
+
+    new_state = np.empty_like(state)
+    new_state[0] = sensitive * (1 + (parameters["sensitive_growth_rate"] - immune_killing -
+                                     parameters["sensitive_antibiotic_inhibition"] * antibiotic) * time_step)
+    new_state[1] = resistant * (1 + (parameters["resistant_growth_rate"] - immune_killing -
+                                     parameters["resistant_antibiotic_inhibition"] * antibiotic) * time_step)
+    new_state[2] = precursor * (1 - proliferation_rate * saturation * time_step)
+    new_state[3] = effector + ((2 * proliferation_rate * precursor + proliferation_rate * effector) * saturation -
+                               effector_decay) * time_step
+    new_state[4] = memory + parameters["memory_cell_conversion_rate"] * effector_decay * time_step
+
+    return current_time_point + time_step, new_state
+
+
+def batch_outcome(state, parameters):
+    """
+    Vectorized scenario_1_outcome()
+
+    PARAMETERS:
+        state : numpy.ndarray
+            Array of shape (5, N)
+        parameters : dict[numpy.ndarray]
+            Parameter arrays, as returned by batch_parameters()
+
+    RETURNS: numpy.ndarray
+        Integer array with the outcome code of each parameter set (OUTCOME_NONE, OUTCOME_HOST_DEATH or
+        OUTCOME_BACTERIA_DEATH)
+    """
+    # same clamp as scenario_1_values()
+    sensitive = np.where(state[0] > 0, state[0], 0.0001)
+    resistant = np.where(state[1] > 0, state[1], 0.0001)
+
+    outcome = np.full(sensitive.shape, OUTCOME_NONE, dtype=int)
+    outcome[(sensitive < 1) & (resistant < 1)] = OUTCOME_BACTERIA_DEATH
+    outcome[sensitive + resistant >= parameters["host_death_density"]] = OUTCOME_HOST_DEATH
+    return outcome
+
+
+def simulate_scenario_1_batch(parameters, duration, time_step=1/(24*5.0), sample_every=None):
+    """
+    Runs every parameter set until duration is reached
+    Each parameter set stops changing (is frozen) at the time step in which it reaches an outcome
+
+    PARAMETERS:
+        parameters : dict[numpy.ndarray]
+            Parameter arrays, as returned by batch_parameters()
+        duration : int/float
+            Maximum simulated time, in days
+        time_step : int/float
+            Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        sample_every : int or None
+            If given, the state is stored every sample_every time steps
+
+    RETURNS: dict
+        "outcome" : numpy.ndarray, outcome code of each parameter set
+        "outcome_time" : numpy.ndarray, time at which each outcome was reached (NaN if none)
+        "peak_sensitive", "peak_resistant", "peak_total" : numpy.ndarray, maximum density of each parameter set
+        "exposure" : numpy.ndarray, antibiotic exposure of each parameter set (concentration taken up times time,
+                     summed over every time step until its outcome)
+        "state" : numpy.ndarray, last state (5, N)
+        "time" : numpy.ndarray, sampled time points (only if sample_every is given)
+        "trajectory" : numpy.ndarray, sampled states, (samples, 5, N) (only if sample_every is given)
+    """
+    state = initial_state(parameters)
+    current_time_point = 0.0
+
+    outcome = batch_outcome(state, parameters)
+    outcome_time = np.where(outcome != OUTCOME_NONE, current_time_point, np.nan)
+    active = outcome == OUTCOME_NONE
+
+    peak_sensitive = state[0].copy()
+    peak_resistant = state[1].copy()
+    peak_total = state[0] + state[1]
+    exposure = np.zeros(state.shape[1])
+
+    sampled_times = []
+    sampled_states = []
+
+    step = 0
+    while current_time_point + time_step <= duration and active.any():
+        if sample_every is not None and step % sample_every == 0:
+            sampled_times.append(current_time_point)
+            sampled_states.append(state.copy())
+
+        uptake = antibiotic_uptake_batch(current_time_point, state[0] + state[1], parameters) & active
+        exposure += uptake * parameters["antibiotic_mean_concentration"] * time_step
+        current_time_point, new_state = calculate_next_time_step_batch(current_time_point, state, parameters,
+                                                                       time_step)
+        new_outcome = batch_outcome(new_state, parameters)
+
+        # parameter sets that reach an outcome keep their last state (same as the engine, which stops there)
+        ended = active & (new_outcome != OUTCOME_NONE)
+        outcome[ended] = new_outcome[ended]
+        outcome_time[ended] = current_time_point
+        active &= ~ended
+
+        state = np.where(active, new_state, state)
+        np.maximum(peak_sensitive, state[0], out=peak_sensitive)
+        np.maximum(peak_resistant, state[1], out=peak_resistant)
+        np.maximum(peak_total, state[0] + state[1], out=peak_total)
+        step += 1
+
+    results = {"outcome": outcome, "outcome_time": outcome_time, "peak_sensitive": peak_sensitive,
+               "peak_resistant": peak_resistant, "peak_total": peak_total, "exposure": exposure,
+               "state": state}
+
+    if sample_every is not None:
+        sampled_times.append(current_time_point)
+        sampled_states.append(state.copy())
+        results["time"] = np.array(sampled_times)
+        results["trajectory"] = np.array(sampled_states)
+
+    return results
+
+
+###############################
+# Scenario 2 specific equations
+###############################
+
+def inhibition_matrix(genera, antibiotic_inhibition, antibiotics=ANTIBIOTICS, sparse=False):
+    """
+    Builds the genus x antibiotic inhibition matrix
+
+    PARAMETERS:
+        genera : iterable[str]
+            Bacteria genera, in the order of the matrix rows
+        antibiotic_inhibition : dict[dict[float]]
+            Each bacteria's inhibition parameter for each antibiotic
+            {"bacteria": {"antibiotic_1": float, ...}, ...}
+        antibiotics : iterable[str]
+            Antibiotics, in the order of the matrix columns
+        sparse : bool
+            If True, returns a scipy.sparse CSR matrix (worth it when most inhibition values are 0)
+
+    RETURNS: numpy.ndarray or scipy.sparse.csr_matrix
+        Matrix of shape (genera, antibiotics)
+    """
+    matrix = np.array([[antibiotic_inhibition[bacteria][antibiotic] for antibiotic in antibiotics]
+                       for bacteria in genera], dtype=float)
+    if sparse:
+        from scipy.sparse import csr_matrix
+        matrix = csr_matrix(matrix)
+    return matrix
+
+
+def antibiotic_exposure(antibiotic_concentrations, antibiotic_uptakes, antibiotics=ANTIBIOTICS):
+    """
+    Gets uptake * concentration of each antibiotic
+
+    PARAMETERS:
+        antibiotic_concentrations : dict[float]
+            Concentration of each antibiotic, {"antibiotic_1": float, ...}
+        antibiotic_uptakes : dict[int]
+            Uptake status of each antibiotic, {"antibiotic_1": int(0 or 1), ...}
+        antibiotics : iterable[str]
+            Antibiotics, in the order of the inhibition matrix columns
+
+    RETURNS: numpy.ndarray
+        One value per antibiotic
+    """
+    return np.array([antibiotic_uptakes[antibiotic] * antibiotic_concentrations[antibiotic]
+                     for antibiotic in antibiotics], dtype=float)
+
+
+def calculate_next_time_step_scenario2_matrix(current_time_point, bacteria_densities, nutrient_concentrations,
+                                              growth_rates, inhibition, exposure, flow_rate,
+                                              nutrients_for_bacteria_duplication, half_saturation,
+                                              time_step=1/(24*60.0)):
+    """
+    Matrix form of calculate_next_time_step_scenario2(); calculates bacterial growth of every genus, for the given
+    time_step
+
+    PARAMETERS:
+        current_time_point : float
+            Current time point of the simulation
+        bacteria_densities : numpy.ndarray
+            Density of each genus
+        nutrient_concentrations : numpy.ndarray
+            Nutrient concentration of each genus
+        growth_rates : numpy.ndarray
+            Growth rate of each genus
+        inhibition : numpy.ndarray or scipy.sparse matrix
+            Genus x antibiotic inhibition matrix, as returned by inhibition_matrix()
+        exposure : numpy.ndarray
+            Uptake * concentration of each antibiotic, as returned by antibiotic_exposure()
+        flow_rate : int/float
+            Rate of nutrient flow
+        nutrients_for_bacteria_duplication : numpy.ndarray
+            Nutrients necessary for duplication of each genus
+        half_saturation : int/float
+            Constant that makes (N/(Q+N)) = 1/2 when Q=C
+        time_step : int/float
+            x/(24*60) (step per day) (defaults to 1 minute)
+
+    RETURNS: (float, numpy.ndarray, numpy.ndarray)
+        New time point, new bacteria densities and new nutrient concentrations
+    """
+    # nutrient_concentration_eq() is plain arithmetic, so it works on whole vectors
+    new_nutrient_concentrations = nutrient_concentration_eq(nutrient_concentrations, flow_rate,
+                                                            nutrients_for_bacteria_duplication, growth_rates,
+                                                            bacteria_densities, half_saturation, time_step)
+
+    # sum of (antibiotic_inhibition * antibiotic_uptake * antibiotic_concentration) of each genus
+    antibiotic_pressure = inhibition.dot(exposure)
+
+    # If there are less than 1 bacteria, then there are ~0 bacterias (same as multiple_antibiotic_bacteria_density_eq())
+    bacteria_densities = np.where(bacteria_densities < 1.0, 0.0001, bacteria_densities)
+
+    new_bacteria_densities = bacteria_densities + (
+        growth_rates * bacteria_densities *
+        (new_nutrient_concentrations / (half_saturation + new_nutrient_concentrations)) -
+        flow_rate * bacteria_densities -
+        bacteria_densities * antibiotic_pressure) * time_step
+
+    return current_time_point + time_step, new_bacteria_densities, new_nutrient_concentrations
+
+
+def scenario_2_matrix_generator(parameters, antibiotics=ANTIBIOTICS, sparse=False):
+    """
+    Same as engine.scenario_2_generator(), using calculate_next_time_step_scenario2_matrix()
+    Antibiotic concentrations and uptakes are read at every time step, the remaining parameters only once
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters
+        antibiotics : iterable[str]
+            Antibiotics in the simulation
+        sparse : bool
+            If True, the inhibition matrix is a scipy.sparse matrix
+
+    YIELDS: (float, numpy.ndarray)
+        Time and relative frequency of each genus, in the same order as parameters.genera
+        Initial values first, then the values of each following time step
+    """
+    genera = parameters.genera
+    growth_rates = np.array([parameters.growth_rates[bacteria] for bacteria in genera], dtype=float)
+    nutrients_for_bacteria_duplication = np.array(
+        [parameters.nutrients_for_bacteria_duplication[bacteria] for bacteria in genera], dtype=float)
+    inhibition = inhibition_matrix(genera, parameters.antibiotic_inhibition, antibiotics, sparse)
+
+    current_time_point = 0.0
+    bacteria_densities = np.array([parameters.initial_densities[bacteria] for bacteria in genera], dtype=float)
+    dead = np.zeros(len(genera), dtype=bool)
+
+    # bacterias, at initial density, are stable at this value, Qω/ψ-ω
+    nutrient_concentrations = (parameters.half_saturation * parameters.flow_rate) / (growth_rates -
+                                                                                      parameters.flow_rate)
+
+    while True:
+        bacteria_densities[dead] = SCENARIO_2_DEAD_VALUE
+
+        # 1.0 (instead of 0.0) allows a single survivor bacteria genus to die
+        relative_frequencies = bacteria_densities / (1.0 + bacteria_densities[~dead].sum())
+        dead |= relative_frequencies <= SCENARIO_2_DEATH_FREQUENCY
+        relative_frequencies[dead] = SCENARIO_2_DEAD_VALUE
+
+        # initial values are yielded at first
+        yield current_time_point, relative_frequencies
+
+        exposure = antibiotic_exposure(parameters.antibiotic_concentrations, parameters.antibiotic_uptakes,
+                                       antibiotics)
+        current_time_point, bacteria_densities, nutrient_concentrations = calculate_next_time_step_scenario2_matrix(
+            current_time_point, bacteria_densities, nutrient_concentrations, growth_rates, inhibition, exposure,
+            parameters.flow_rate, nutrients_for_bacteria_duplication, parameters.half_saturation,
+            parameters.time_step)
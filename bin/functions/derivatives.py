@@ -0,0 +1,341 @@
+#!python2
+# coding: utf-8
+
+"""
+DERIVATIVES
+Right-hand sides of the scenario 1 and scenario 2 equations, as ordinary differential equations
+equations.py advances each variable with a forward Euler step, new_X = X + (dX/dt) * Δt
+The functions in this module return dX/dt, so that the equations can be solved by any integrator (see integrators.py),
+and their Jacobians (d(dX/dt)/dY), needed by stiff integrators
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy
+"""
+
+import numpy as np
+from bin.classes.Scenario2Parameters import ANTIBIOTICS
+from bin.functions.batch import antibiotic_exposure, inhibition_matrix
+from bin.functions.equations import antibiotic_uptake_eq
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# N₀, concentration of the inflowing nutrients (same as nutrient_concentration_eq())
+NUTRIENT_INFLOW_CONCENTRATION = 100
+
+# scenario 1 state vector, in order
+SCENARIO_1_STATE = ("sensitive", "resistant", "naive_precursor", "effector", "memory")
+
+# scenario 1 uptake which holds the total bacteria density constant (see scenario_1_partial_uptake())
+PARTIAL_UPTAKE = "partial"
+
+
+def scenario_1_antibiotic_uptake(parameters, time, total_bacteria_density):
+    """
+    Gets η(t), from antibiotic_uptake_eq()
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+        time : float
+            Time point of the simulation
+        total_bacteria_density : float
+            Total bacteria density (Bs + Br)
+
+    RETURNS: int
+        0 or 1, antibiotic uptake
+    """
+    if parameters.treatment_type == "Classic":
+        return antibiotic_uptake_eq("Classic", delay=parameters.classic_delay, duration=parameters.classic_duration,
+                                    time=time)
+    elif parameters.treatment_type == "Adaptive":
+        return antibiotic_uptake_eq(
+            "Adaptive", bacteria_density_causing_symptoms=parameters.adaptive_symptoms_at_bacteria_density,
+            total_bacteria_density=total_bacteria_density)
+    return antibiotic_uptake_eq("User", taking_antibiotic=parameters.user_administer)
+
+
+def scenario_1_partial_uptake(state, parameters):
+    """
+    Gets the antibiotic uptake that keeps the total bacteria density (Bs + Br) constant
+    When Adaptive treatment is switched on at Ω and the bacteria decrease, it is switched off again right away, and the
+    bacteria grow back to Ω; the fixed step simulation alternates between the two every time step, which, as the step
+    gets smaller, becomes a partial uptake that holds the bacteria at Ω (Filippov sliding mode)
+
+    PARAMETERS:
+        state : numpy.ndarray
+            [Bs, Br, N, E, M], as in SCENARIO_1_STATE
+        parameters : Scenario1Parameters
+            Simulation parameters
+
+    RETURNS: float
+        Uptake; between 0 and 1 while the bacteria can be held at Ω
+    """
+    sensitive, resistant, precursor, effector, memory = state
+    immune_killing = parameters.lymphocyte_inhibition * (precursor + effector + memory)
+
+    growth = (sensitive * (parameters.sensitive_growth_rate - immune_killing) +
+              resistant * (parameters.resistant_growth_rate - immune_killing))
+    antibiotic_killing = parameters.antibiotic_mean_concentration * (
+        parameters.sensitive_antibiotic_inhibition * sensitive + parameters.resistant_antibiotic_inhibition * resistant)
+
+    if antibiotic_killing == 0:
+        return np.inf if growth > 0 else -np.inf
+    return growth / antibiotic_killing
+
+
+def scenario_1_derivatives(time, state, parameters, uptake=None):
+    """
+    Scenario 1 right-hand side
+
+    dBs/dt = rBs - dBsI - δBsη(t)Aₘ (same for Br)
+    dN/dt = -σN(B/(k+B))
+    dE/dt = (2σN + σE)(B/(k+B)) - hE(1 - B/(k+B))
+    dM/dt = fEh(1 - B/(k+B))
+
+    PARAMETERS:
+        time : float
+            Time point of the simulation
+        state : numpy.ndarray
+            [Bs, Br, N, E, M], as in SCENARIO_1_STATE
+        parameters : Scenario1Parameters
+            Simulation parameters
+        uptake : int/float, str or None
+            η(t), antibiotic uptake; PARTIAL_UPTAKE for scenario_1_partial_uptake(), None to evaluate
+            scenario_1_antibiotic_uptake() at each time point
+
+    RETURNS: numpy.ndarray
+        Derivative of each state variable
+    """
+    sensitive, resistant, precursor, effector, memory = state
+
+    total_bacteria_density = sensitive + resistant
+    total_immune_cells = precursor + effector + memory
+
+    if uptake is None:
+        uptake = scenario_1_antibiotic_uptake(parameters, time, total_bacteria_density)
+    elif uptake == PARTIAL_UPTAKE:
+        uptake = min(max(scenario_1_partial_uptake(state, parameters), 0), 1)
+    antibiotic = uptake * parameters.antibiotic_mean_concentration
+    immune_killing = parameters.lymphocyte_inhibition * total_immune_cells
+
+    saturation = total_bacteria_density / (parameters.immune_cell_half_maximum_growth + total_bacteria_density)
+    proliferation_rate = parameters.immune_cell_proliferation_rate
+    effector_decay = parameters.effector_decay_rate * effector * (1 - saturation)
+
+    return np.array([
+        sensitive * (parameters.sensitive_growth_rate - immune_killing -
+                     parameters.sensitive_antibiotic_inhibition * antibiotic),
+        resistant * (parameters.resistant_growth_rate - immune_killing -
+                     parameters.resistant_antibiotic_inhibition * antibiotic),
+        -proliferation_rate * precursor * saturation,
+        (2 * proliferation_rate * precursor + proliferation_rate * effector) * saturation - effector_decay,
+        parameters.memory_cell_conversion_rate * effector_decay])
+
+
+def scenario_1_jacobian(time, state, parameters, uptake=None):
+    """
+    Jacobian of scenario_1_derivatives()
+    Uptake is constant in the state, except for PARTIAL_UPTAKE (Adaptive treatment holding the bacteria at Ω)
+
+    PARAMETERS:
+        time : float
+            Time point of the simulation
+        state : numpy.ndarray
+            [Bs, Br, N, E, M], as in SCENARIO_1_STATE
+        parameters : Scenario1Parameters
+            Simulation parameters
+        uptake : int/float, str or None
+            η(t), antibiotic uptake (see scenario_1_derivatives())
+
+    RETURNS: numpy.ndarray
+        5x5 matrix, row i holds the derivatives of dXᵢ/dt for each state variable
+    """
+    sensitive, resistant, precursor, effector, memory = state
+
+    total_bacteria_density = sensitive + resistant
+    total_immune_cells = precursor + effector + memory
+    half_maximum_growth = parameters.immune_cell_half_maximum_growth
+    concentration = parameters.antibiotic_mean_concentration
+    lymphocyte_inhibition = parameters.lymphocyte_inhibition
+    proliferation_rate = parameters.immune_cell_proliferation_rate
+    effector_decay_rate = parameters.effector_decay_rate
+    sensitive_inhibition = parameters.sensitive_antibiotic_inhibition
+    resistant_inhibition = parameters.resistant_antibiotic_inhibition
+
+    # d(η)/dY, only for partial uptake
+    uptake_gradient = np.zeros(5)
+    if uptake is None:
+        uptake = scenario_1_antibiotic_uptake(parameters, time, total_bacteria_density)
+    elif uptake == PARTIAL_UPTAKE:
+        partial_uptake = scenario_1_partial_uptake(state, parameters)
+        uptake = min(max(partial_uptake, 0), 1)
+        if 0 < partial_uptake < 1:
+            antibiotic_killing = concentration * (sensitive_inhibition * sensitive + resistant_inhibition * resistant)
+            immune_killing = lymphocyte_inhibition * total_immune_cells
+            uptake_gradient[0] = (parameters.sensitive_growth_rate - immune_killing -
+                                  partial_uptake * concentration * sensitive_inhibition) / antibiotic_killing
+            uptake_gradient[1] = (parameters.resistant_growth_rate - immune_killing -
+                                  partial_uptake * concentration * resistant_inhibition) / antibiotic_killing
+            uptake_gradient[2:] = -lymphocyte_inhibition * total_bacteria_density / antibiotic_killing
+
+    saturation = total_bacteria_density / (half_maximum_growth + total_bacteria_density)
+    saturation_derivative = half_maximum_growth / (half_maximum_growth + total_bacteria_density) ** 2
+
+    jacobian = np.zeros((5, 5))
+
+    # bacteria
+    for row, density, growth_rate, inhibition in ((0, sensitive, parameters.sensitive_growth_rate,
+                                                   sensitive_inhibition),
+                                                  (1, resistant, parameters.resistant_growth_rate,
+                                                   resistant_inhibition)):
+        jacobian[row, 2:] = -lymphocyte_inhibition * density
+        jacobian[row] -= density * inhibition * concentration * uptake_gradient
+        jacobian[row, row] += (growth_rate - lymphocyte_inhibition * total_immune_cells -
+                               inhibition * concentration * uptake)
+
+    # naive precursor cells
+    jacobian[2, :2] = -proliferation_rate * precursor * saturation_derivative
+    jacobian[2, 2] = -proliferation_rate * saturation
+
+    # effector cells
+    jacobian[3, :2] = ((2 * proliferation_rate * precursor + proliferation_rate * effector) * saturation_derivative +
+                       effector_decay_rate * effector * saturation_derivative)
+    jacobian[3, 2] = 2 * proliferation_rate * saturation
+    jacobian[3, 3] = proliferation_rate * saturation - effector_decay_rate * (1 - saturation)
+
+    # memory cells
+    jacobian[4, :2] = -parameters.memory_cell_conversion_rate * effector_decay_rate * effector * saturation_derivative
+    jacobian[4, 3] = parameters.memory_cell_conversion_rate * effector_decay_rate * (1 - saturation)
+
+    return jacobian
+
+
+def scenario_2_system(parameters, antibiotics=ANTIBIOTICS, sparse=False):
+    """
+    Gathers the scenario 2 parameters that scenario_2_derivatives() needs as vectors
+    Antibiotic concentrations and uptakes are still read from parameters, at every evaluation
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters
+        antibiotics : iterable[str]
+            Antibiotics in the simulation
+        sparse : bool
+            If True, the inhibition matrix is a scipy.sparse matrix
+
+    RETURNS: dict
+        "parameters", "antibiotics", "growth_rates", "nutrients_for_bacteria_duplication", "inhibition" and "alive"
+        (boolean array, genera set to False no longer change)
+    """
+    genera = parameters.genera
+    return {"parameters": parameters,
+            "antibiotics": tuple(antibiotics),
+            "growth_rates": np.array([parameters.growth_rates[bacteria] for bacteria in genera], dtype=float),
+            "nutrients_for_bacteria_duplication": np.array(
+                [parameters.nutrients_for_bacteria_duplication[bacteria] for bacteria in genera], dtype=float),
+            "inhibition": inhibition_matrix(genera, parameters.antibiotic_inhibition, antibiotics, sparse),
+            "alive": np.ones(len(genera), dtype=bool)}
+
+
+def scenario_2_initial_state(system):
+    """
+    Builds the scenario 2 initial state
+
+    PARAMETERS:
+        system : dict
+            As returned by scenario_2_system()
+
+    RETURNS: numpy.ndarray
+        [B₁, ..., Bₙ, C₁, ..., Cₙ], bacteria densities followed by nutrient concentrations
+    """
+    parameters = system["parameters"]
+    densities = np.array([parameters.initial_densities[bacteria] for bacteria in parameters.genera], dtype=float)
+
+    # bacterias, at initial density, are stable at this value, Qω/ψ-ω
+    nutrients = (parameters.half_saturation * parameters.flow_rate) / (system["growth_rates"] - parameters.flow_rate)
+    return np.concatenate((densities, nutrients))
+
+
+def scenario_2_derivatives(time, state, system):
+    """
+    Scenario 2 right-hand side, for every genus at once
+
+    dB/dt = ψB(C/(Q+C)) - ωB - B Σ(δη(t)Aₘ)
+    dC/dt = ωN₀ - εψB(C/(Q+C)) - ωC
+
+    PARAMETERS:
+        time : float
+            Time point of the simulation
+        state : numpy.ndarray
+            [B₁, ..., Bₙ, C₁, ..., Cₙ], as returned by scenario_2_initial_state()
+        system : dict
+            As returned by scenario_2_system()
+
+    RETURNS: numpy.ndarray
+        Derivative of each state variable
+    """
+    parameters = system["parameters"]
+    genera_count = state.shape[0] // 2
+    densities = state[:genera_count]
+    nutrients = state[genera_count:]
+
+    growth_rates = system["growth_rates"]
+    flow_rate = parameters.flow_rate
+    exposure = antibiotic_exposure(parameters.antibiotic_concentrations, parameters.antibiotic_uptakes,
+                                   system["antibiotics"])
+
+    monod = nutrients / (parameters.half_saturation + nutrients)
+    densities_derivative = densities * (growth_rates * monod - flow_rate - system["inhibition"].dot(exposure))
+    nutrients_derivative = (flow_rate * NUTRIENT_INFLOW_CONCENTRATION -
+                            system["nutrients_for_bacteria_duplication"] * growth_rates * densities * monod -
+                            flow_rate * nutrients)
+
+    return np.concatenate((densities_derivative * system["alive"], nutrients_derivative))
+
+
+def scenario_2_jacobian(time, state, system):
+    """
+    Jacobian of scenario_2_derivatives()
+    Each genus only depends on its own density and nutrient concentration, so the matrix is made of 2x2 blocks
+
+    PARAMETERS:
+        time : float
+            Time point of the simulation
+        state : numpy.ndarray
+            [B₁, ..., Bₙ, C₁, ..., Cₙ], as returned by scenario_2_initial_state()
+        system : dict
+            As returned by scenario_2_system()
+
+    RETURNS: numpy.ndarray
+        2n x 2n matrix, row i holds the derivatives of dXᵢ/dt for each state variable
+    """
+    parameters = system["parameters"]
+    genera_count = state.shape[0] // 2
+    densities = state[:genera_count]
+    nutrients = state[genera_count:]
+
+    growth_rates = system["growth_rates"]
+    nutrients_for_bacteria_duplication = system["nutrients_for_bacteria_duplication"]
+    alive = system["alive"]
+    flow_rate = parameters.flow_rate
+    half_saturation = parameters.half_saturation
+    exposure = antibiotic_exposure(parameters.antibiotic_concentrations, parameters.antibiotic_uptakes,
+                                   system["antibiotics"])
+
+    monod = nutrients / (half_saturation + nutrients)
+    monod_derivative = half_saturation / (half_saturation + nutrients) ** 2
+
+    densities_index = np.arange(genera_count)
+    nutrients_index = densities_index + genera_count
+
+    jacobian = np.zeros((2 * genera_count, 2 * genera_count))
+    jacobian[densities_index, densities_index] = alive * (growth_rates * monod - flow_rate -
+                                                          system["inhibition"].dot(exposure))
+    jacobian[densities_index, nutrients_index] = alive * densities * growth_rates * monod_derivative
+    jacobian[nutrients_index, densities_index] = -nutrients_for_bacteria_duplication * growth_rates * monod
+    jacobian[nutrients_index, nutrients_index] = (-nutrients_for_bacteria_duplication * growth_rates * densities *
+                                                  monod_derivative - flow_rate)
+    return jacobian
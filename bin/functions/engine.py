@@ -0,0 +1,354 @@
+#!python2
+# coding: utf-8
+
+"""
+ENGINE
+Kivy free simulation engine
+Steps scenario 1 and scenario 2 simulations from plain parameter objects (Scenario1Parameters and
+Scenario2Parameters), so that simulations can run without a window (batch runs, scripts, etc)
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+from bin.classes.Scenario2Parameters import ANTIBIOTICS
+from bin.functions.equations import calculate_next_time_step, calculate_next_time_step_scenario2
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# outcomes of a simulation
+HOST_DEATH = "host_death"
+BACTERIA_DEATH = "bacteria_death"
+
+# scenario 2 relative frequency at (or below) which a bacteria genus is considered dead, and the value it then takes
+SCENARIO_2_DEATH_FREQUENCY = 0.0001
+SCENARIO_2_DEAD_VALUE = 0.0000000001
+
+# scenario 1 column names, in the order they are returned by scenario_1_values()
+SCENARIO_1_COLUMNS = ("time", "sensitive", "resistant", "total", "immune", "antibiotic")
+
+# scenario 1 plotted (and saved) series, in the order they are returned by scenario_1_row()
+SCENARIO_1_SERIES = ("total_bacteria", "sensitive_bacteria", "resistant_bacteria", "immune_system", "antibiotic")
+
+
+def scenario_1_generator(parameters):
+    """
+    Generates scenario 1 values for each time step, indefinitely
+    parameters is read at every time step, so changes made to it affect the running simulation
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+
+    YIELDS: (time, sensitive, resistant, naive_precursor, effector, memory), each element as float
+        Initial values first, then the values of each following time step
+    """
+    current_time_point = 0.0
+    sensitive_density = parameters.sensitive_initial_density
+    resistant_density = parameters.resistant_initial_density
+    precursor_density = parameters.initial_precursor_cell_density
+    effector_density = 0.0
+    memory_cells_density = 0.0
+
+    while True:
+        # initial values are yielded at first
+        yield (current_time_point, sensitive_density, resistant_density, precursor_density, effector_density,
+               memory_cells_density)
+
+        antibiotic_uptake_args = {}
+        if parameters.treatment_type == "Classic":
+            # time is added in calculate_next_time_step()
+            antibiotic_uptake_args = {"delay": parameters.classic_delay, "duration": parameters.classic_duration}
+        elif parameters.treatment_type == "Adaptive":
+            # total_bacteria_density is added in calculate_next_time_step()
+            antibiotic_uptake_args = {
+                "bacteria_density_causing_symptoms": parameters.adaptive_symptoms_at_bacteria_density}
+        elif parameters.treatment_type == "User":
+            antibiotic_uptake_args = {"taking_antibiotic": parameters.user_administer}
+
+        (current_time_point, sensitive_density, resistant_density, precursor_density, effector_density,
+         memory_cells_density) = calculate_next_time_step(current_time_point, sensitive_density, resistant_density,
+                                                          precursor_density, effector_density, memory_cells_density,
+                                                          parameters.immune_cell_proliferation_rate,
+                                                          parameters.lymphocyte_inhibition,
+                                                          parameters.memory_cell_conversion_rate,
+                                                          parameters.effector_decay_rate,
+                                                          parameters.antibiotic_mean_concentration,
+                                                          parameters.immune_cell_half_maximum_growth,
+                                                          parameters.treatment_type, antibiotic_uptake_args,
+                                                          (parameters.sensitive_growth_rate,
+                                                           parameters.sensitive_antibiotic_inhibition),
+                                                          (parameters.resistant_growth_rate,
+                                                           parameters.resistant_antibiotic_inhibition),
+                                                          parameters.time_step)
+
+
+def scenario_1_values(parameters, data):
+    """
+    Converts one scenario_1_generator() step into the values that are shown (and saved) for each plot
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+        data : tuple[float]
+            One value yielded by scenario_1_generator()
+
+    RETURNS: (time, sensitive, resistant, total, immune, antibiotic), each element as float
+        Values as in SCENARIO_1_COLUMNS
+    """
+    time = data[0]
+
+    # avoids zero division errors
+    sensitive_bacteria_density = data[1] if data[1] > 0 else 0.0001
+    resistant_bacteria_density = data[2] if data[2] > 0 else 0.0001
+    immune_cells_density = data[3] + data[4] + data[5] if data[3] + data[4] + data[5] > 0 else 0.0001
+    total_bacteria_density = sensitive_bacteria_density + resistant_bacteria_density
+
+    # treatment type logic
+    antibiotic_concentration = 0
+    if parameters.treatment_type == "Classic":
+        if parameters.classic_delay < time < parameters.classic_delay + parameters.classic_duration:
+            antibiotic_concentration = parameters.antibiotic_mean_concentration
+    elif parameters.treatment_type == "Adaptive":
+        if parameters.adaptive_symptoms_at_bacteria_density < total_bacteria_density:
+            antibiotic_concentration = parameters.antibiotic_mean_concentration
+    elif parameters.treatment_type == "User":
+        if parameters.user_administer:
+            antibiotic_concentration = parameters.antibiotic_mean_concentration
+
+    return (time, sensitive_bacteria_density, resistant_bacteria_density, total_bacteria_density,
+            immune_cells_density, antibiotic_concentration)
+
+
+def scenario_1_outcome(parameters, values):
+    """
+    Checks whether a scenario 1 simulation has ended
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+        values : tuple[float]
+            Values returned by scenario_1_values()
+
+    RETURNS: str or None
+        HOST_DEATH if the host death threshold is reached, BACTERIA_DEATH if both bacteria are dead, None otherwise
+    """
+    sensitive_bacteria_density, resistant_bacteria_density, total_bacteria_density = values[1:4]
+
+    if total_bacteria_density >= parameters.host_death_density:
+        return HOST_DEATH
+    if sensitive_bacteria_density < 1 and resistant_bacteria_density < 1:
+        return BACTERIA_DEATH
+    return None
+
+
+def scenario_1_row(parameters, data):
+    """
+    Converts one scenario_1_generator() step into a row of plotted values
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+        data : tuple[float]
+            One value yielded by scenario_1_generator()
+
+    RETURNS: (float, tuple[float], str or None)
+        Time, values as in SCENARIO_1_SERIES and outcome (see scenario_1_outcome())
+    """
+    values = scenario_1_values(parameters, data)
+    (time, sensitive_bacteria_density, resistant_bacteria_density, total_bacteria_density, immune_cells_density,
+     antibiotic_concentration) = values
+
+    return (time, (total_bacteria_density, sensitive_bacteria_density, resistant_bacteria_density,
+                   immune_cells_density, antibiotic_concentration), scenario_1_outcome(parameters, values))
+
+
+def scenario_2_generator(parameters):
+    """
+    Generates scenario 2 bacteria relative frequencies for each time step, indefinitely
+    parameters is read at every time step, so changes made to it affect the running simulation
+    A bacteria genus whose relative frequency drops to SCENARIO_2_DEATH_FREQUENCY is considered dead from then on
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters
+
+    YIELDS: [time, relative_frequency_1, relative_frequency_2, ...], each element as float
+        Relative frequencies are in the same order as parameters.genera
+        Initial values first, then the values of each following time step
+    """
+    current_time_point = 0.0
+
+    bacteria_densities = dict((bacteria, parameters.initial_densities[bacteria]) for bacteria in parameters.genera)
+    bacteria_densities_relative_frequency = {}
+    bacteria_dead_status = dict((bacteria, False) for bacteria in parameters.genera)
+
+    nutrient_concentrations = {}
+    for bacteria in bacteria_densities:
+        # bacterias, at initial density, are stable at this value, Qω/ψ-ω
+        nutrient_concentrations[bacteria] = ((parameters.half_saturation * parameters.flow_rate) /
+                                             (parameters.growth_rates[bacteria] - parameters.flow_rate))
+
+    while True:
+        # relative frequency total density
+        total_density = 1.0  # (instead of 0.0) allows a single survivor bacteria genus to die
+        for bacteria, density in bacteria_densities.iteritems():
+            # if bacteria is dead set its value to SCENARIO_2_DEAD_VALUE
+            if bacteria_dead_status[bacteria]:
+                bacteria_densities[bacteria] = SCENARIO_2_DEAD_VALUE
+            else:  # count towards total_density
+                total_density += density
+
+        # individual bacteria relative frequency
+        for bacteria, density in bacteria_densities.iteritems():
+            if bacteria_dead_status[bacteria]:
+                bacteria_densities_relative_frequency[bacteria] = SCENARIO_2_DEAD_VALUE
+            else:
+                relative_frequency = density / total_density
+
+                # marks bacteria death
+                if relative_frequency <= SCENARIO_2_DEATH_FREQUENCY:
+                    bacteria_dead_status[bacteria] = True
+                    relative_frequency = SCENARIO_2_DEAD_VALUE
+
+                bacteria_densities_relative_frequency[bacteria] = relative_frequency
+
+        # initial values are yielded at first
+        yield [current_time_point] + [bacteria_densities_relative_frequency[bacteria]
+                                      for bacteria in parameters.genera]
+
+        current_time_point, bacteria_densities, nutrient_concentrations = calculate_next_time_step_scenario2(
+            current_time_point, bacteria_densities, parameters.growth_rates, parameters.antibiotic_inhibition,
+            parameters.antibiotic_concentrations, parameters.antibiotic_uptakes, nutrient_concentrations,
+            parameters.flow_rate, parameters.nutrients_for_bacteria_duplication, parameters.half_saturation,
+            parameters.time_step)
+
+
+def scenario_2_antibiotic_values(parameters):
+    """
+    Gets the antibiotic concentration that is shown (and saved) for each antibiotic, at the current time step
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters
+
+    RETURNS: dict[float]
+        {"antibiotic_1": float, ...}, the antibiotic concentration if it is being administered, 0 otherwise
+    """
+    return dict((antibiotic, parameters.antibiotic_concentrations[antibiotic] if uptake else 0)
+                for antibiotic, uptake in parameters.antibiotic_uptakes.iteritems())
+
+
+def scenario_2_outcome(data):
+    """
+    Checks whether a scenario 2 simulation has ended
+
+    PARAMETERS:
+        data : list[float]
+            One value yielded by scenario_2_generator()
+
+    RETURNS: str or None
+        BACTERIA_DEATH if every bacteria genus is dead, None otherwise
+    """
+    if all(relative_frequency <= SCENARIO_2_DEAD_VALUE for relative_frequency in data[1:]):
+        return BACTERIA_DEATH
+    return None
+
+
+def scenario_2_series(parameters):
+    """
+    Gets the scenario 2 plotted (and saved) series
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters
+
+    RETURNS: tuple[str]
+        Every bacteria genus (as in parameters.genera) followed by every antibiotic (as in ANTIBIOTICS), in the order
+        they are returned by scenario_2_row()
+    """
+    return tuple(parameters.genera) + ANTIBIOTICS
+
+
+def scenario_2_row(parameters, data):
+    """
+    Converts one scenario_2_generator() step into a row of plotted values
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters
+        data : list[float]
+            One value yielded by scenario_2_generator()
+
+    RETURNS: (float, list[float], str or None)
+        Time, values as in scenario_2_series() and outcome (see scenario_2_outcome())
+    """
+    antibiotic_values = scenario_2_antibiotic_values(parameters)
+    return (data[0], list(data[1:]) + [antibiotic_values[antibiotic] for antibiotic in ANTIBIOTICS],
+            scenario_2_outcome(data))
+
+
+def simulate_scenario_1(parameters, duration):
+    """
+    Runs a scenario 1 simulation until duration is reached or the simulation ends
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+        duration : int/float
+            Maximum simulated time, in days
+
+    RETURNS: (dict[list[float]], str or None)
+        Trajectory as {"column": [float, ...], ...}, with the columns in SCENARIO_1_COLUMNS, and the outcome of the
+        simulation (see scenario_1_outcome()); values at which the simulation ended are not part of the trajectory
+    """
+    trajectory = dict((column, []) for column in SCENARIO_1_COLUMNS)
+    outcome = None
+
+    for data in scenario_1_generator(parameters):
+        if data[0] > duration:
+            break
+
+        values = scenario_1_values(parameters, data)
+        outcome = scenario_1_outcome(parameters, values)
+        if outcome is not None:
+            break
+
+        for column, value in zip(SCENARIO_1_COLUMNS, values):
+            trajectory[column].append(value)
+
+    return trajectory, outcome
+
+
+def simulate_scenario_2(parameters, duration):
+    """
+    Runs a scenario 2 simulation until duration is reached or every bacteria genus dies
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters
+        duration : int/float
+            Maximum simulated time, in days
+
+    RETURNS: (dict[list[float]], str or None)
+        Trajectory as {"time": [float, ...], "bacteria_1": [float, ...], ...}, with bacteria relative frequencies,
+        and the outcome of the simulation (see scenario_2_outcome())
+    """
+    columns = ("time",) + parameters.genera
+    trajectory = dict((column, []) for column in columns)
+    outcome = None
+
+    for data in scenario_2_generator(parameters):
+        if data[0] > duration:
+            break
+
+        for column, value in zip(columns, data):
+            trajectory[column].append(value)
+
+        outcome = scenario_2_outcome(data)
+        if outcome is not None:
+            break
+
+    return trajectory, outcome
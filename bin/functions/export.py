@@ -0,0 +1,157 @@
+#!python2
+# coding: utf-8
+
+"""
+EXPORT
+Binary columnar export of simulation runs
+A run is written as a NumPy .npy file holding a 2-D array of doubles with one row per column (time first, then one
+per series), so that each column is contiguous and the whole file can be memory mapped by numpy.load(path,
+mmap_mode="r"), without parsing or copying. The column names and the parameters of the run are embedded as json after
+the array data, where numpy.load() ignores them, and are read by load_columns()
+Writing does not depend on NumPy
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy (only to load exports)
+"""
+
+import json
+import struct
+import sys
+from bin.classes.SpillColumn import SpillColumn
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# .npy format version 1.0 magic string, and alignment of the array data (in bytes) recommended by the format
+NPY_MAGIC = "\x93NUMPY\x01\x00"
+NPY_ALIGNMENT = 64
+
+# marks the end of the embedded metadata, preceded by the metadata length (little-endian unsigned 64-bit integer)
+METADATA_MAGIC = "SIMULATE"
+
+
+def parameters_metadata(parameters):
+    """
+    Converts simulation parameters to a json serializable dictionary
+
+    PARAMETERS:
+        parameters : Scenario1Parameters or Scenario2Parameters
+            Simulation parameters
+
+    RETURNS: dict
+        {"parameter_name": value, ...}, dictionaries (shared with the UI) copied as plain dictionaries
+    """
+    metadata = {}
+    for name, value in vars(parameters).iteritems():
+        if isinstance(value, dict):
+            value = dict((key, dict(item) if isinstance(item, dict) else item) for key, item in value.iteritems())
+        metadata[name] = value
+    return metadata
+
+
+def run_metadata(parameters):
+    """
+    Converts simulation parameters to keyword arguments of write_columns(), so that they can be taken in the UI thread
+    and written in another one while the UI goes on changing its own dictionaries
+
+    PARAMETERS:
+        parameters : Scenario1Parameters or Scenario2Parameters or None
+            Simulation parameters
+
+    RETURNS: dict
+        {"parameters": parameters_metadata(parameters), "parameters_type": class name}, empty if parameters is None
+    """
+    if parameters is None:
+        return {}
+    return {"parameters": parameters_metadata(parameters), "parameters_type": type(parameters).__name__}
+
+
+def write_columns(path, trajectory, parameters=None, series=None, start=1, parameters_type=None):
+    """
+    Writes the columns of a trajectory to a binary columnar file (see module docstring)
+
+    PARAMETERS:
+        path : str
+            File path (.npy)
+        trajectory : Trajectory
+            Trajectory of a simulation run
+        parameters : Scenario1Parameters or Scenario2Parameters or dict or None
+            Parameters of the run, or their parameters_metadata() (taken while the parameters are not being changed),
+            embedded as metadata
+        series : iterable[str] or None
+            Series to write, in order (defaults to every series)
+        start : int
+            First row (1 skips the initial row, which exists only to allow plot instantiation)
+        parameters_type : str or None
+            Class name of the parameters (defaults to the class of parameters, if they are not a dict)
+    """
+    if parameters is not None and not isinstance(parameters, dict):
+        parameters_type = type(parameters).__name__
+        parameters = parameters_metadata(parameters)
+
+    if series is None:
+        series = trajectory.get_series()
+    columns = [trajectory.get_time()] + [trajectory.get_column(name) for name in series]
+    rows = max(len(columns[0]) - start, 0)
+
+    # .npy header, padded so that the array data is aligned
+    header = "{'descr': '%sf8', 'fortran_order': False, 'shape': (%d, %d), }" % (
+        "<" if sys.byteorder == "little" else ">", len(columns), rows)
+    padding = NPY_ALIGNMENT - (len(NPY_MAGIC) + 2 + len(header) + 1) % NPY_ALIGNMENT
+    header += " " * (padding % NPY_ALIGNMENT) + "\n"
+
+    metadata = json.dumps({"columns": ["time"] + list(series),
+                           "parameters_type": parameters_type,
+                           "parameters": parameters},
+                          sort_keys=True)
+
+    with open(path, "wb") as npy_file:
+        npy_file.write(NPY_MAGIC + struct.pack("<H", len(header)) + header)
+        for column in columns:
+            # columns spilled to disk are copied a chunk at a time
+            for chunk in (column.chunks(start) if isinstance(column, SpillColumn) else (column[start:],)):
+                chunk.tofile(npy_file)
+        npy_file.write(metadata + struct.pack("<Q", len(metadata)) + METADATA_MAGIC)
+
+
+def read_metadata(path):
+    """
+    Reads the metadata embedded in a binary columnar file
+
+    PARAMETERS:
+        path : str
+            File path (.npy)
+
+    RETURNS: dict
+        {"columns": [column names], "parameters_type": str, "parameters": dict}
+    """
+    with open(path, "rb") as npy_file:
+        npy_file.seek(-(8 + len(METADATA_MAGIC)), 2)
+        length, magic = struct.unpack("<Q%ds" % len(METADATA_MAGIC), npy_file.read(8 + len(METADATA_MAGIC)))
+        if magic != METADATA_MAGIC:
+            raise ValueError("not a SimulATe binary columnar file: " + path)
+        npy_file.seek(-(length + 8 + len(METADATA_MAGIC)), 2)
+        return json.loads(npy_file.read(length))
+
+
+def load_columns(path, mmap=True):
+    """
+    Loads a binary columnar file
+
+    PARAMETERS:
+        path : str
+            File path (.npy)
+        mmap : bool
+            Whether the file is memory mapped (read only, columns are read from disk when accessed) or read into memory
+
+    RETURNS: (dict[numpy.ndarray], dict)
+        {"time": column, "series_name": column, ...} (views of a single array, no copies), and the metadata (see
+        read_metadata())
+    """
+    import numpy as np
+
+    metadata = read_metadata(path)
+    array = np.load(path, mmap_mode="r" if mmap else None)
+    return dict(zip(metadata["columns"], array)), metadata
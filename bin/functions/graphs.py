@@ -11,48 +11,37 @@ DEPENDENCIES:
     - Kivy Garden Graph
 """
 
+from bin.deps.kivy_graph import PointList
+
 __author__ = 'Pedro HC David, https://github.com/Kronopt'
 __credits__ = ['Pedro HC David']
 
 
-def xy_max_resize(plot, graph_widget, axis_type="linear"):
+def trajectory_plots(trajectory, plots):
+    """
+    Makes plots views of the columns of a trajectory: every plot shares the trajectory time column as its x values,
+    and is redrawn whenever rows are appended to the trajectory
+
+    PARAMETERS:
+        trajectory : Trajectory
+            Trajectory of a simulation run
+        plots : dict[Plot]
+            Dictionary associating series names with their Plot object, {"series1": Plot, ...}
+    """
+    for series, plot in plots.iteritems():
+        plot.points = PointList(xs=trajectory.get_time(), ys=trajectory.get_column(series))
+        trajectory.bind(plot.points.changed)
+
+
+def release_trajectory_plots(trajectory, plots):
     """
-    Resize graph x and y axis when values exceeds set limit
+    Stops redrawing plots made views of a trajectory by trajectory_plots(), so that they can be discarded
 
     PARAMETERS:
-        plot : LinePlot
-            instantiated plot to check
-        graph_widget : Graph
-            graph to be updated
-        axis_type : str
-            "linear" or "log" (defaults to "linear")
-    
-    RETURNS: func
-        lambda(_) function that resizes x and y axis
+        trajectory : Trajectory
+            Trajectory of a simulation run
+        plots : iterable[Plot]
+            Plots that are views of the trajectory columns
     """
-    def resize_x(which_widget):
-        which_widget.xmax += 10
-        which_widget.x_ticks_major += 1
-
-    def resize_y_linear(which_widget):
-        which_widget.ymax += 20
-        which_widget.y_ticks_major += 4
-
-    def resize_y_log(which_widget):
-        which_widget.ymax *= 10
-
-    def lambda_func(_plot, _graph_widget, _axis_type):
-        # x-axis
-        # x represents time, and, in this case, is always linear
-        if _plot.points[-1][0] > _graph_widget.xmax:
-            resize_x(_graph_widget)
-
-        # y-axis
-        if _axis_type == "linear":
-            if _plot.points[-1][1] > _graph_widget.ymax:
-                resize_y_linear(_graph_widget)
-        elif _axis_type == "log":
-            if _plot.points[-1][1] > _graph_widget.ymax:
-                resize_y_log(_graph_widget)
-
-    return lambda _: lambda_func(plot, graph_widget, axis_type)
+    for plot in plots:
+        trajectory.unbind(plot.points.changed)
@@ -0,0 +1,1021 @@
+#!python2
+# coding: utf-8
+
+"""
+INTEGRATORS
+Adaptive step integrators, an alternative to the fixed step forward Euler equations of equations.py
+Steps grow during quiet stretches of a simulation and shrink where values change fast, keeping the local error below
+the given relative and absolute tolerances
+
+Dormand-Prince 5(4) embedded Runge-Kutta pair, with 4th order dense output
+    ref: Dormand, J. R., & Prince, P. J. (1980)
+         A family of embedded Runge-Kutta formulae. Journal of Computational and Applied Mathematics, 6(1), 19-26
+         https://doi.org/10.1016/0771-050X(80)90013-3
+    ref: Hairer, E., Nørsett, S. P., & Wanner, G. (1993)
+         Solving Ordinary Differential Equations I: Nonstiff Problems. Springer
+
+Rosenbrock 2(3) method (ode23s), for stiff problems (e.g. high lymphocyte inhibition or antibiotic concentration)
+    ref: Shampine, L. F., & Reichelt, M. W. (1997)
+         The MATLAB ODE Suite. SIAM Journal on Scientific Computing, 18(1), 1-22
+         https://doi.org/10.1137/S1064827594276424
+    ref: Hairer, E., & Wanner, G. (1996)
+         Solving Ordinary Differential Equations II: Stiff and Differential-Algebraic Problems. Springer
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy
+"""
+
+import numpy as np
+from bin.classes.Scenario2Parameters import ANTIBIOTICS
+from bin.functions.derivatives import (PARTIAL_UPTAKE, SCENARIO_1_STATE, scenario_1_antibiotic_uptake,
+                                       scenario_1_derivatives, scenario_1_jacobian, scenario_1_partial_uptake,
+                                       scenario_2_derivatives, scenario_2_initial_state, scenario_2_jacobian,
+                                       scenario_2_system)
+from bin.functions.engine import (BACTERIA_DEATH, HOST_DEATH, SCENARIO_1_COLUMNS, SCENARIO_2_DEAD_VALUE,
+                                  SCENARIO_2_DEATH_FREQUENCY, scenario_1_values)
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# Dormand-Prince tableau
+DOPRI_C = np.array([0, 1/5.0, 3/10.0, 4/5.0, 8/9.0, 1])
+DOPRI_A = (
+    np.array([]),
+    np.array([1/5.0]),
+    np.array([3/40.0, 9/40.0]),
+    np.array([44/45.0, -56/15.0, 32/9.0]),
+    np.array([19372/6561.0, -25360/2187.0, 64448/6561.0, -212/729.0]),
+    np.array([9017/3168.0, -355/33.0, 46732/5247.0, 49/176.0, -5103/18656.0]))
+DOPRI_B = np.array([35/384.0, 0, 500/1113.0, 125/192.0, -2187/6784.0, 11/84.0])
+# difference between the 5th and 4th order solutions, the last stage is the derivative at the end of the step (FSAL)
+DOPRI_E = np.array([-71/57600.0, 0, 71/16695.0, -71/1920.0, 17253/339200.0, -22/525.0, 1/40.0])
+# dense output polynomial coefficients (powers 1 to 4 of the fraction of the step), one row per stage
+DOPRI_P = np.array([
+    [1, -8048581381/2820520608.0, 8663915743/2820520608.0, -12715105075/11282082432.0],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799.0, -68118460800/10900136933.0, 87487479700/32700410799.0],
+    [0, -1754552775/470086768.0, 14199869525/1410260304.0, -10690763975/1880347072.0],
+    [0, 127303824393/49829197408.0, -318862633887/49829197408.0, 701980252875/199316789632.0],
+    [0, -282668133/205662961.0, 2019193451/616988883.0, -1453857185/822651844.0],
+    [0, 40617522/29380423.0, -110615467/29380423.0, 69997945/29380423.0]])
+
+# Rosenbrock (ode23s) coefficients
+ROSENBROCK_D = 1 / (2 + np.sqrt(2))
+ROSENBROCK_E32 = 6 + np.sqrt(2)
+
+# solvers
+EXPLICIT = "explicit"  # Dormand-Prince
+STIFF = "stiff"  # Rosenbrock
+AUTO = "auto"  # Dormand-Prince, switching to Rosenbrock while the problem is stiff
+
+# stiffness detection, h|λ| on the other side of the Dormand-Prince stability boundary for STIFFNESS_STEPS steps,
+# without STIFFNESS_RESET_STEPS consecutive steps back on the current side in between
+STIFFNESS_LIMIT = 3.25
+STIFFNESS_STEPS = 15
+STIFFNESS_RESET_STEPS = 6
+
+# step size control
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10
+
+# event crossing directions, an event happens when its function goes
+UPWARDS = 1  # from < 0 to >= 0
+DOWNWARDS = -1  # from >= 0 to < 0
+
+# events (HOST_DEATH and BACTERIA_DEATH, from engine.py, end a simulation)
+TREATMENT_START = "treatment_start"
+TREATMENT_STOP = "treatment_stop"
+TREATMENT_PARTIAL = "treatment_partial"  # Adaptive treatment holds the total bacteria density at Ω
+SENSITIVE_EXTINCTION = "sensitive_extinction"
+RESISTANT_EXTINCTION = "resistant_extinction"
+GENUS_DEATH = "genus_death"
+
+
+def rms_norm(values):
+    """
+    Root mean square norm
+
+    PARAMETERS:
+        values : numpy.ndarray
+            Values
+
+    RETURNS: float
+        Root mean square of values
+    """
+    return np.sqrt(np.mean(values ** 2))
+
+
+def initial_step(derivatives, time, state, derivative, args, rtol, atol, error_order=4):
+    """
+    Estimates a good first step size (Hairer, Nørsett & Wanner, II.4)
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        time : float
+            Initial time
+        state : numpy.ndarray
+            Initial state
+        derivative : numpy.ndarray
+            Derivative at the initial state
+        args : tuple
+            Extra arguments of derivatives
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        error_order : int
+            Order of the error estimate of the method
+
+    RETURNS: float
+        First step size
+    """
+    scale = atol + np.abs(state) * rtol
+    state_norm = rms_norm(state / scale)
+    derivative_norm = rms_norm(derivative / scale)
+
+    if state_norm < 1e-5 or derivative_norm < 1e-5:
+        first_guess = 1e-6
+    else:
+        first_guess = 0.01 * state_norm / derivative_norm
+
+    next_derivative = derivatives(time + first_guess, state + first_guess * derivative, *args)
+    second_derivative_norm = rms_norm((next_derivative - derivative) / scale) / first_guess
+
+    if max(derivative_norm, second_derivative_norm) <= 1e-15:
+        second_guess = max(1e-6, first_guess * 1e-3)
+    else:
+        second_guess = (0.01 / max(derivative_norm, second_derivative_norm)) ** (1.0 / (error_order + 1))
+
+    return min(100 * first_guess, second_guess)
+
+
+def dormand_prince_step(derivatives, time, state, derivative, step, args):
+    """
+    One Dormand-Prince step
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        time : float
+            Time at the start of the step
+        state : numpy.ndarray
+            State at the start of the step
+        derivative : numpy.ndarray
+            Derivative at the start of the step
+        step : float
+            Step size
+        args : tuple
+            Extra arguments of derivatives
+
+    RETURNS: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        New state, derivative at the new state, and every stage (7, len(state)), used by the error estimate and
+        dense_output()
+    """
+    stages = np.empty((7, state.shape[0]))
+    stages[0] = derivative
+    for stage in xrange(1, 6):
+        stage_state = state + step * DOPRI_A[stage].dot(stages[:stage])
+        stages[stage] = derivatives(time + DOPRI_C[stage] * step, stage_state, *args)
+
+    new_state = state + step * DOPRI_B.dot(stages[:6])
+    stages[6] = derivatives(time + step, new_state, *args)
+    return new_state, stages[6], stages
+
+
+def dense_output(time, state, step, stages, at_time):
+    """
+    Interpolates the state inside an accepted step
+
+    PARAMETERS:
+        time : float
+            Time at the start of the step
+        state : numpy.ndarray
+            State at the start of the step
+        step : float
+            Step size
+        stages : numpy.ndarray
+            Stages of the step, as returned by dormand_prince_step()
+        at_time : float
+            Time to interpolate at, between time and time + step
+
+    RETURNS: numpy.ndarray
+        Interpolated state
+    """
+    fraction = (at_time - time) / step
+    powers = np.cumprod([fraction] * 4)
+    return state + step * stages.T.dot(DOPRI_P.dot(powers))
+
+
+def dormand_prince(derivatives, time, state, end_time, args=(), rtol=1e-6, atol=1e-6, first_step=None,
+                   max_step=np.inf):
+    """
+    Integrates derivatives from time to end_time, one accepted step at a time
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        time : float
+            Initial time
+        state : numpy.ndarray
+            Initial state
+        end_time : float
+            Final time
+        args : tuple
+            Extra arguments of derivatives
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        first_step : float or None
+            First step size (estimated if None)
+        max_step : float
+            Maximum step size
+
+    YIELDS: (float, numpy.ndarray, float, numpy.ndarray, numpy.ndarray, function)
+        For each accepted step: time and state at its start, time and state at its end, its stages and dense_output()
+    """
+    state = np.asarray(state, dtype=float)
+    derivative = derivatives(time, state, *args)
+
+    if first_step is None:
+        step = initial_step(derivatives, time, state, derivative, args, rtol, atol)
+    else:
+        step = first_step
+
+    while time < end_time:
+        min_step = 10 * abs(np.nextafter(time, np.inf) - time)
+        step = min(max(step, min_step), max_step, end_time - time)
+        rejected = False
+
+        while True:
+            new_state, new_derivative, stages = dormand_prince_step(derivatives, time, state, derivative, step,
+                                                                    args)
+            scale = atol + np.maximum(np.abs(state), np.abs(new_state)) * rtol
+            error = rms_norm(step * DOPRI_E.dot(stages) / scale)
+
+            if error < 1:
+                if error == 0:
+                    factor = MAX_FACTOR
+                else:
+                    factor = min(MAX_FACTOR, SAFETY * error ** (-1 / 5.0))
+                if rejected:
+                    factor = min(1, factor)
+                break
+
+            step *= max(MIN_FACTOR, SAFETY * error ** (-1 / 5.0))
+            rejected = True
+            if step < min_step:
+                raise RuntimeError("Step size became too small at time %s" % time)
+
+        new_time = end_time if time + step >= end_time else time + step
+        yield time, state, new_time, new_state, stages, dense_output
+
+        time, state, derivative = new_time, new_state, new_derivative
+        step *= factor
+
+
+def solve(derivatives, time, state, end_time, args=(), rtol=1e-6, atol=1e-6, times=None, max_step=np.inf):
+    """
+    Integrates derivatives from time to end_time
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        time : float
+            Initial time
+        state : numpy.ndarray
+            Initial state
+        end_time : float
+            Final time
+        args : tuple
+            Extra arguments of derivatives
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        times : iterable[float] or None
+            Sorted times at which to return the state (through dense output); if None, the state at the end of each
+            accepted step is returned
+        max_step : float
+            Maximum step size
+
+    RETURNS: (numpy.ndarray, numpy.ndarray, int)
+        Times, states (one row per time) and number of accepted steps
+    """
+    output_times = [time]
+    output_states = [np.asarray(state, dtype=float)]
+    pending_times = [] if times is None else [at_time for at_time in times if at_time > time]
+    steps = 0
+
+    for step_time, step_state, new_time, new_state, stages, dense in dormand_prince(
+            derivatives, time, state, end_time, args, rtol, atol, max_step=max_step):
+        steps += 1
+        if times is None:
+            output_times.append(new_time)
+            output_states.append(new_state)
+            continue
+
+        while pending_times and pending_times[0] <= new_time:
+            at_time = pending_times.pop(0)
+            output_times.append(at_time)
+            output_states.append(dense(step_time, step_state, new_time - step_time, stages, at_time))
+
+    return np.array(output_times), np.array(output_states), steps
+
+
+def rosenbrock_step(derivatives, time, state, derivative, jacobian_matrix, step, args):
+    """
+    One Rosenbrock step (ode23s, Shampine & Reichelt)
+    The derivatives are assumed not to depend explicitly on time inside a step (treatment changes are events)
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        time : float
+            Time at the start of the step
+        state : numpy.ndarray
+            State at the start of the step
+        derivative : numpy.ndarray
+            Derivative at the start of the step
+        jacobian_matrix : numpy.ndarray
+            Jacobian at the start of the step
+        step : float
+            Step size
+        args : tuple
+            Extra arguments of derivatives
+
+    RETURNS: (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        New state, derivative at the new state, the two stages used by rosenbrock_dense_output() and the local error
+        estimate
+    """
+    inverse = np.linalg.inv(np.eye(state.shape[0]) - step * ROSENBROCK_D * jacobian_matrix)
+
+    first_stage = inverse.dot(derivative)
+    middle_derivative = derivatives(time + step / 2.0, state + step / 2.0 * first_stage, *args)
+    second_stage = inverse.dot(middle_derivative - first_stage) + first_stage
+
+    new_state = state + step * second_stage
+    new_derivative = derivatives(time + step, new_state, *args)
+    third_stage = inverse.dot(new_derivative - ROSENBROCK_E32 * (second_stage - middle_derivative) -
+                              2 * (first_stage - derivative))
+
+    error = step / 6.0 * (first_stage - 2 * second_stage + third_stage)
+    return new_state, new_derivative, np.array([first_stage, second_stage]), error
+
+
+def rosenbrock_dense_output(time, state, step, stages, at_time):
+    """
+    Interpolates the state inside an accepted Rosenbrock step
+
+    PARAMETERS:
+        time : float
+            Time at the start of the step
+        state : numpy.ndarray
+            State at the start of the step
+        step : float
+            Step size
+        stages : numpy.ndarray
+            Stages of the step, as returned by rosenbrock_step()
+        at_time : float
+            Time to interpolate at, between time and time + step
+
+    RETURNS: numpy.ndarray
+        Interpolated state
+    """
+    fraction = (at_time - time) / step
+    return state + step * (fraction * (1 - fraction) * stages[0] +
+                           fraction * (fraction - 2 * ROSENBROCK_D) * stages[1]) / (1 - 2 * ROSENBROCK_D)
+
+
+def rosenbrock(derivatives, jacobian, time, state, end_time, args=(), rtol=1e-6, atol=1e-6, first_step=None,
+               max_step=np.inf):
+    """
+    Integrates derivatives from time to end_time, one accepted step at a time, with a stiff (linearly implicit)
+    Rosenbrock method; same as dormand_prince(), but stable for steps far larger than the fastest decay in the system
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        jacobian : function
+            jacobian(time, state, *args) -> numpy.ndarray
+        time : float
+            Initial time
+        state : numpy.ndarray
+            Initial state
+        end_time : float
+            Final time
+        args : tuple
+            Extra arguments of derivatives and jacobian
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        first_step : float or None
+            First step size (estimated if None)
+        max_step : float
+            Maximum step size
+
+    YIELDS: (float, numpy.ndarray, float, numpy.ndarray, numpy.ndarray, function)
+        For each accepted step: time and state at its start, time and state at its end, its stages and
+        rosenbrock_dense_output()
+    """
+    state = np.asarray(state, dtype=float)
+    derivative = derivatives(time, state, *args)
+
+    if first_step is None:
+        step = initial_step(derivatives, time, state, derivative, args, rtol, atol, error_order=2)
+    else:
+        step = first_step
+
+    while time < end_time:
+        min_step = 10 * abs(np.nextafter(time, np.inf) - time)
+        step = min(max(step, min_step), max_step, end_time - time)
+        jacobian_matrix = jacobian(time, state, *args)
+        rejected = False
+
+        while True:
+            new_state, new_derivative, stages, error = rosenbrock_step(derivatives, time, state, derivative,
+                                                                       jacobian_matrix, step, args)
+            scale = atol + np.maximum(np.abs(state), np.abs(new_state)) * rtol
+            error = rms_norm(error / scale)
+
+            if error < 1:
+                if error == 0:
+                    factor = MAX_FACTOR
+                else:
+                    factor = min(MAX_FACTOR, SAFETY * error ** (-1 / 3.0))
+                if rejected:
+                    factor = min(1, factor)
+                break
+
+            step *= max(MIN_FACTOR, SAFETY * error ** (-1 / 3.0))
+            rejected = True
+            if step < min_step:
+                raise RuntimeError("Step size became too small at time %s" % time)
+
+        new_time = end_time if time + step >= end_time else time + step
+        yield time, state, new_time, new_state, stages, rosenbrock_dense_output
+
+        time, state, derivative = new_time, new_state, new_derivative
+        step *= factor
+
+
+def spectral_radius(matrix, iterations=10):
+    """
+    Estimates the largest eigenvalue magnitude of matrix, by power iteration
+
+    PARAMETERS:
+        matrix : numpy.ndarray
+            Square matrix
+        iterations : int
+            Number of power iterations
+
+    RETURNS: float
+        Estimated spectral radius
+    """
+    vector = np.ones(matrix.shape[0]) / np.sqrt(matrix.shape[0])
+    radius = 0.0
+    for _ in xrange(iterations):
+        vector = matrix.dot(vector)
+        radius = np.sqrt(vector.dot(vector))
+        if radius == 0:
+            break
+        vector /= radius
+    return radius
+
+
+def auto_switching(derivatives, jacobian, time, state, end_time, args=(), rtol=1e-6, atol=1e-6, first_step=None,
+                   switching=None):
+    """
+    Integrates with dormand_prince() while the problem is not stiff, and with rosenbrock() while it is
+    dormand_prince() steps estimate h|λ| from their last two stages (Hairer, Nørsett & Wanner, IV.2); rosenbrock()
+    steps estimate it from the Jacobian; the solver switches after STIFFNESS_STEPS steps on the other side of
+    STIFFNESS_LIMIT (the explicit stability boundary), a count which is reset by STIFFNESS_RESET_STEPS consecutive steps
+    on the current side (step size control keeps explicit steps right around the boundary when the problem is stiff)
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        jacobian : function
+            jacobian(time, state, *args) -> numpy.ndarray
+        time : float
+            Initial time
+        state : numpy.ndarray
+            Initial state
+        end_time : float
+            Final time
+        args : tuple
+            Extra arguments of derivatives and jacobian
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        first_step : float or None
+            First step size (estimated if None)
+        switching : dict or None
+            {"stiff": bool}, solver to start with; updated whenever the solver switches
+
+    YIELDS: (float, numpy.ndarray, float, numpy.ndarray, numpy.ndarray, function)
+        Same as dormand_prince() and rosenbrock()
+    """
+    if switching is None:
+        switching = {"stiff": False}
+    step = first_step
+
+    while time < end_time:
+        if switching["stiff"]:
+            accepted_steps = rosenbrock(derivatives, jacobian, time, state, end_time, args, rtol, atol, step)
+        else:
+            accepted_steps = dormand_prince(derivatives, time, state, end_time, args, rtol, atol, step)
+
+        other_side_steps = 0
+        current_side_steps = 0
+        for accepted_step in accepted_steps:
+            yield accepted_step
+
+            step_time, step_state, time, state, stages, dense = accepted_step
+            step = time - step_time
+
+            if switching["stiff"]:
+                stiff = step * spectral_radius(jacobian(time, state, *args)) > STIFFNESS_LIMIT
+            else:
+                stage_state = step_state + step * DOPRI_A[5].dot(stages[:5])
+                state_difference = rms_norm(state - stage_state)
+                stiff = (state_difference > 0 and
+                         step * rms_norm(stages[6] - stages[5]) / state_difference > STIFFNESS_LIMIT)
+
+            if stiff != switching["stiff"]:
+                other_side_steps += 1
+                current_side_steps = 0
+            else:
+                current_side_steps += 1
+                if current_side_steps >= STIFFNESS_RESET_STEPS:
+                    other_side_steps = 0
+
+            if other_side_steps >= STIFFNESS_STEPS:
+                switching["stiff"] = not switching["stiff"]
+                break
+        else:
+            return
+
+
+def event_crossings(previous_values, values, direction):
+    """
+    Checks which event function components crossed 0
+
+    PARAMETERS:
+        previous_values : float or numpy.ndarray
+            Event function value(s) at the start of a step
+        values : float or numpy.ndarray
+            Event function value(s) at the end of the step
+        direction : int
+            UPWARDS or DOWNWARDS
+
+    RETURNS: numpy.ndarray
+        Boolean array, True for each component that crossed 0
+    """
+    previous_values = np.atleast_1d(previous_values)
+    values = np.atleast_1d(values)
+    if direction == UPWARDS:
+        return (previous_values < 0) & (values >= 0)
+    return (previous_values >= 0) & (values < 0)
+
+
+def locate_event(event_function, component, direction, args, interpolate, step_time, end_time):
+    """
+    Finds the time at which an event function crosses 0 inside an accepted step, using the dense output
+    Illinois (modified regula falsi) method
+
+    PARAMETERS:
+        event_function : function
+            event_function(time, state, *args) -> float or numpy.ndarray
+        component : int
+            Component of the event function value
+        direction : int
+            UPWARDS or DOWNWARDS
+        args : tuple
+            Extra arguments of event_function
+        interpolate : function
+            interpolate(time) -> numpy.ndarray, dense output of the step
+        step_time : float
+            Time at the start of the step
+        end_time : float
+            Time at the end of the step (where the event function has already crossed 0)
+
+    RETURNS: float
+        Event time; the event function has already crossed 0 there
+    """
+    def value(at_time):
+        return np.atleast_1d(event_function(at_time, interpolate(at_time), *args))[component]
+
+    before_time, before_value = step_time, value(step_time)
+    after_time, after_value = end_time, value(end_time)
+    tolerance = 4 * np.finfo(float).eps * max(abs(step_time), abs(end_time), 1)
+    last_side = 0
+
+    for _ in xrange(100):
+        if after_time - before_time <= tolerance:
+            break
+
+        new_time = after_time - after_value * (after_time - before_time) / (after_value - before_value)
+        if not before_time < new_time < after_time:
+            new_time = (before_time + after_time) / 2.0
+        new_value = value(new_time)
+
+        if event_crossings(before_value, new_value, direction)[0]:
+            after_time, after_value = new_time, new_value
+            if last_side == 1:
+                before_value /= 2.0
+            last_side = 1
+        else:
+            before_time, before_value = new_time, new_value
+            if last_side == -1:
+                after_value /= 2.0
+            last_side = -1
+
+    return after_time
+
+
+def solve_until_event(derivatives, time, state, end_time, events, args=(), rtol=1e-6, atol=1e-6, first_step=None,
+                      on_step=None, method=EXPLICIT, jacobian=None, switching=None):
+    """
+    Integrates derivatives from time until end_time, or until the first event
+
+    PARAMETERS:
+        derivatives : function
+            derivatives(time, state, *args) -> numpy.ndarray
+        time : float
+            Initial time
+        state : numpy.ndarray
+            Initial state
+        end_time : float
+            Final time
+        events : list[(str, function, int)]
+            (name, event_function(time, state, *args) -> float or numpy.ndarray, direction), for each event
+        args : tuple
+            Extra arguments of derivatives, jacobian and event functions
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        first_step : float or None
+            First step size (estimated if None)
+        on_step : function or None
+            on_step(interpolate, until_time, until_state), called for each accepted step, where interpolate(time) is
+            the dense output of the step and until_time is the end of the step, or the event time
+        method : str
+            EXPLICIT (Dormand-Prince), STIFF (Rosenbrock) or AUTO (switches between both, see auto_switching())
+        jacobian : function or None
+            jacobian(time, state, *args) -> numpy.ndarray, needed by STIFF and AUTO
+        switching : dict or None
+            AUTO only, {"stiff": bool}, solver in use, kept between calls (so that restarts after events keep it)
+
+    RETURNS: (float, numpy.ndarray, str or None, int, float, int)
+        Time and state at which integration stopped, name and component of the event (None if end_time was reached),
+        size of the last step and number of accepted steps
+    """
+    if method == EXPLICIT:
+        accepted_steps = dormand_prince(derivatives, time, state, end_time, args, rtol, atol, first_step)
+    elif method == STIFF:
+        accepted_steps = rosenbrock(derivatives, jacobian, time, state, end_time, args, rtol, atol, first_step)
+    else:
+        accepted_steps = auto_switching(derivatives, jacobian, time, state, end_time, args, rtol, atol, first_step,
+                                        switching)
+
+    previous_values = [event_function(time, state, *args) for name, event_function, direction in events]
+    last_step = first_step
+    steps = 0
+
+    for step_time, step_state, new_time, new_state, stages, dense in accepted_steps:
+        step = new_time - step_time
+        last_step = step
+        steps += 1
+
+        def interpolate(at_time):
+            return dense(step_time, step_state, step, stages, at_time)
+
+        # earliest event inside this step
+        event = None
+        values = []
+        for (name, event_function, direction), previous_value in zip(events, previous_values):
+            value = event_function(new_time, new_state, *args)
+            values.append(value)
+
+            for component in np.flatnonzero(event_crossings(previous_value, value, direction)):
+                event_time = locate_event(event_function, component, direction, args, interpolate, step_time,
+                                          new_time)
+                if event is None or event_time < event[0]:
+                    event = (event_time, name, component)
+
+        if event is not None:
+            event_time, name, component = event
+            event_state = interpolate(event_time)
+            if on_step is not None:
+                on_step(interpolate, event_time, event_state)
+            return event_time, event_state, name, component, last_step, steps
+
+        if on_step is not None:
+            on_step(interpolate, new_time, new_state)
+        previous_values = values
+
+    return end_time, np.asarray(state, dtype=float) if steps == 0 else new_state, None, None, last_step, steps
+
+
+def scenario_1_output_times(duration, time_step):
+    """
+    Evenly spaced output times, as in the fixed step simulation
+
+    PARAMETERS:
+        duration : int/float
+            Maximum simulated time, in days
+        time_step : int/float
+            Output spacing, in days
+
+    RETURNS: numpy.ndarray
+        Output times, from 0 to duration
+    """
+    return np.arange(0, duration + time_step / 2.0, time_step)
+
+
+def scenario_1_adaptive_uptake(parameters, state):
+    """
+    Decides the antibiotic uptake of an Adaptive treatment, when the total bacteria density is at Ω (after an event)
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+        state : numpy.ndarray
+            [Bs, Br, N, E, M]
+
+    RETURNS: int/str
+        0 if bacteria decrease without antibiotic, 1 if bacteria grow even with antibiotic, PARTIAL_UPTAKE otherwise
+    """
+    partial_uptake = scenario_1_partial_uptake(state, parameters)
+    if partial_uptake <= 0:
+        return 0
+    if partial_uptake >= 1:
+        return 1
+    return PARTIAL_UPTAKE
+
+
+def scenario_1_events(parameters, time, state, uptake):
+    """
+    Builds the events that can happen next in a scenario 1 simulation
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters
+        time : float
+            Time point of the simulation
+        state : numpy.ndarray
+            [Bs, Br, N, E, M]
+        uptake : int/str or None
+            Current antibiotic uptake (None if evaluated at each time point)
+
+    RETURNS: list[(str, function, int)]
+        Events, as used by solve_until_event()
+    """
+    events = [(HOST_DEATH, lambda t, y, *args: y[0] + y[1] - parameters.host_death_density, UPWARDS)]
+    if state[0] > 0:
+        events.append((SENSITIVE_EXTINCTION, lambda t, y, *args: y[0] - 1, DOWNWARDS))
+    if state[1] > 0:
+        events.append((RESISTANT_EXTINCTION, lambda t, y, *args: y[1] - 1, DOWNWARDS))
+
+    if parameters.treatment_type == "Classic":
+        if time < parameters.classic_delay:
+            events.append((TREATMENT_START, lambda t, y, *args: t - parameters.classic_delay, UPWARDS))
+        elif time <= parameters.classic_delay + parameters.classic_duration:
+            events.append((TREATMENT_STOP,
+                           lambda t, y, *args: parameters.classic_delay + parameters.classic_duration - t, DOWNWARDS))
+
+    elif parameters.treatment_type == "Adaptive":
+        threshold = parameters.adaptive_symptoms_at_bacteria_density
+        if uptake == 0:
+            events.append((TREATMENT_START, lambda t, y, *args: y[0] + y[1] - threshold, UPWARDS))
+        elif uptake == 1:
+            events.append((TREATMENT_STOP, lambda t, y, *args: y[0] + y[1] - threshold, DOWNWARDS))
+        else:  # partial uptake lasts while it stays between 0 and 1
+            events.append((TREATMENT_START, lambda t, y, *args: scenario_1_partial_uptake(y, parameters) - 1,
+                           UPWARDS))
+            events.append((TREATMENT_STOP, lambda t, y, *args: scenario_1_partial_uptake(y, parameters),
+                           DOWNWARDS))
+
+    return events
+
+
+def simulate_scenario_1_adaptive(parameters, duration, rtol=1e-6, atol=1e-6, times=None, method=AUTO):
+    """
+    Same as engine.simulate_scenario_1(), using adaptive step integrators
+    Treatment start and stop, Ω crossings, host death and extinctions are located exactly (see scenario_1_events());
+    integration restarts at each of them, so that steps never cross a discontinuity
+    A bacteria strain whose density drops below 1 is considered extinct and set to 0 (equations.py sets it to ~0)
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Simulation parameters (time_step is not used)
+        duration : int/float
+            Maximum simulated time, in days
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        times : iterable[float] or None
+            Sorted times at which values are returned (see scenario_1_output_times()); if None, values at the end of
+            each accepted step (and at each event) are returned
+        method : str
+            EXPLICIT (Dormand-Prince), STIFF (Rosenbrock) or AUTO (Dormand-Prince, switching to Rosenbrock while the
+            equations are stiff)
+
+    RETURNS: (dict[list[float]], str or None, list[dict])
+        Trajectory as {"column": [float, ...], ...}, with the columns in SCENARIO_1_COLUMNS (antibiotic is the
+        antibiotic concentration times its uptake), the outcome of the simulation (HOST_DEATH, BACTERIA_DEATH or None),
+        and every event, in order, as {"time": float, "event": str, "state": {"sensitive": float, ...}}
+        Values at which the simulation ended are not part of the trajectory
+    """
+    trajectory = dict((column, []) for column in SCENARIO_1_COLUMNS)
+    events = []
+    pending_times = None if times is None else list(times)
+
+    time = 0.0
+    state = np.array([parameters.sensitive_initial_density, parameters.resistant_initial_density,
+                      parameters.initial_precursor_cell_density, 0.0, 0.0])
+
+    # uptake is kept constant between events (except for 'User' treatment, which may change at any time)
+    uptake = None
+    if parameters.treatment_type == "Classic":
+        uptake = int(parameters.classic_delay <= time <= parameters.classic_delay + parameters.classic_duration)
+    elif parameters.treatment_type == "Adaptive":
+        total_bacteria_density = state[0] + state[1]
+        if total_bacteria_density < parameters.adaptive_symptoms_at_bacteria_density:
+            uptake = 0
+        elif total_bacteria_density > parameters.adaptive_symptoms_at_bacteria_density:
+            uptake = 1
+        else:
+            uptake = scenario_1_adaptive_uptake(parameters, state)
+
+    def record(at_time, at_state):
+        values = list(scenario_1_values(parameters, (at_time,) + tuple(at_state)))
+        if uptake is None:
+            current_uptake = scenario_1_antibiotic_uptake(parameters, at_time, at_state[0] + at_state[1])
+        elif uptake == PARTIAL_UPTAKE:
+            current_uptake = min(max(scenario_1_partial_uptake(at_state, parameters), 0), 1)
+        else:
+            current_uptake = uptake
+        values[-1] = current_uptake * parameters.antibiotic_mean_concentration
+        for column, value in zip(SCENARIO_1_COLUMNS, values):
+            trajectory[column].append(value)
+
+    def on_step(interpolate, until_time, until_state):
+        if pending_times is None:
+            record(until_time, until_state)
+            return
+        while pending_times and pending_times[0] <= until_time:
+            at_time = pending_times.pop(0)
+            record(at_time, interpolate(at_time))
+
+    if pending_times is None or (pending_times and pending_times[0] <= time):
+        if pending_times:
+            pending_times.pop(0)
+        record(time, state)
+
+    first_step = None
+    switching = {"stiff": method == STIFF}
+    while time < duration:
+        time, state, event, component, first_step, steps = solve_until_event(
+            scenario_1_derivatives, time, state, duration, scenario_1_events(parameters, time, state, uptake),
+            (parameters, uptake), rtol, atol, first_step, on_step, method, scenario_1_jacobian, switching)
+        if event is None:
+            break
+
+        if event == HOST_DEATH:
+            outcome = HOST_DEATH
+        elif event in (SENSITIVE_EXTINCTION, RESISTANT_EXTINCTION):
+            state = state.copy()
+            state[0 if event == SENSITIVE_EXTINCTION else 1] = 0.0
+            outcome = BACTERIA_DEATH if state[0] == 0 and state[1] == 0 else None
+        else:  # treatment changes
+            outcome = None
+            if parameters.treatment_type == "Classic":
+                uptake = int(event == TREATMENT_START)
+            else:
+                uptake = scenario_1_adaptive_uptake(parameters, state)
+                event = {0: TREATMENT_STOP, 1: TREATMENT_START}.get(uptake, TREATMENT_PARTIAL)
+
+        events.append({"time": time, "event": event, "state": dict(zip(SCENARIO_1_STATE, state))})
+
+        if outcome is not None:
+            # values at which the simulation ended are not part of the trajectory
+            if pending_times is None or (trajectory["time"] and trajectory["time"][-1] == time):
+                for column in SCENARIO_1_COLUMNS:
+                    trajectory[column].pop()
+            return trajectory, outcome, events
+
+    return trajectory, None, events
+
+
+def simulate_scenario_2_adaptive(parameters, duration, rtol=1e-6, atol=1e-6, times=None, antibiotics=ANTIBIOTICS,
+                                 sparse=False, method=AUTO):
+    """
+    Same as engine.simulate_scenario_2(), using adaptive step integrators
+    A genus whose density drops below 1, or whose relative frequency drops to SCENARIO_2_DEATH_FREQUENCY, is dead and
+    set to 0; each death is located exactly and integration restarts without that genus
+
+    PARAMETERS:
+        parameters : Scenario2Parameters
+            Simulation parameters (time_step is not used)
+        duration : int/float
+            Maximum simulated time, in days
+        rtol : float
+            Relative tolerance
+        atol : float
+            Absolute tolerance
+        times : iterable[float] or None
+            Sorted times at which values are returned; if None, values at the end of each accepted step (and at each
+            event) are returned
+        antibiotics : iterable[str]
+            Antibiotics in the simulation
+        sparse : bool
+            If True, the inhibition matrix is a scipy.sparse matrix
+        method : str
+            EXPLICIT (Dormand-Prince), STIFF (Rosenbrock) or AUTO (Dormand-Prince, switching to Rosenbrock while the
+            equations are stiff)
+
+    RETURNS: (dict[list[float]], str or None, list[dict])
+        Trajectory as {"time": [float, ...], "bacteria_1": [float, ...], ...}, with bacteria relative frequencies,
+        the outcome of the simulation (BACTERIA_DEATH or None), and every event, in order, as
+        {"time": float, "event": GENUS_DEATH or BACTERIA_DEATH, "genus": str}
+    """
+    system = scenario_2_system(parameters, antibiotics, sparse)
+    genera = parameters.genera
+    genera_count = len(genera)
+    alive = system["alive"]
+
+    trajectory = dict((column, []) for column in ("time",) + genera)
+    events = []
+    pending_times = None if times is None else list(times)
+
+    time = 0.0
+    state = scenario_2_initial_state(system)
+
+    def relative_frequencies(at_state):
+        densities = at_state[:genera_count]
+        # 1.0 (instead of 0.0) allows a single survivor bacteria genus to die
+        frequencies = densities / (1.0 + densities[alive].sum())
+        frequencies[~alive] = SCENARIO_2_DEAD_VALUE
+        return frequencies
+
+    def record(at_time, at_state):
+        trajectory["time"].append(at_time)
+        for bacteria, frequency in zip(genera, relative_frequencies(at_state)):
+            trajectory[bacteria].append(frequency)
+
+    def on_step(interpolate, until_time, until_state):
+        if pending_times is None:
+            record(until_time, until_state)
+            return
+        while pending_times and pending_times[0] <= until_time:
+            at_time = pending_times.pop(0)
+            record(at_time, interpolate(at_time))
+
+    # below 1 bacteria, a genus is extinct (equations.py sets it to ~0, so it dies on the following step)
+    def death(t, y, *args):
+        frequencies = relative_frequencies(y)
+        return np.where(alive, np.minimum(frequencies - SCENARIO_2_DEATH_FREQUENCY, y[:genera_count] - 1), 1)
+
+    def kill(genus, at_time, at_state):
+        alive[genus] = False
+        at_state[genus] = 0.0
+        events.append({"time": at_time, "event": GENUS_DEATH, "genus": genera[genus]})
+
+    state = state.copy()
+    for genus in np.flatnonzero(death(time, state) < 0):
+        kill(genus, time, state)
+    if pending_times is None or (pending_times and pending_times[0] <= time):
+        if pending_times:
+            pending_times.pop(0)
+        record(time, state)
+
+    first_step = None
+    switching = {"stiff": method == STIFF}
+    while time < duration and alive.any():
+        time, state, event, component, first_step, steps = solve_until_event(
+            scenario_2_derivatives, time, state, duration, [(GENUS_DEATH, death, DOWNWARDS)], (system,), rtol, atol,
+            first_step, on_step, method, scenario_2_jacobian, switching)
+        if event is None:
+            break
+
+        state = state.copy()
+        kill(component, time, state)
+        # other genera may have crossed at the same time
+        for genus in np.flatnonzero(death(time, state) < 0):
+            kill(genus, time, state)
+
+    outcome = None
+    if not alive.any():
+        outcome = BACTERIA_DEATH
+        events.append({"time": time, "event": BACTERIA_DEATH, "genus": None})
+    return trajectory, outcome, events
@@ -0,0 +1,492 @@
+#!python2
+# coding: utf-8
+
+"""
+MONTE CARLO
+Scenario 1 uncertainty analysis
+Draws Latin hypercube or Sobol sequence samples over the parameter ranges (Scenario1Parameters.RANGES),
+simulates them in chunks with the vectorized equations of batch.py (spread over a pool of worker processes) and
+reports outcome probabilities and quantiles of the trajectories
+Samples and trajectories are never kept: each chunk draws its own samples and only adds to fixed size histograms
+(log10 scale), from which quantiles are read, so memory use does not depend on the number of samples
+
+Latin hypercube sampling
+    ref: McKay, M. D., Beckman, R. J., & Conover, W. J. (1979)
+         A Comparison of Three Methods for Selecting Values of Input Variables in the Analysis of Output from a
+         Computer Code. Technometrics, 21(2), 239-245
+         https://doi.org/10.2307/1268522
+Sobol sequence (direction numbers by Joe & Kuo)
+    ref: Joe, S., & Kuo, F. Y. (2008)
+         Constructing Sobol sequences with better two-dimensional projections. SIAM Journal on Scientific Computing,
+         30(5), 2635-2654
+         https://doi.org/10.1137/070709359
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy
+"""
+
+import multiprocessing
+import numpy as np
+from bin.classes.Scenario1Parameters import Scenario1Parameters
+from bin.functions.batch import batch_parameters, simulate_scenario_1_batch
+from bin.functions.sweep import CHRONIC, CLEARANCE, HOST_DEATH, OUTCOME_CLASSES
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# samplers
+LATIN_HYPERCUBE = "latin_hypercube"
+SOBOL = "sobol"
+
+# Sobol sequence direction numbers, dimensions 2 onwards: (degree s, polynomial a, initial direction numbers m)
+# (dimension 1 is the van der Corput sequence); Joe & Kuo's table up to every primitive polynomial of degree 7, 37
+# dimensions, enough for sensitivity analyses (2 dimensions per parameter) of every Scenario1Parameters.RANGES entry
+SOBOL_DIRECTIONS = ((1, 0, (1,)),
+                    (2, 1, (1, 3)),
+                    (3, 1, (1, 3, 1)),
+                    (3, 2, (1, 1, 1)),
+                    (4, 1, (1, 1, 3, 3)),
+                    (4, 4, (1, 3, 5, 13)),
+                    (5, 2, (1, 1, 5, 5, 17)),
+                    (5, 4, (1, 1, 5, 5, 5)),
+                    (5, 7, (1, 1, 7, 11, 19)),
+                    (5, 11, (1, 1, 5, 1, 1)),
+                    (5, 13, (1, 1, 1, 3, 11)),
+                    (5, 14, (1, 3, 5, 5, 31)),
+                    (6, 1, (1, 3, 3, 9, 7, 49)),
+                    (6, 13, (1, 1, 1, 15, 21, 21)),
+                    (6, 16, (1, 3, 1, 13, 27, 49)),
+                    (6, 19, (1, 1, 1, 15, 7, 5)),
+                    (6, 22, (1, 3, 1, 15, 13, 25)),
+                    (6, 25, (1, 1, 5, 5, 19, 61)),
+                    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+                    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+                    (7, 7, (1, 1, 3, 13, 7, 35, 63)),
+                    (7, 8, (1, 3, 5, 9, 1, 25, 53)),
+                    (7, 14, (1, 3, 1, 13, 9, 35, 107)),
+                    (7, 19, (1, 3, 1, 5, 27, 61, 31)),
+                    (7, 21, (1, 1, 5, 11, 19, 41, 61)),
+                    (7, 28, (1, 3, 5, 3, 3, 13, 69)),
+                    (7, 31, (1, 1, 7, 13, 1, 19, 1)),
+                    (7, 32, (1, 3, 7, 5, 13, 19, 59)),
+                    (7, 37, (1, 1, 3, 9, 25, 29, 41)),
+                    (7, 41, (1, 3, 5, 13, 23, 1, 55)),
+                    (7, 42, (1, 3, 7, 3, 13, 59, 17)),
+                    (7, 50, (1, 3, 1, 3, 5, 53, 69)),
+                    (7, 55, (1, 1, 5, 5, 23, 33, 13)),
+                    (7, 56, (1, 1, 7, 7, 1, 61, 123)),
+                    (7, 59, (1, 1, 7, 9, 13, 61, 49)),
+                    (7, 62, (1, 3, 3, 5, 3, 55, 33)))
+SOBOL_BITS = 32
+
+# trajectory variables whose quantiles are reported (same as the engine's SCENARIO_1_COLUMNS)
+TRAJECTORY_VARIABLES = ("sensitive", "resistant", "total", "immune")
+
+# histogram bins, log10 of densities (values below the first edge, like extinct strains, fall in the first bin)
+HISTOGRAM_MINIMUM = -4
+HISTOGRAM_MAXIMUM = 16
+HISTOGRAM_BINS_PER_DECADE = 50
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DEFAULT_CHUNK_SIZE = 10000
+
+# rounds of the Feistel network that permutes the Latin hypercube strata
+FEISTEL_ROUNDS = 4
+
+
+def _hash(values, key):
+    # 32 bit hash of each value (numpy.uint64 array, values below 2**32), a bijection for each key
+    values = (values * np.uint64(0x9E3779B1) + np.uint64(key)) & np.uint64(0xffffffff)
+    values ^= values >> np.uint64(16)
+    values = (values * np.uint64(0x85EBCA6B)) & np.uint64(0xffffffff)
+    values ^= values >> np.uint64(13)
+    values = (values * np.uint64(0xC2B2AE35)) & np.uint64(0xffffffff)
+    return values ^ (values >> np.uint64(16))
+
+
+def permute(indexes, count, keys):
+    """
+    Position of indexes in a random permutation of range(count), computed without drawing the whole permutation
+    A Feistel network with one round per key is a permutation of the smallest range of 4**n integers holding count;
+    values outside range(count) are permuted again until they fall inside it (cycle walking)
+
+    PARAMETERS:
+        indexes : numpy.ndarray
+            Indexes, in range(count)
+        count : int
+            Size of the permutation (below 2**32)
+        keys : iterable[int]
+            Round keys, drawn at random (the same keys always give the same permutation)
+
+    RETURNS: numpy.ndarray
+        Permuted indexes (numpy.uint64)
+    """
+    half_bits = np.uint64(max(((count - 1).bit_length() + 1) // 2, 1))
+    mask = (np.uint64(1) << half_bits) - np.uint64(1)
+
+    def feistel(values):
+        left, right = values >> half_bits, values & mask
+        for key in keys:
+            left, right = right, left ^ (_hash(right, key) & mask)
+        return (left << half_bits) | right
+
+    values = feistel(np.asarray(indexes, dtype=np.uint64))
+    outside = values >= count
+    while outside.any():
+        values[outside] = feistel(values[outside])
+        outside = values >= count
+    return values
+
+
+def latin_hypercube(count, dimensions, seed=0, start=0, stop=None):
+    """
+    Latin hypercube sample over the unit hypercube: each dimension is split into count equal strata, and each stratum
+    holds exactly one sample
+    Rows start to stop of the sample are returned: the stratum of each row is its position in a random permutation
+    (see permute()) and its place inside the stratum a hash of the row, so chunks of a large sample are drawn in time
+    and memory proportional to the chunk (the same seed always gives the same sample)
+
+    PARAMETERS:
+        count : int
+            Total number of samples (below 2**32)
+        dimensions : int
+            Number of dimensions
+        seed : int
+            Random seed
+        start : int
+            First row
+        stop : int or None
+            Row after the last one (defaults to count)
+
+    RETURNS: numpy.ndarray
+        Array of shape (stop - start, dimensions), values in [0, 1)
+    """
+    if stop is None:
+        stop = count
+    # Feistel round keys, and the key of the place inside the strata, of each dimension
+    keys = np.random.RandomState(seed).randint(0, 2**31 - 1, (dimensions, FEISTEL_ROUNDS + 1))
+
+    rows = np.arange(start, stop, dtype=np.uint64)
+    samples = np.empty((stop - start, dimensions))
+    for dimension in xrange(dimensions):
+        # stratum of each row, and position inside it
+        samples[:, dimension] = permute(rows, count, keys[dimension, :FEISTEL_ROUNDS])
+        samples[:, dimension] += _hash(rows, keys[dimension, FEISTEL_ROUNDS]) / float(2**32)
+    return samples / count
+
+
+def sobol_directions(dimensions):
+    """
+    Direction numbers of the first dimensions of the Sobol sequence
+
+    PARAMETERS:
+        dimensions : int
+            Number of dimensions (at most len(SOBOL_DIRECTIONS) + 1)
+
+    RETURNS: numpy.ndarray
+        Array of shape (SOBOL_BITS, dimensions), integers
+    """
+    if dimensions > len(SOBOL_DIRECTIONS) + 1:
+        raise ValueError("Sobol sequence is limited to " + str(len(SOBOL_DIRECTIONS) + 1) + " dimensions")
+
+    directions = np.zeros((SOBOL_BITS, dimensions), dtype=np.uint64)
+    directions[:, 0] = [1 << (SOBOL_BITS - bit) for bit in xrange(1, SOBOL_BITS + 1)]
+
+    for dimension in xrange(1, dimensions):
+        degree, polynomial, initial = SOBOL_DIRECTIONS[dimension - 1]
+        values = [m << (SOBOL_BITS - bit) for bit, m in enumerate(initial, 1)]
+        for bit in xrange(degree, SOBOL_BITS):
+            value = values[bit - degree] ^ (values[bit - degree] >> degree)
+            for coefficient in xrange(1, degree):
+                if (polynomial >> (degree - 1 - coefficient)) & 1:
+                    value ^= values[bit - coefficient]
+            values.append(value)
+        directions[:, dimension] = values
+
+    return directions
+
+
+def sobol(count, dimensions, start=0, stop=None):
+    """
+    Sobol sequence over the unit hypercube (Gray code order), rows start to stop
+    Any row range can be drawn directly, so chunks of one long sequence are independent
+
+    PARAMETERS:
+        count : int
+            Total number of samples (a power of 2 gives the best uniformity)
+        dimensions : int
+            Number of dimensions
+        start : int
+            First row
+        stop : int or None
+            Row after the last one (defaults to count)
+
+    RETURNS: numpy.ndarray
+        Array of shape (stop - start, dimensions), values in [0, 1)
+    """
+    if stop is None:
+        stop = count
+    directions = sobol_directions(dimensions)
+
+    indexes = np.arange(start, stop, dtype=np.uint64)
+    gray_code = indexes ^ (indexes >> np.uint64(1))
+    points = np.zeros((stop - start, dimensions), dtype=np.uint64)
+    for bit in xrange(SOBOL_BITS):
+        has_bit = ((gray_code >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        points[has_bit] ^= directions[bit]
+
+    return points / float(1 << SOBOL_BITS)
+
+
+def scale_samples(unit_samples, parameters, ranges=None, base=None):
+    """
+    Maps unit hypercube samples to parameter values, linearly or in orders of magnitude ('log' scale)
+    The range of a parameter bounded by another one (Scenario1Parameters.UPPER_BOUNDS) ends at the value of that one,
+    sampled or taken from base, so the resistant parameters are sampled up to the sensitive ones
+
+    PARAMETERS:
+        unit_samples : numpy.ndarray
+            Array of shape (N, len(parameters)), values in [0, 1)
+        parameters : list[str]
+            Scenario1Parameters field of each column
+        ranges : dict or None
+            {"parameter_name": (min, max, scale), ...} (defaults to Scenario1Parameters.RANGES)
+        base : Scenario1Parameters or None
+            Values of the bounding parameters that are not sampled (defaults to Scenario1Parameters())
+
+    RETURNS: dict[numpy.ndarray]
+        {"parameter_name": array, ...}
+    """
+    if ranges is None:
+        ranges = Scenario1Parameters.RANGES
+    if base is None:
+        base = Scenario1Parameters()
+
+    values = {}
+    # bounding parameters are scaled before the ones they bound
+    columns = sorted(enumerate(parameters), key=lambda column: column[1] in Scenario1Parameters.UPPER_BOUNDS)
+    for column, parameter in columns:
+        minimum, maximum, scale = ranges[parameter]
+        if parameter in Scenario1Parameters.UPPER_BOUNDS:
+            bound = Scenario1Parameters.UPPER_BOUNDS[parameter]
+            maximum = np.maximum(np.minimum(maximum, values[bound] if bound in values else getattr(base, bound)),
+                                 minimum)
+        if scale == "log":
+            values[parameter] = 10 ** (np.log10(minimum) + unit_samples[:, column] *
+                                       (np.log10(maximum) - np.log10(minimum)))
+        else:
+            values[parameter] = minimum + unit_samples[:, column] * (maximum - minimum)
+    return values
+
+
+def histogram_edges():
+    """
+    Edges of the histogram bins, log10 of densities
+
+    RETURNS: numpy.ndarray
+        Bin edges, from HISTOGRAM_MINIMUM to HISTOGRAM_MAXIMUM
+    """
+    bins = (HISTOGRAM_MAXIMUM - HISTOGRAM_MINIMUM) * HISTOGRAM_BINS_PER_DECADE
+    return np.linspace(HISTOGRAM_MINIMUM, HISTOGRAM_MAXIMUM, bins + 1)
+
+
+def histogram_counts(values):
+    """
+    Counts values into histogram bins, row by row
+
+    PARAMETERS:
+        values : numpy.ndarray
+            Array of shape (rows, N), densities
+
+    RETURNS: numpy.ndarray
+        Array of shape (rows, bins), counts of each row
+    """
+    bins = len(histogram_edges()) - 1
+    with np.errstate(divide="ignore"):
+        logarithms = np.log10(values)
+    indexes = np.floor((logarithms - HISTOGRAM_MINIMUM) * HISTOGRAM_BINS_PER_DECADE)
+    indexes = np.clip(np.nan_to_num(indexes), 0, bins - 1).astype(int)
+
+    # one bincount for every row at once
+    indexes += np.arange(values.shape[0])[:, np.newaxis] * bins
+    return np.bincount(indexes.ravel(), minlength=values.shape[0] * bins).reshape(values.shape[0], bins)
+
+
+def histogram_quantiles(counts, quantiles):
+    """
+    Quantiles read from histogram counts, interpolating linearly (in log10 scale) inside each bin
+
+    PARAMETERS:
+        counts : numpy.ndarray
+            Array of shape (rows, bins), as returned by histogram_counts()
+        quantiles : list[float]
+            Quantiles, between 0 and 1
+
+    RETURNS: numpy.ndarray
+        Array of shape (len(quantiles), rows), densities
+    """
+    edges = histogram_edges()
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1].astype(float)
+
+    results = np.empty((len(quantiles), counts.shape[0]))
+    for position, quantile in enumerate(quantiles):
+        targets = quantile * totals
+        for row in xrange(counts.shape[0]):
+            bin_index = min(np.searchsorted(cumulative[row], targets[row]), counts.shape[1] - 1)
+            below = cumulative[row, bin_index - 1] if bin_index > 0 else 0
+            fraction = (targets[row] - below) / counts[row, bin_index] if counts[row, bin_index] else 0
+            results[position, row] = 10 ** (edges[bin_index] + fraction * (edges[bin_index + 1] - edges[bin_index]))
+    return results
+
+
+def output_steps(duration, time_step):
+    """
+    Number of time steps simulate_scenario_1_batch() takes to reach duration
+
+    PARAMETERS:
+        duration : int/float
+            Maximum simulated time, in days
+        time_step : int/float
+            Time step, in days
+
+    RETURNS: int
+        Number of time steps
+    """
+    current_time_point = 0.0
+    steps = 0
+    while current_time_point + time_step <= duration:
+        current_time_point += time_step
+        steps += 1
+    return steps
+
+
+def run_samples(arguments):
+    """
+    Draws and simulates a chunk of samples, counting them into histograms (runs inside a worker process)
+
+    PARAMETERS:
+        arguments : (dict, int, int)
+            Analysis settings (see uncertainty_analysis()), first and last (exclusive) sample of the chunk
+
+    RETURNS: dict
+        "outcomes" : {outcome class: count, ...}
+        "trajectories" : numpy.ndarray, histogram counts of shape (len(TRAJECTORY_VARIABLES), samples + 1, bins)
+        "peak_total" : numpy.ndarray, histogram counts of the peak total bacteria density, shape (1, bins)
+    """
+    settings, start, stop = arguments
+    parameters = settings["parameters"]
+    if settings["sampler"] == SOBOL:
+        unit_samples = sobol(settings["count"], len(parameters), start, stop)
+    else:
+        unit_samples = latin_hypercube(settings["count"], len(parameters), settings["seed"], start, stop)
+
+    values = settings["base"].as_dict()
+    del values["time_step"]
+    values.update(scale_samples(unit_samples, parameters, settings["ranges"], settings["base"]))
+    batch = simulate_scenario_1_batch(batch_parameters(size=stop - start, **values), settings["duration"],
+                                      settings["time_step"], settings["sample_every"])
+
+    # one row per sampled time point plus the final state (see uncertainty_analysis()); parameter sets stop changing
+    # once they reach an outcome, so if all of them did, the last rows are missing
+    rows = settings["samples"] + 1
+    trajectory = batch["trajectory"][:rows]
+    if trajectory.shape[0] < rows:
+        missing = np.repeat(batch["state"][np.newaxis], rows - trajectory.shape[0], axis=0)
+        trajectory = np.concatenate([trajectory, missing])
+
+    variables = (trajectory[:, 0], trajectory[:, 1], trajectory[:, 0] + trajectory[:, 1], trajectory[:, 2:].sum(axis=1))
+    outcomes = [OUTCOME_CLASSES.get(outcome, CHRONIC) for outcome in batch["outcome"]]
+
+    return {"outcomes": dict((outcome, outcomes.count(outcome)) for outcome in (HOST_DEATH, CLEARANCE, CHRONIC)),
+            "trajectories": np.array([histogram_counts(variable) for variable in variables]),
+            "peak_total": histogram_counts(batch["peak_total"][np.newaxis])}
+
+
+def uncertainty_analysis(count, duration, parameters=None, base=None, ranges=None, sampler=LATIN_HYPERCUBE, seed=0,
+                         quantiles=DEFAULT_QUANTILES, sample_interval=1, time_step=1/(24*5.0),
+                         chunk_size=DEFAULT_CHUNK_SIZE, processes=None):
+    """
+    Samples the parameter ranges, simulates every sample and summarizes the outcomes and trajectories
+    Only one chunk of trajectories per process is kept in memory at any time
+    On Windows, scripts calling this function must be guarded by 'if __name__ == "__main__":'
+
+    PARAMETERS:
+        count : int
+            Number of samples
+        duration : int/float
+            Maximum simulated time, in days
+        parameters : list[str] or None
+            Uncertain parameters (defaults to every parameter in ranges)
+        base : Scenario1Parameters or None
+            Values of the remaining parameters (defaults to Scenario1Parameters())
+        ranges : dict or None
+            {"parameter_name": (min, max, scale), ...} (defaults to Scenario1Parameters.RANGES)
+        sampler : str
+            LATIN_HYPERCUBE or SOBOL
+        seed : int
+            Random seed (LATIN_HYPERCUBE only)
+        quantiles : list[float]
+            Quantiles to report, between 0 and 1
+        sample_interval : int/float
+            Time between trajectory samples, in days
+        time_step : int/float
+            Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        chunk_size : int
+            Samples simulated at once by each process
+        processes : int or None
+            Number of worker processes (defaults to the number of CPU cores); 1 runs every chunk in this process
+
+    RETURNS: dict
+        "count" : int, number of samples
+        "outcome_probability" : {HOST_DEATH: float, CLEARANCE: float, CHRONIC: float}
+        "time" : numpy.ndarray, sampled time points, the last one being the end of the simulation
+        "quantiles" : {"sensitive": numpy.ndarray, ...}, one array of shape (len(quantiles), len(time)) for each of
+                      the TRAJECTORY_VARIABLES (parameter sets keep their last values once they reach an outcome)
+        "peak_total" : numpy.ndarray, quantiles of the peak total bacteria density
+    """
+    if ranges is None:
+        ranges = Scenario1Parameters.RANGES
+    if parameters is None:
+        parameters = [field for field in Scenario1Parameters.FIELDS if field in ranges]
+    if base is None:
+        base = Scenario1Parameters()
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    sample_every = max(int(round(sample_interval / float(time_step))), 1)
+    steps = output_steps(duration, time_step)
+    samples = -(-steps // sample_every)
+    settings = {"count": count, "duration": duration, "parameters": list(parameters), "base": base,
+                "ranges": ranges, "sampler": sampler, "seed": seed, "time_step": time_step,
+                "sample_every": sample_every, "samples": samples}
+    # each chunk draws its own samples, so tasks stay small however many are queued
+    tasks = [(settings, start, min(start + chunk_size, count)) for start in xrange(0, count, chunk_size)]
+
+    outcomes = dict((outcome, 0) for outcome in (HOST_DEATH, CLEARANCE, CHRONIC))
+    trajectories = 0
+    peak_total = 0
+
+    pool = multiprocessing.Pool(processes) if processes > 1 else None
+    try:
+        chunk_results = pool.imap_unordered(run_samples, tasks) if pool is not None else (
+            run_samples(task) for task in tasks)
+        for chunk_result in chunk_results:
+            for outcome, outcome_count in chunk_result["outcomes"].iteritems():
+                outcomes[outcome] += outcome_count
+            trajectories = trajectories + chunk_result["trajectories"]
+            peak_total = peak_total + chunk_result["peak_total"]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return {"count": count,
+            "outcome_probability": dict((outcome, outcome_count / float(count))
+                                        for outcome, outcome_count in outcomes.iteritems()),
+            "time": np.minimum(np.arange(samples + 1) * sample_every, steps) * time_step,
+            "quantiles": dict((variable, histogram_quantiles(trajectories[index], quantiles))
+                              for index, variable in enumerate(TRAJECTORY_VARIABLES)),
+            "peak_total": histogram_quantiles(peak_total, quantiles)[:, 0]}
@@ -0,0 +1,355 @@
+#!python2
+# coding: utf-8
+
+"""
+OPTIMIZER
+Scenario 1 treatment schedule optimization
+Finds the Classic treatment delay and duration (t1, t2), or the Adaptive treatment threshold (Ω), that minimize an
+objective (resistant bacteria peak, antibiotic exposure or time to clearance) for a given parameter set, penalizing
+host death
+Uses CMA-ES with restarts (population doubling after each restart), the restarts running side by side; every
+generation of candidate treatments of every run is simulated in a single call of the vectorized equations of batch.py
+
+CMA-ES (Covariance Matrix Adaptation Evolution Strategy)
+    ref: Hansen, N. (2016)
+         The CMA Evolution Strategy: A Tutorial. arXiv:1604.00772
+         https://arxiv.org/abs/1604.00772
+    ref: Auger, A., & Hansen, N. (2005)
+         A restart CMA evolution strategy with increasing population size. IEEE Congress on Evolutionary Computation,
+         2, 1769-1776
+         https://doi.org/10.1109/CEC.2005.1554902
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy
+"""
+
+import numpy as np
+from bin.classes.Scenario1Parameters import Scenario1Parameters
+from bin.functions.batch import OUTCOME_HOST_DEATH, batch_parameters, simulate_scenario_1_batch
+from bin.functions.montecarlo import scale_samples
+from bin.functions.sensitivity import EXPOSURE, LOG_PEAK_RESISTANT, OUTPUTS, TIME_TO_CLEARANCE, outputs
+from bin.functions.sweep import CHRONIC, OUTCOME_CLASSES
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# treatment parameters optimized by default, for each treatment type
+TREATMENT_VARIABLES = {"Classic": ("classic_delay", "classic_duration"),
+                       "Adaptive": ("adaptive_symptoms_at_bacteria_density",)}
+
+# added to the objective of candidates that kill the host (minus the time they keep the host alive, so that the search
+# still moves towards survival while every candidate kills the host)
+HOST_DEATH_PENALTY = 10**6
+
+# candidates outside the bounds are evaluated at the nearest bound, with this penalty per squared unit of distance
+BOUNDS_PENALTY = 10**3
+
+# CMA-ES stopping criteria, in the unit hypercube (bounds mapped to [0, 1])
+STEP_TOLERANCE = 10**-4
+OBJECTIVE_TOLERANCE = 10**-9
+MAX_GENERATIONS = 200
+
+
+def objective_values(batch, duration, objective):
+    """
+    Penalized objective values of a batch of simulations
+
+    PARAMETERS:
+        batch : dict[numpy.ndarray]
+            As returned by simulate_scenario_1_batch()
+        duration : int/float
+            Simulated time, in days
+        objective : str or function
+            One of sensitivity.OUTPUTS (TIME_TO_CLEARANCE, LOG_PEAK_RESISTANT, EXPOSURE), or
+            objective(batch, duration) -> numpy.ndarray
+
+    RETURNS: numpy.ndarray
+        Objective value of each simulation, HOST_DEATH_PENALTY added to those that kill the host
+    """
+    if callable(objective):
+        values = np.asarray(objective(batch, duration), dtype=float)
+    elif objective in OUTPUTS:
+        values = outputs(batch, duration)[objective]
+    else:
+        raise ValueError("unknown objective: " + str(objective))
+
+    host_death = batch["outcome"] == OUTCOME_HOST_DEATH
+    return np.where(host_death, values + HOST_DEATH_PENALTY + (duration - np.nan_to_num(batch["outcome_time"])),
+                    values)
+
+
+def evaluate_candidates(unit_candidates, variables, base, ranges, duration, objective, time_step):
+    """
+    Simulates a population of candidate treatments at once
+
+    PARAMETERS:
+        unit_candidates : numpy.ndarray
+            Array of shape (population, len(variables)), candidates mapped to the unit hypercube
+        variables : list[str]
+            Scenario1Parameters field of each column
+        base : Scenario1Parameters
+            Values of the remaining parameters
+        ranges : dict
+            {"parameter_name": (min, max, scale), ...}
+        duration : int/float
+            Simulated time, in days
+        objective : str or function
+            See objective_values()
+        time_step : int/float
+            Time step, in days
+
+    RETURNS: (numpy.ndarray, dict[numpy.ndarray])
+        Penalized objective value of each candidate, and the simulation results
+    """
+    inside = np.clip(unit_candidates, 0, 1)
+    values = base.as_dict()
+    del values["time_step"]
+    values.update(scale_samples(inside, variables, ranges, base))
+
+    batch = simulate_scenario_1_batch(batch_parameters(size=unit_candidates.shape[0], **values), duration, time_step)
+    penalty = BOUNDS_PENALTY * np.sum((unit_candidates - inside) ** 2, axis=1)
+    return objective_values(batch, duration, objective) + penalty, batch
+
+
+def cma_es_generations(mean, step_size, population, random_state, max_generations=MAX_GENERATIONS):
+    """
+    CMA-ES minimization from a starting mean, as a generator: yields the candidates of each generation and must be
+    sent their values (one per row), so that the candidates of several runs can be evaluated together
+    Stops when the step size or the spread of the values falls below the tolerances, or after max_generations
+
+    PARAMETERS:
+        mean : numpy.ndarray
+            Initial mean of the search distribution
+        step_size : float
+            Initial step size (sigma)
+        population : int
+            Candidates per generation (lambda)
+        random_state : numpy.random.RandomState
+            Random number generator
+        max_generations : int
+            Maximum number of generations
+
+    YIELDS: numpy.ndarray
+        Candidates of a generation, array of shape (population, len(mean))
+    """
+    dimensions = len(mean)
+    mean = np.array(mean, dtype=float)
+
+    # selection and recombination
+    parents = population // 2
+    weights = np.log(parents + 0.5) - np.log(np.arange(1, parents + 1))
+    weights /= weights.sum()
+    effective_parents = 1 / np.sum(weights ** 2)
+
+    # adaptation rates
+    cumulation = (4 + effective_parents / dimensions) / (dimensions + 4 + 2 * effective_parents / dimensions)
+    step_cumulation = (effective_parents + 2) / (dimensions + effective_parents + 5)
+    rank_one = 2 / ((dimensions + 1.3) ** 2 + effective_parents)
+    rank_parents = min(1 - rank_one, 2 * (effective_parents - 2 + 1 / effective_parents) /
+                       ((dimensions + 2) ** 2 + effective_parents))
+    damping = 1 + 2 * max(0, np.sqrt((effective_parents - 1) / (dimensions + 1)) - 1) + step_cumulation
+    expected_norm = np.sqrt(dimensions) * (1 - 1 / (4.0 * dimensions) + 1 / (21.0 * dimensions ** 2))
+
+    covariance = np.eye(dimensions)
+    path = np.zeros(dimensions)
+    step_path = np.zeros(dimensions)
+
+    for generation in xrange(max_generations):
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        scales = np.sqrt(np.maximum(eigenvalues, 10**-20))
+
+        steps = random_state.standard_normal((population, dimensions)).dot(np.diag(scales)).dot(eigenvectors.T)
+        values = yield mean + step_size * steps
+
+        order = np.argsort(values)
+        selected_steps = steps[order[:parents]]
+        mean_step = weights.dot(selected_steps)
+        mean = mean + step_size * mean_step
+
+        # evolution paths
+        inverse_square_root = eigenvectors.dot(np.diag(1 / scales)).dot(eigenvectors.T)
+        step_path = ((1 - step_cumulation) * step_path +
+                     np.sqrt(step_cumulation * (2 - step_cumulation) * effective_parents) *
+                     inverse_square_root.dot(mean_step))
+        step_path_norm = np.linalg.norm(step_path)
+        stalled = (step_path_norm / np.sqrt(1 - (1 - step_cumulation) ** (2 * (generation + 1))) / expected_norm >=
+                   1.4 + 2 / (dimensions + 1.0))
+        path = ((1 - cumulation) * path +
+                (not stalled) * np.sqrt(cumulation * (2 - cumulation) * effective_parents) * mean_step)
+
+        # covariance and step size
+        covariance = ((1 - rank_one - rank_parents) * covariance +
+                      rank_one * (np.outer(path, path) + stalled * cumulation * (2 - cumulation) * covariance) +
+                      rank_parents * selected_steps.T.dot(np.diag(weights)).dot(selected_steps))
+        covariance = (covariance + covariance.T) / 2
+        step_size *= np.exp((step_cumulation / damping) * (step_path_norm / expected_norm - 1))
+
+        if step_size * scales.max() < STEP_TOLERANCE:
+            break
+        if values[order[-1]] - values[order[0]] < OBJECTIVE_TOLERANCE:
+            # flat population (plateau of the objective), restarting is more useful than waiting
+            break
+
+
+def cma_es(function, mean, step_size, population, random_state, max_generations=MAX_GENERATIONS):
+    """
+    Minimizes function with CMA-ES, from a starting mean
+
+    PARAMETERS:
+        function : function
+            function(candidates) -> numpy.ndarray, one value per row of candidates (a whole population at once)
+        mean : numpy.ndarray
+            Initial mean of the search distribution
+        step_size : float
+            Initial step size (sigma)
+        population : int
+            Candidates per generation (lambda)
+        random_state : numpy.random.RandomState
+            Random number generator
+        max_generations : int
+            Maximum number of generations
+
+    RETURNS: (numpy.ndarray, float, int)
+        Best candidate found, its value and the number of function evaluations
+    """
+    return cma_es_runs(function, [mean], step_size, [population], random_state, max_generations)
+
+
+def cma_es_runs(function, means, step_size, populations, random_state, max_generations=MAX_GENERATIONS):
+    """
+    Minimizes function with independent CMA-ES runs, side by side: the candidates of every unfinished run are
+    evaluated in a single call of function per generation, so the number of calls is that of the longest run
+
+    PARAMETERS:
+        function : function
+            function(candidates) -> numpy.ndarray, one value per row of candidates (a whole population at once)
+        means : list[numpy.ndarray]
+            Initial mean of the search distribution of each run
+        step_size : float
+            Initial step size (sigma)
+        populations : list[int]
+            Candidates per generation (lambda) of each run
+        random_state : numpy.random.RandomState
+            Random number generator
+        max_generations : int
+            Maximum number of generations of each run
+
+    RETURNS: (numpy.ndarray, float, int)
+        Best candidate found by any run, its value and the number of function evaluations
+    """
+    runs = [cma_es_generations(mean, step_size, population, random_state, max_generations)
+            for mean, population in zip(means, populations)]
+    pending = [(run, next(run)) for run in runs]
+
+    best_candidate = np.array(means[0], dtype=float)
+    best_value = np.inf
+    evaluations = 0
+
+    while pending:
+        candidates = np.concatenate([run_candidates for _, run_candidates in pending])
+        values = function(candidates)
+        evaluations += len(candidates)
+
+        best = np.argmin(values)
+        if values[best] < best_value:
+            best_candidate, best_value = candidates[best].copy(), values[best]
+
+        # each run gets the values of its own candidates
+        next_pending = []
+        offset = 0
+        for run, run_candidates in pending:
+            try:
+                next_pending.append((run, run.send(values[offset:offset + len(run_candidates)])))
+            except StopIteration:
+                pass
+            offset += len(run_candidates)
+        pending = next_pending
+
+    return best_candidate, best_value, evaluations
+
+
+def optimize_treatment(parameters, duration, objective=LOG_PEAK_RESISTANT, variables=None, ranges=None, restarts=4,
+                       population=None, step_size=0.3, seed=0, time_step=1/(24*5.0), max_generations=MAX_GENERATIONS):
+    """
+    Finds the treatment that minimizes objective for the given parameter set
+    CMA-ES runs over the treatment variables mapped to the unit hypercube ('log' scaled ones in orders of magnitude),
+    starting at the current treatment, and restarts from random points with twice the population each time
+    Restarts are independent, so every run goes on side by side, each generation of all of them simulated in a single
+    batch (see cma_es_runs()); a batch costs about the same as a single simulation up to a few hundred candidates, so
+    the time is that of one simulation of duration per generation of the longest run (at most max_generations): 1 to 6
+    seconds for 10 days at the default time step, growing linearly with duration / time_step
+
+    PARAMETERS:
+        parameters : Scenario1Parameters
+            Parameter set, treatment_type 'Classic' or 'Adaptive'
+        duration : int/float
+            Simulated time, in days
+        objective : str or function
+            TIME_TO_CLEARANCE, LOG_PEAK_RESISTANT, EXPOSURE or objective(batch, duration) -> numpy.ndarray, where batch
+            is the dict returned by simulate_scenario_1_batch() (see objective_values())
+        variables : list[str] or None
+            Parameters to optimize (defaults to TREATMENT_VARIABLES of the treatment type)
+        ranges : dict or None
+            {"parameter_name": (min, max, scale), ...}, bounds of the variables (defaults to
+            Scenario1Parameters.RANGES)
+        restarts : int
+            Number of restarts after the first run
+        population : int or None
+            Candidates per generation of the first run (defaults to 4 + 3 * ln(len(variables)), at least 6)
+        step_size : float
+            Initial step size, as a fraction of the bounds
+        seed : int
+            Random seed
+        time_step : int/float
+            Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        max_generations : int
+            Maximum number of generations of each run
+
+    RETURNS: dict
+        "parameters" : Scenario1Parameters, parameter set with the best treatment
+        "objective" : float, objective value of the best treatment (penalized if the host dies)
+        "outcome" : str, HOST_DEATH, CLEARANCE or CHRONIC (see sweep.py)
+        "evaluations" : int, number of simulations
+    """
+    if variables is None:
+        if parameters.treatment_type not in TREATMENT_VARIABLES:
+            raise ValueError("cannot optimize treatment_type '" + str(parameters.treatment_type) + "', supported: " +
+                             ", ".join(sorted(TREATMENT_VARIABLES)))
+        variables = TREATMENT_VARIABLES[parameters.treatment_type]
+    if ranges is None:
+        ranges = Scenario1Parameters.RANGES
+    if population is None:
+        population = max(4 + int(3 * np.log(len(variables))), 6)
+    variables = list(variables)
+    random_state = np.random.RandomState(seed)
+
+    def function(unit_candidates):
+        return evaluate_candidates(unit_candidates, variables, parameters, ranges, duration, objective, time_step)[0]
+
+    # current treatment, in the unit hypercube
+    start = []
+    for variable in variables:
+        minimum, maximum, scale = ranges[variable]
+        value = getattr(parameters, variable)
+        if scale == "log":
+            start.append((np.log10(value) - np.log10(minimum)) / (np.log10(maximum) - np.log10(minimum)))
+        else:
+            start.append((value - minimum) / float(maximum - minimum))
+    means = [np.clip(start, 0, 1)] + [random_state.random_sample(len(variables)) for _ in xrange(restarts)]
+    populations = [population * 2**run for run in xrange(restarts + 1)]
+
+    best_candidate, best_value, evaluations = cma_es_runs(function, means, step_size, populations, random_state,
+                                                          max_generations)
+
+    best_candidate = np.clip(best_candidate, 0, 1)
+    value, batch = evaluate_candidates(best_candidate[np.newaxis], variables, parameters, ranges, duration, objective,
+                                       time_step)
+    best_values = scale_samples(best_candidate[np.newaxis], variables, ranges, parameters)
+
+    return {"parameters": parameters.copy(**dict((variable, float(best_values[variable][0]))
+                                                 for variable in variables)),
+            "objective": float(value[0]),
+            "outcome": OUTCOME_CLASSES.get(batch["outcome"][0], CHRONIC),
+            "evaluations": evaluations + 1}
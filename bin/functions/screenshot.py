@@ -0,0 +1,93 @@
+#!python2
+# coding: utf-8
+
+"""
+SCREENSHOT
+Widget screenshots in two steps: a fast capture of the widget pixels, in the UI (OpenGL) thread, and the PNG encoding
+and writing, which does not depend on Kivy and can run in any thread
+
+DEPENDENCIES:
+    - Python 2.7
+    - Kivy 1.9.1
+"""
+
+import struct
+import zlib
+from kivy.graphics import ClearBuffers, ClearColor, Fbo, Scale, Translate
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# PNG signature, and zlib compression level of the image data
+PNG_SIGNATURE = "\x89PNG\r\n\x1a\n"
+PNG_COMPRESSION = 6
+
+
+def capture(widget):
+    """
+    Draws a widget to an offscreen framebuffer and grabs its pixels (as Widget.export_to_png() does, without encoding)
+    Must be called from the UI thread
+
+    PARAMETERS:
+        widget : Widget
+            Widget to capture
+
+    RETURNS: (str, int, int)
+        RGBA pixels (top row first), width and height
+    """
+    width, height = int(widget.width), int(widget.height)
+
+    # the widget canvas is drawn only to the framebuffer while it is captured
+    canvas_parent_index = -1
+    if widget.parent is not None:
+        canvas_parent_index = widget.parent.canvas.indexof(widget.canvas)
+        if canvas_parent_index > -1:
+            widget.parent.canvas.remove(widget.canvas)
+
+    fbo = Fbo(size=(width, height), with_stencilbuffer=True)
+    with fbo:
+        ClearColor(0, 0, 0, 1)
+        ClearBuffers()
+        Scale(1, -1, 1)
+        Translate(-widget.x, -widget.y - height, 0)
+    fbo.add(widget.canvas)
+    fbo.draw()
+    pixels = fbo.pixels
+    fbo.remove(widget.canvas)
+
+    if canvas_parent_index > -1:
+        widget.parent.canvas.insert(canvas_parent_index, widget.canvas)
+
+    return pixels, width, height
+
+
+def _png_chunk(chunk_type, data):
+    # PNG chunk: length, type, data and crc of type and data
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data) &
+                                                                          0xffffffff)
+
+
+def write_png(path, pixels, width, height):
+    """
+    Encodes RGBA pixels as a PNG file
+
+    PARAMETERS:
+        path : str
+            File path (.png)
+        pixels : str
+            RGBA pixels, 8 bits per channel, top row first (as returned by capture())
+        width : int
+            Image width
+        height : int
+            Image height
+    """
+    # each row is preceded by its filter type (0, none)
+    stride = width * 4
+    rows = "".join("\x00" + pixels[row * stride:(row + 1) * stride] for row in xrange(height))
+
+    with open(path, "wb") as png_file:
+        png_file.write(PNG_SIGNATURE)
+        png_file.write(_png_chunk("IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        png_file.write(_png_chunk("IDAT", zlib.compress(rows, PNG_COMPRESSION)))
+        png_file.write(_png_chunk("IEND", ""))
@@ -0,0 +1,270 @@
+#!python2
+# coding: utf-8
+
+"""
+SENSITIVITY
+Scenario 1 global sensitivity analysis
+Ranks the parameters by how much of the variation of an output (time to clearance, resistant bacteria peak,
+antibiotic exposure) they explain, over the parameter ranges (Scenario1Parameters.RANGES)
+Every simulation needed by an analysis is run as a single batch, split among worker processes (see sweep.run_batch())
+
+Sobol indices, first order (Saltelli estimator) and total (Jansen estimator), from N * (d + 2) simulations
+    ref: Saltelli, A., Annoni, P., Azzini, I., Campolongo, F., Ratto, M., & Tarantola, S. (2010)
+         Variance based sensitivity analysis of model output. Design and estimator for the total sensitivity index.
+         Computer Physics Communications, 181(2), 259-270
+         https://doi.org/10.1016/j.cpc.2009.09.018
+Morris elementary effects (screening), from r * (d + 1) simulations
+    ref: Morris, M. D. (1991)
+         Factorial Sampling Plans for Preliminary Computational Experiments. Technometrics, 33(2), 161-174
+         https://doi.org/10.2307/1269043
+    ref: Campolongo, F., Cariboni, J., & Saltelli, A. (2007)
+         An effective screening design for sensitivity analysis of large models. Environmental Modelling & Software,
+         22(10), 1509-1518
+         https://doi.org/10.1016/j.envsoft.2006.10.004
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy
+"""
+
+import numpy as np
+from bin.classes.Scenario1Parameters import Scenario1Parameters
+from bin.functions.batch import OUTCOME_BACTERIA_DEATH
+from bin.functions.montecarlo import LATIN_HYPERCUBE, SOBOL, SOBOL_DIRECTIONS, latin_hypercube, scale_samples, sobol
+from bin.functions.sweep import run_batch
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# outputs
+TIME_TO_CLEARANCE = "time_to_clearance"  # simulations without clearance count as lasting the whole duration
+LOG_PEAK_RESISTANT = "log_peak_resistant"  # log10 of the resistant bacteria peak, which spans orders of magnitude
+EXPOSURE = "exposure"  # antibiotic concentration taken up times time
+OUTPUTS = (TIME_TO_CLEARANCE, LOG_PEAK_RESISTANT, EXPOSURE)
+
+
+def outputs(batch, duration):
+    """
+    Outputs of a batch of simulations
+
+    PARAMETERS:
+        batch : dict[numpy.ndarray]
+            As returned by sweep.run_batch()
+        duration : int/float
+            Simulated time, in days
+
+    RETURNS: dict[numpy.ndarray]
+        {output: array, ...}, for each of OUTPUTS
+    """
+    cleared = batch["outcome"] == OUTCOME_BACTERIA_DEATH
+    return {TIME_TO_CLEARANCE: np.where(cleared, batch["outcome_time"], duration),
+            LOG_PEAK_RESISTANT: np.log10(batch["peak_resistant"]),
+            EXPOSURE: batch["exposure"]}
+
+
+def evaluate(unit_samples, parameters, duration, base, ranges, time_step, processes):
+    """
+    Simulates unit hypercube samples
+
+    PARAMETERS:
+        unit_samples : numpy.ndarray
+            Array of shape (N, len(parameters)), values in [0, 1]
+        parameters : list[str]
+            Scenario1Parameters field of each column
+        duration : int/float
+            Simulated time, in days
+        base : Scenario1Parameters
+            Values of the remaining parameters
+        ranges : dict
+            {"parameter_name": (min, max, scale), ...}
+        time_step : int/float
+            Time step, in days
+        processes : int or None
+            Number of worker processes (defaults to the number of CPU cores)
+
+    RETURNS: dict[numpy.ndarray]
+        {output: array, ...}, for each of OUTPUTS
+    """
+    values = base.as_dict()
+    del values["time_step"]
+    values.update(scale_samples(unit_samples, parameters, ranges, base))
+    return outputs(run_batch(values, unit_samples.shape[0], duration, time_step, processes), duration)
+
+
+def sobol_indices(count, duration, parameters=None, base=None, ranges=None, sampler=LATIN_HYPERCUBE, seed=0,
+                  time_step=1/(24*5.0), processes=None):
+    """
+    First order and total Sobol indices of every parameter, for each of OUTPUTS
+    Two independent sample matrices A and B are simulated, plus one matrix per parameter, equal to A except for the
+    column of that parameter, taken from B: count * (len(parameters) + 2) simulations in total
+    The first order index is the fraction of the output variance due to a parameter alone; the total index also counts
+    its interactions with the other parameters
+
+    PARAMETERS:
+        count : int
+            Number of rows of each sample matrix (N)
+        duration : int/float
+            Simulated time, in days
+        parameters : list[str] or None
+            Parameters to analyse (defaults to every parameter in ranges)
+        base : Scenario1Parameters or None
+            Values of the remaining parameters (defaults to Scenario1Parameters())
+        ranges : dict or None
+            {"parameter_name": (min, max, scale), ...} (defaults to Scenario1Parameters.RANGES)
+        sampler : str
+            LATIN_HYPERCUBE or SOBOL (A and B are the two halves of a 2 * len(parameters) dimensional sample; SOBOL
+            supports up to (len(SOBOL_DIRECTIONS) + 1) // 2 parameters)
+        seed : int
+            Random seed (LATIN_HYPERCUBE only)
+        time_step : int/float
+            Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        processes : int or None
+            Number of worker processes (defaults to the number of CPU cores)
+
+    RETURNS: dict
+        {output: {"first_order": {"parameter_name": float, ...}, "total": {"parameter_name": float, ...},
+        "variance": float}, ...}, for each of OUTPUTS (indices are NaN if the output does not vary)
+    """
+    if ranges is None:
+        ranges = Scenario1Parameters.RANGES
+    if parameters is None:
+        parameters = [field for field in Scenario1Parameters.FIELDS if field in ranges]
+    if base is None:
+        base = Scenario1Parameters()
+    dimensions = len(parameters)
+    if sampler == SOBOL and 2 * dimensions > len(SOBOL_DIRECTIONS) + 1:
+        raise ValueError("the SOBOL sampler supports at most " + str((len(SOBOL_DIRECTIONS) + 1) // 2) +
+                         " parameters, " + str(dimensions) + " given")
+
+    if sampler == SOBOL:
+        # the first point of the Sobol sequence is the origin, which would make A and B share a row
+        unit_samples = sobol(count + 1, 2 * dimensions)[1:]
+    else:
+        unit_samples = latin_hypercube(count, 2 * dimensions, seed)
+    matrix_a = unit_samples[:, :dimensions]
+    matrix_b = unit_samples[:, dimensions:]
+
+    # A, B, then A with column i from B, for each parameter i, simulated as a single batch
+    matrices = [matrix_a, matrix_b]
+    for column in xrange(dimensions):
+        matrix_ab = matrix_a.copy()
+        matrix_ab[:, column] = matrix_b[:, column]
+        matrices.append(matrix_ab)
+    results = evaluate(np.concatenate(matrices), parameters, duration, base, ranges, time_step, processes)
+
+    indices = {}
+    for output in OUTPUTS:
+        values = results[output].reshape(dimensions + 2, count)
+        values_a = values[0]
+        values_b = values[1]
+        variance = np.var(values[:2])
+
+        first_order = {}
+        total = {}
+        for column, parameter in enumerate(parameters):
+            values_ab = values[2 + column]
+            if variance > 0:
+                first_order[parameter] = np.mean(values_b * (values_ab - values_a)) / variance
+                total[parameter] = np.mean((values_a - values_ab) ** 2) / (2 * variance)
+            else:
+                first_order[parameter] = total[parameter] = np.nan
+        indices[output] = {"first_order": first_order, "total": total, "variance": variance}
+
+    return indices
+
+
+def morris_trajectories(count, dimensions, levels=4, seed=0):
+    """
+    Morris one-at-a-time trajectories over the unit hypercube
+    Each trajectory starts at a random point of a grid with levels values per dimension, and moves one dimension at a
+    time (in random order) by delta = levels / (2 * (levels - 1)), up or down so as to stay inside the hypercube
+
+    PARAMETERS:
+        count : int
+            Number of trajectories (r)
+        dimensions : int
+            Number of dimensions (d)
+        levels : int
+            Number of grid values per dimension (p), an even number
+        seed : int
+            Random seed
+
+    RETURNS: (numpy.ndarray, numpy.ndarray, numpy.ndarray, float)
+        Points, shape (count, dimensions + 1, dimensions), dimension moved at each step, shape (count, dimensions),
+        signed step of each move (+delta or -delta), shape (count, dimensions), and delta
+    """
+    random_state = np.random.RandomState(seed)
+    delta = levels / (2.0 * (levels - 1))
+
+    points = np.empty((count, dimensions + 1, dimensions))
+    points[:, 0] = random_state.randint(0, levels, (count, dimensions)) / float(levels - 1)
+    order = np.array([random_state.permutation(dimensions) for _ in xrange(count)]).reshape(count, dimensions)
+    steps = np.empty((count, dimensions))
+
+    rows = np.arange(count)
+    for step in xrange(dimensions):
+        points[:, step + 1] = points[:, step]
+        moved = order[:, step]
+        current = points[rows, step, moved]
+        steps[:, step] = np.where(current + delta <= 1 + 1e-12, delta, -delta)
+        points[rows, step + 1, moved] = current + steps[:, step]
+
+    return points, order, steps, delta
+
+
+def morris_screening(count, duration, parameters=None, base=None, ranges=None, levels=4, seed=0,
+                     time_step=1/(24*5.0), processes=None):
+    """
+    Morris elementary effects of every parameter, for each of OUTPUTS: count * (len(parameters) + 1) simulations
+    Elementary effects are output changes per unit of the (normalized) parameter range; mu_star (mean absolute effect)
+    ranks the parameters by influence, and sigma (standard deviation) flags nonlinear effects or interactions
+
+    PARAMETERS:
+        count : int
+            Number of trajectories (r, usually 10 to 50)
+        duration : int/float
+            Simulated time, in days
+        parameters : list[str] or None
+            Parameters to analyse (defaults to every parameter in ranges)
+        base : Scenario1Parameters or None
+            Values of the remaining parameters (defaults to Scenario1Parameters())
+        ranges : dict or None
+            {"parameter_name": (min, max, scale), ...} (defaults to Scenario1Parameters.RANGES)
+        levels : int
+            Number of grid values per parameter, an even number
+        seed : int
+            Random seed
+        time_step : int/float
+            Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        processes : int or None
+            Number of worker processes (defaults to the number of CPU cores)
+
+    RETURNS: dict
+        {output: {"mu": {"parameter_name": float, ...}, "mu_star": {...}, "sigma": {...}}, ...}, for each of OUTPUTS
+    """
+    if ranges is None:
+        ranges = Scenario1Parameters.RANGES
+    if parameters is None:
+        parameters = [field for field in Scenario1Parameters.FIELDS if field in ranges]
+    if base is None:
+        base = Scenario1Parameters()
+    dimensions = len(parameters)
+
+    points, order, steps, delta = morris_trajectories(count, dimensions, levels, seed)
+    results = evaluate(points.reshape(-1, dimensions), parameters, duration, base, ranges, time_step, processes)
+
+    screening = {}
+    rows = np.arange(count)[:, np.newaxis]
+    for output in OUTPUTS:
+        values = results[output].reshape(count, dimensions + 1)
+        effects = np.empty((count, dimensions))
+        # effect of the dimension moved at each step, stored in the column of that dimension
+        effects[rows, order] = (values[:, 1:] - values[:, :-1]) / steps
+
+        screening[output] = {
+            "mu": dict(zip(parameters, effects.mean(axis=0))),
+            "mu_star": dict(zip(parameters, np.abs(effects).mean(axis=0))),
+            "sigma": dict(zip(parameters, effects.std(axis=0, ddof=1) if count > 1 else np.zeros(dimensions)))}
+
+    return screening
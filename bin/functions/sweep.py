@@ -0,0 +1,266 @@
+#!python2
+# coding: utf-8
+
+"""
+SWEEP
+Scenario 1 parameter sweeps
+Runs a grid (or list) of parameter sets across every CPU core, each worker process advancing a chunk of parameter sets
+at once with the vectorized equations of batch.py, and classifies each simulation by its outcome:
+    - host death, total bacteria density reached the host death density
+    - clearance, both bacteria strains died
+    - chronic, neither happened before the end of the simulation
+
+DEPENDENCIES:
+    - Python 2.7
+    - NumPy
+"""
+
+import csv
+import itertools
+import multiprocessing
+import numpy as np
+from bin.classes.Scenario1Parameters import Scenario1Parameters
+from bin.functions.batch import (OUTCOME_BACTERIA_DEATH, OUTCOME_HOST_DEATH, batch_parameters,
+                                 simulate_scenario_1_batch)
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+# outcome classes
+HOST_DEATH = "host_death"
+CLEARANCE = "clearance"
+CHRONIC = "chronic"
+OUTCOME_CLASSES = {OUTCOME_HOST_DEATH: HOST_DEATH, OUTCOME_BACTERIA_DEATH: CLEARANCE}
+
+# result columns, in the order they are written by write_results()
+RESULT_COLUMNS = ("outcome", "time_to_event", "peak_sensitive", "peak_resistant", "peak_total")
+
+# simulate_scenario_1_batch() results returned by run_batch()
+BATCH_RESULTS = ("outcome", "outcome_time", "peak_sensitive", "peak_resistant", "peak_total", "exposure")
+
+# parameter sets per worker task, when not given (a few tasks per process keeps every core busy until the end)
+TASKS_PER_PROCESS = 4
+MAX_CHUNK_SIZE = 5000
+
+
+def parameter_range(parameter, count):
+    """
+    Evenly spaced values over the range of a parameter (Scenario1Parameters.RANGES)
+    'log' scaled parameters are spaced evenly in orders of magnitude
+    Values of the resistant parameters above their sensitive counterparts are left out by grid()
+
+    PARAMETERS:
+        parameter : str
+            Scenario1Parameters field
+        count : int
+            Number of values
+
+    RETURNS: list[float]
+        Values, from the minimum to the maximum of the range
+    """
+    minimum, maximum, scale = Scenario1Parameters.RANGES[parameter]
+    if scale == "log":
+        return list(np.logspace(np.log10(minimum), np.log10(maximum), count))
+    return list(np.linspace(minimum, maximum, count))
+
+
+def grid(base=None, **values):
+    """
+    Every combination of the given parameter values (cartesian product)
+    Combinations where a resistant parameter is above its sensitive counterpart are left out (see
+    Scenario1Parameters.UPPER_BOUNDS), as the SimulATeApp sliders do not allow them
+
+    PARAMETERS:
+        base : Scenario1Parameters or None
+            Values of the parameters not given in values (defaults to Scenario1Parameters())
+        values : kwargs
+            {"parameter_name": [value, ...], ...}, see parameter_range()
+
+    RETURNS: list[Scenario1Parameters]
+        One parameter set per allowed combination, the last parameter (in Scenario1Parameters.FIELDS order) changing
+        fastest
+    """
+    if base is None:
+        base = Scenario1Parameters()
+    parameters = [field for field in Scenario1Parameters.FIELDS if field in values]
+    unknown = set(values) - set(parameters)
+    if unknown:
+        raise ValueError("unknown parameters: " + ", ".join(sorted(unknown)))
+
+    parameter_sets = (base.copy(**dict(zip(parameters, combination)))
+                      for combination in itertools.product(*[values[parameter] for parameter in parameters]))
+    return [parameter_set for parameter_set in parameter_sets if parameter_set.within_bounds()]
+
+
+def run_chunk(arguments):
+    """
+    Simulates a chunk of parameter sets with simulate_scenario_1_batch() (runs inside a worker process)
+    Parameter sets are batched by time_step, as a batch shares a single time step
+
+    PARAMETERS:
+        arguments : (list[Scenario1Parameters], int/float)
+            Parameter sets and duration, in days (a single argument, so it can be used with Pool.imap())
+
+    RETURNS: list[dict]
+        One {"outcome": str, "time_to_event": float or None, "peak_sensitive": float, ...} per parameter set, in order
+    """
+    parameter_sets, duration = arguments
+    results = [None] * len(parameter_sets)
+
+    by_time_step = {}
+    for index, parameters in enumerate(parameter_sets):
+        by_time_step.setdefault(parameters.time_step, []).append(index)
+
+    for time_step, indexes in by_time_step.iteritems():
+        batch = simulate_scenario_1_batch(batch_parameters([parameter_sets[index] for index in indexes]), duration,
+                                          time_step)
+        for position, index in enumerate(indexes):
+            outcome_time = batch["outcome_time"][position]
+            results[index] = {"outcome": OUTCOME_CLASSES.get(batch["outcome"][position], CHRONIC),
+                              "time_to_event": None if np.isnan(outcome_time) else float(outcome_time),
+                              "peak_sensitive": float(batch["peak_sensitive"][position]),
+                              "peak_resistant": float(batch["peak_resistant"][position]),
+                              "peak_total": float(batch["peak_total"][position])}
+    return results
+
+
+def run_sweep(parameter_sets, duration, processes=None, chunk_size=None):
+    """
+    Simulates every parameter set, spreading chunks of them over a pool of worker processes
+    On Windows, scripts calling this function must be guarded by 'if __name__ == "__main__":'
+
+    PARAMETERS:
+        parameter_sets : list[Scenario1Parameters]
+            Parameter sets to simulate (see grid())
+        duration : int/float
+            Maximum simulated time, in days
+        processes : int or None
+            Number of worker processes (defaults to the number of CPU cores); 1 runs every chunk in this process
+        chunk_size : int or None
+            Parameter sets per worker task (defaults to an even split, TASKS_PER_PROCESS tasks per process)
+
+    RETURNS: list[dict]
+        One {"parameters": Scenario1Parameters, "outcome": str, "time_to_event": float or None,
+        "peak_sensitive": float, "peak_resistant": float, "peak_total": float} per parameter set, in order
+        outcome is HOST_DEATH, CLEARANCE or CHRONIC; time_to_event is None for CHRONIC
+    """
+    parameter_sets = list(parameter_sets)
+    if not parameter_sets:
+        return []
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if chunk_size is None:
+        chunk_size = -(-len(parameter_sets) // (processes * TASKS_PER_PROCESS))
+        chunk_size = min(max(chunk_size, 1), MAX_CHUNK_SIZE)
+
+    tasks = [(parameter_sets[start:start + chunk_size], duration)
+             for start in xrange(0, len(parameter_sets), chunk_size)]
+
+    if processes == 1:
+        chunk_results = [run_chunk(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(min(processes, len(tasks)))
+        try:
+            chunk_results = pool.map(run_chunk, tasks, 1)
+        finally:
+            pool.close()
+            pool.join()
+
+    results = []
+    for parameters, result in zip(parameter_sets, itertools.chain.from_iterable(chunk_results)):
+        result["parameters"] = parameters
+        results.append(result)
+    return results
+
+
+def run_batch_chunk(arguments):
+    """
+    Simulates a chunk of a batch with simulate_scenario_1_batch() (runs inside a worker process)
+
+    PARAMETERS:
+        arguments : (dict, int, int/float, int/float)
+            Parameter values (as given to batch_parameters()), number of parameter sets, duration and time step, in
+            days (a single argument, so it can be used with Pool.imap())
+
+    RETURNS: dict[numpy.ndarray]
+        Every BATCH_RESULTS array of simulate_scenario_1_batch()
+    """
+    values, size, duration, time_step = arguments
+    batch = simulate_scenario_1_batch(batch_parameters(size=size, **values), duration, time_step)
+    return dict((key, batch[key]) for key in BATCH_RESULTS)
+
+
+def run_batch(values, size, duration, time_step=1/(24*5.0), processes=None, chunk_size=None):
+    """
+    Same as simulate_scenario_1_batch(batch_parameters(size=size, **values), duration, time_step), with the batch
+    split into chunks that are simulated by a pool of worker processes
+    On Windows, scripts calling this function must be guarded by 'if __name__ == "__main__":'
+
+    PARAMETERS:
+        values : dict
+            {"parameter_name": scalar or numpy.ndarray with one value per parameter set, ...}, see batch_parameters()
+        size : int
+            Number of parameter sets
+        duration : int/float
+            Maximum simulated time, in days
+        time_step : int/float
+            Time step, in days (defaults to 1/(24*5) -> 12 minutes)
+        processes : int or None
+            Number of worker processes (defaults to the number of CPU cores); 1 runs every chunk in this process
+        chunk_size : int or None
+            Parameter sets per worker task (defaults to an even split, TASKS_PER_PROCESS tasks per process)
+
+    RETURNS: dict[numpy.ndarray]
+        Every BATCH_RESULTS array, one value per parameter set
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if chunk_size is None:
+        chunk_size = -(-size // (processes * TASKS_PER_PROCESS))
+        chunk_size = min(max(chunk_size, 1), MAX_CHUNK_SIZE)
+
+    tasks = []
+    for start in xrange(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        chunk_values = dict((parameter, value[start:stop] if np.ndim(value) else value)
+                            for parameter, value in values.iteritems())
+        tasks.append((chunk_values, stop - start, duration, time_step))
+
+    if processes == 1 or len(tasks) == 1:
+        chunk_results = [run_batch_chunk(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(min(processes, len(tasks)))
+        try:
+            chunk_results = pool.map(run_batch_chunk, tasks, 1)
+        finally:
+            pool.close()
+            pool.join()
+
+    return dict((key, np.concatenate([chunk_result[key] for chunk_result in chunk_results]))
+                for key in BATCH_RESULTS)
+
+
+def write_results(results, path):
+    """
+    Writes sweep results to a csv file, one row per parameter set: every Scenario1Parameters field followed by
+    RESULT_COLUMNS (time_to_event is left empty for CHRONIC outcomes)
+
+    PARAMETERS:
+        results : list[dict]
+            As returned by run_sweep()
+        path : str
+            csv file path
+    """
+    with open(path, "wb") as csv_file:
+        csv_writer = csv.writer(csv_file)
+
+        # csv header
+        csv_writer.writerow(list(Scenario1Parameters.FIELDS) + list(RESULT_COLUMNS))
+
+        # csv rows
+        for result in results:
+            parameters = result["parameters"]
+            csv_writer.writerow([getattr(parameters, field) for field in Scenario1Parameters.FIELDS] +
+                                ["" if result[column] is None else result[column] for column in RESULT_COLUMNS])
@@ -11,13 +11,11 @@ DEPENDENCIES:
 
 import os
 from colorsys import hsv_to_rgb
-from kivy.clock import Clock
 from bin.deps.kivy_graph import SmoothLinePlot
 from bin.classes.Antibiotic import Antibiotic
 from bin.classes.AntibioticAssortment import AntibioticAssortment
 from bin.classes.Bacteria import Bacteria
 from bin.classes.Microbiome import Microbiome
-from bin.functions.graphs import xy_max_resize
 from bin.functions.helper_functions import NewColor, XMLTextParser
 
 __author__ = 'Pedro HC David, https://github.com/Kronopt'
@@ -44,6 +42,9 @@ with open(os.path.join("bin", "options.txt"), "r") as options:
                 LANGUAGE.update(XMLTextParser("string", language).parse(os.path.join("bin", "ui", "text.xml")))
 LANGUAGE["selected_language"] = language
 
+# Microbiomes and AntibioticAssortments only create their graphs and plots when shown
+# (see GraphsLayout.scenario_graph())
+
 ############
 # Scenario 1
 ############
@@ -61,14 +62,12 @@ BACTERIA_ASSORTMENT = Microbiome("Generic Microbiome", BACTERIA, LANGUAGE, "grap
 # Immune System
 immune_system_color = hsv_to_rgb(*NewColor.new_color())
 IMMUNE_PLOT = SmoothLinePlot(points=[(0, 1)], color=immune_system_color, line_width=1.01)
-immune_plot_clock = Clock.schedule_interval(xy_max_resize(IMMUNE_PLOT, BACTERIA_ASSORTMENT.get_graph_widget(), "log"),
-                                            1/60.)
 
 # Density limit
 DEATH_LIMIT = SmoothLinePlot(points=[], color=(1, 1, 1))
 
-BACTERIA_ASSORTMENT.get_graph_widget().add_plot(IMMUNE_PLOT)
-BACTERIA_ASSORTMENT.get_graph_widget().add_plot(DEATH_LIMIT)
+BACTERIA_ASSORTMENT.add_plot(IMMUNE_PLOT, watch=True)
+BACTERIA_ASSORTMENT.add_plot(DEATH_LIMIT)
 
 ############
 # Scenario 2
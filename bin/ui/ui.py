@@ -23,13 +23,12 @@ from kivy.core.window import Window
 Window.minimum_height = 520
 Window.minimum_width = 720
 
-import csv
 import datetime
 import os
 from random import random
 import kivy
 from kivy.app import App
-from kivy.clock import Clock
+from kivy.clock import Clock, mainthread
 from kivy.lang import Builder
 from kivy.properties import BooleanProperty, NumericProperty, StringProperty, ObjectProperty, DictProperty
 from kivy.uix.boxlayout import BoxLayout
@@ -41,9 +40,20 @@ from kivy.uix.spinner import Spinner
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.widget import Widget
 import bin.global_variables as global_variables
-from bin.functions.equations import calculate_next_time_step, calculate_next_time_step_scenario2,\
-    nutrients_for_bacteria_duplication_eq
+from bin.classes.Scenario1Parameters import Scenario1Parameters
+from bin.classes.SaveWorker import SaveWorker, write_lines
+from bin.classes.Scenario2Parameters import Scenario2Parameters, ANTIBIOTICS, ENTEROTYPE_GENERA
+from bin.classes.SimulationWorker import SCENARIO_1, SCENARIO_2, SimulationWorker
+from bin.classes.SpillColumn import WINDOW_ROWS
+from bin.classes.StepScheduler import StepScheduler
+from bin.classes.Trajectory import Trajectory
+from bin.classes.TrajectoryRecorder import TrajectoryRecorder, remove_recordings
+from bin.functions.engine import HOST_DEATH, SCENARIO_1_SERIES, scenario_1_generator, scenario_1_row,\
+    scenario_2_generator, scenario_2_row
+from bin.functions.export import run_metadata, write_columns
+from bin.functions.graphs import trajectory_plots
 from bin.functions.helper_functions import XMLTextParser
+from bin.functions.screenshot import capture, write_png
 
 __author__ = 'Pedro HC David, https://github.com/Kronopt'
 __credits__ = ['Pedro HC David']
@@ -206,6 +216,7 @@ class GraphsLayout(BoxLayout):
         self.scenario_2_antibiotics_gut_1 = global_variables.ANTIBIOTIC_ASSORTMENT_GUT1
         self.scenario_2_antibiotics_gut_2 = global_variables.ANTIBIOTIC_ASSORTMENT_GUT2
         self.scenario_2_antibiotics_gut_3 = global_variables.ANTIBIOTIC_ASSORTMENT_GUT3
+        self.shown_graphs = ()  # tuple, Microbiome and AntibioticAssortment shown
 
     def button_states(self, start_bt, pause_bt, restart_bt, new_scenario, new_microbiome, app):
         """
@@ -287,6 +298,7 @@ class GraphsLayout(BoxLayout):
     def scenario_graph(self, scenario, enterotype):
         """
         Selects correct graph for the scenario selected
+        Graphs are created when their scenario (or enterotype) is selected, and released when another one is selected
         
         PARAMETERS:
             scenario : str
@@ -294,37 +306,32 @@ class GraphsLayout(BoxLayout):
             enterotype : str
                 Enterotype selected ("", "gut_enterotype_1", "gut_enterotype_2" or "gut_enterotype_3")
         """
-        if scenario == "scenario_1":
-            self.bacteria_graph.clear_widgets()
-            self.antibiotic_graph.clear_widgets()
-
-            self.bacteria_graph.add_widget(self.scenario_1_bacteria.get_graph_widget())
-            self.antibiotic_graph.add_widget(self.scenario_1_antibiotics.get_graph_widget())
-
-        elif scenario == "scenario_2":
-            self.bacteria_graph.clear_widgets()
-            self.antibiotic_graph.clear_widgets()
+        if scenario not in ("scenario_1", "scenario_2"):
+            return
 
-            if enterotype == "gut_enterotype_1":
-                self.bacteria_graph.clear_widgets()
-                self.antibiotic_graph.clear_widgets()
-
-                self.bacteria_graph.add_widget(self.gut_enterotype_1.get_graph_widget())
-                self.antibiotic_graph.add_widget(self.scenario_2_antibiotics_gut_1.get_graph_widget())
-
-            elif enterotype == "gut_enterotype_2":
-                self.bacteria_graph.clear_widgets()
-                self.antibiotic_graph.clear_widgets()
+        if scenario == "scenario_1":
+            graphs = (self.scenario_1_bacteria, self.scenario_1_antibiotics)
+        elif enterotype == "gut_enterotype_1":
+            graphs = (self.gut_enterotype_1, self.scenario_2_antibiotics_gut_1)
+        elif enterotype == "gut_enterotype_2":
+            graphs = (self.gut_enterotype_2, self.scenario_2_antibiotics_gut_2)
+        elif enterotype == "gut_enterotype_3":
+            graphs = (self.gut_enterotype_3, self.scenario_2_antibiotics_gut_3)
+        else:
+            graphs = ()
 
-                self.bacteria_graph.add_widget(self.gut_enterotype_2.get_graph_widget())
-                self.antibiotic_graph.add_widget(self.scenario_2_antibiotics_gut_2.get_graph_widget())
+        self.bacteria_graph.clear_widgets()
+        self.antibiotic_graph.clear_widgets()
 
-            elif enterotype == "gut_enterotype_3":
-                self.bacteria_graph.clear_widgets()
-                self.antibiotic_graph.clear_widgets()
+        # graphs no longer shown are released, and created again (from the plotted values) when shown again
+        for graph in self.shown_graphs:
+            if graph not in graphs:
+                graph.release()
+        self.shown_graphs = graphs
 
-                self.bacteria_graph.add_widget(self.gut_enterotype_3.get_graph_widget())
-                self.antibiotic_graph.add_widget(self.scenario_2_antibiotics_gut_3.get_graph_widget())
+        if graphs:
+            self.bacteria_graph.add_widget(graphs[0].get_graph_widget())
+            self.antibiotic_graph.add_widget(graphs[1].get_graph_widget())
 
     def update_labels(self, labels, **kwargs):
         """
@@ -342,42 +349,43 @@ class GraphsLayout(BoxLayout):
         update_antibiotic_graph_scenario_2 = False
 
         if "x_axis" in labels:
-            self.scenario_1_antibiotics.get_graph_widget().xlabel = labels["x_axis"]
-            self.scenario_2_antibiotics_gut_1.get_graph_widget().xlabel = labels["x_axis"]
-            self.scenario_2_antibiotics_gut_2.get_graph_widget().xlabel = labels["x_axis"]
-            self.scenario_2_antibiotics_gut_3.get_graph_widget().xlabel = labels["x_axis"]
+            self.scenario_1_antibiotics.set_labels(xlabel=labels["x_axis"])
+            self.scenario_2_antibiotics_gut_1.set_labels(xlabel=labels["x_axis"])
+            self.scenario_2_antibiotics_gut_2.set_labels(xlabel=labels["x_axis"])
+            self.scenario_2_antibiotics_gut_3.set_labels(xlabel=labels["x_axis"])
             update_antibiotic_graph_scenario_1 = True
             update_antibiotic_graph_scenario_2 = True
         if "bacteria_y_axis" in labels:
-            self.scenario_1_bacteria.get_graph_widget().ylabel = labels["bacteria_y_axis"]
+            self.scenario_1_bacteria.set_labels(ylabel=labels["bacteria_y_axis"])
             update_bacteria_graph_scenario_1 = True
         if "antibiotic_y_axis" in labels:
-            self.scenario_1_antibiotics.get_graph_widget().ylabel = labels["antibiotic_y_axis"]
+            self.scenario_1_antibiotics.set_labels(ylabel=labels["antibiotic_y_axis"])
             update_antibiotic_graph_scenario_1 = True
         if "scenario_2_bacteria_y_axis_relative_frequency" in labels:
-            self.gut_enterotype_1.get_graph_widget().ylabel = labels["scenario_2_bacteria_y_axis_relative_frequency"]
-            self.gut_enterotype_2.get_graph_widget().ylabel = labels["scenario_2_bacteria_y_axis_relative_frequency"]
-            self.gut_enterotype_3.get_graph_widget().ylabel = labels["scenario_2_bacteria_y_axis_relative_frequency"]
+            self.gut_enterotype_1.set_labels(ylabel=labels["scenario_2_bacteria_y_axis_relative_frequency"])
+            self.gut_enterotype_2.set_labels(ylabel=labels["scenario_2_bacteria_y_axis_relative_frequency"])
+            self.gut_enterotype_3.set_labels(ylabel=labels["scenario_2_bacteria_y_axis_relative_frequency"])
             update_bacteria_graph_scenario_2 = True
         if "scenario_2_antibiotic_y_axis" in labels:
-            self.scenario_2_antibiotics_gut_1.get_graph_widget().ylabel = labels["scenario_2_antibiotic_y_axis"]
-            self.scenario_2_antibiotics_gut_2.get_graph_widget().ylabel = labels["scenario_2_antibiotic_y_axis"]
-            self.scenario_2_antibiotics_gut_3.get_graph_widget().ylabel = labels["scenario_2_antibiotic_y_axis"]
+            self.scenario_2_antibiotics_gut_1.set_labels(ylabel=labels["scenario_2_antibiotic_y_axis"])
+            self.scenario_2_antibiotics_gut_2.set_labels(ylabel=labels["scenario_2_antibiotic_y_axis"])
+            self.scenario_2_antibiotics_gut_3.set_labels(ylabel=labels["scenario_2_antibiotic_y_axis"])
             update_antibiotic_graph_scenario_2 = True
 
-        # had to access protected methods to update language...
+        # had to access protected methods to update language... (graphs not created yet get the labels when created)
+        graphs = []
         if update_bacteria_graph_scenario_1:
-            self.scenario_1_bacteria.get_graph_widget()._update_labels()
+            graphs.append(self.scenario_1_bacteria)
         if update_antibiotic_graph_scenario_1:
-            self.scenario_1_antibiotics.get_graph_widget()._update_labels()
+            graphs.append(self.scenario_1_antibiotics)
         if update_bacteria_graph_scenario_2:
-            self.gut_enterotype_1.get_graph_widget()._update_labels()
-            self.gut_enterotype_2.get_graph_widget()._update_labels()
-            self.gut_enterotype_3.get_graph_widget()._update_labels()
+            graphs.extend([self.gut_enterotype_1, self.gut_enterotype_2, self.gut_enterotype_3])
         if update_antibiotic_graph_scenario_2:
-            self.scenario_2_antibiotics_gut_1.get_graph_widget()._update_labels()
-            self.scenario_2_antibiotics_gut_2.get_graph_widget()._update_labels()
-            self.scenario_2_antibiotics_gut_3.get_graph_widget()._update_labels()
+            graphs.extend([self.scenario_2_antibiotics_gut_1, self.scenario_2_antibiotics_gut_2,
+                           self.scenario_2_antibiotics_gut_3])
+        for graph in graphs:
+            if graph.has_graph_widget():
+                graph.get_graph_widget()._update_labels()
 
 
 class PopupWarning(Popup):
@@ -404,6 +412,22 @@ class PopupWarning(Popup):
 
         return True
 
+    def show_progress(self, title, warning_text):
+        """
+        Defines popup title and message content, and shows it if it is not shown yet (for messages updated while a
+        task runs)
+
+        PARAMETERS:
+            title : str
+                Title text of popup
+            warning_text : str
+                Message content
+        """
+        self.title = title
+        self.warning_text = warning_text
+        if self.parent is None:
+            self.open()
+
 
 class TreatmentToggle(ToggleButton):
     """
@@ -462,6 +486,19 @@ class SimulATeApp(App):
     # simulation speed
     simulation_speed = NumericProperty(1/(24*5.0))  # 24*5 steps per day
 
+    # simulated days per second of wall time, 0 follows simulation_speed (60 time steps per second), float("inf") runs
+    # as fast as possible (see StepScheduler)
+    simulation_rate = NumericProperty(0)
+
+    # whether simulations run in a separate process (see SimulationWorker), instead of between frames; set by the
+    # "Process" toggle next to the speed slider, read when a simulation starts
+    simulation_in_background = BooleanProperty(False)
+
+    # writes saved files in a background thread (see save())
+    save_worker = SaveWorker()
+    saving_popup = None  # (PopupWarning, title, message) shown when every saved file is written
+    saving_errors = []  # errors of the files being saved
+
     ######################
     # Scenario 1 variables
     ######################
@@ -470,14 +507,20 @@ class SimulATeApp(App):
     clock_add_points = None
     data_generator_instance = None
 
-    # plots
-    sensitive_bacteria_plot = global_variables.BACTERIA_ASSORTMENT.get_bacteria()["Sensitive"].get_plot()
-    resistant_bacteria_plot = global_variables.BACTERIA_ASSORTMENT.get_bacteria()["Resistant"].get_plot()
-    total_bacteria_plot = global_variables.BACTERIA_ASSORTMENT.get_bacteria()["Total"].get_plot()
-    antibiotic_plot = global_variables.ANTIBIOTIC_ASSORTMENT.get_antibiotics()["Generic Antibiotic"].get_plot()
+    # plots (bacteria and antibiotic plots are only created when shown, see GraphsLayout.scenario_graph())
     immune_system_plot = global_variables.IMMUNE_PLOT
     death_limit = global_variables.DEATH_LIMIT
 
+    # plotted values, a single time column shared by every plot (plots are views of its columns, see build()), older
+    # rows spilled to disk
+    trajectory_scenario_1 = Trajectory(SCENARIO_1_SERIES, (1, 1, 1, 1, 0), WINDOW_ROWS)
+    # csv file of the plotted values, written while the simulation runs (see save())
+    recorder_scenario_1 = TrajectoryRecorder(trajectory_scenario_1, "scenario_1_plot_points",
+                                             ["Time", "Total Bacteria Density", "Sensitive Bacteria Density",
+                                              "Resistant Bacteria Density", "Immune System Density",
+                                              "Antibiotic Concentration"],
+                                             save_worker=save_worker)
+
     # Scenario 1 default parameters
     default_parameters = {"sensitive_initial_density": 10, "sensitive_growth_rate": 3.3,
                           "sensitive_antibiotic_inhibition": 1, "resistant_initial_density": 2,
@@ -537,6 +580,10 @@ class SimulATeApp(App):
     # Scenario 2 variables
     ######################
 
+    # parameters of each running simulation, {"scenario_1": Scenario1Parameters,
+    #                                          "gut_enterotype_1": Scenario2Parameters, ...}
+    simulation_parameters = {}
+
     # function instances
     clock_add_points_gut_1 = None
     clock_add_points_gut_2 = None
@@ -545,230 +592,35 @@ class SimulATeApp(App):
     data_generator_instance_gut_2 = None
     data_generator_instance_gut_3 = None
 
-    # enterotype 1 plots
-    bacteroides_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Bacteroides"].get_plot()
-    faecalibacterium_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()[
-        "Faecalibacterium"].get_plot()
-    roseburia_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Roseburia"].get_plot()
-    bifidobacterium_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Bifidobacterium"].get_plot()
-    lachnospiraceae_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Lachnospiraceae"].get_plot()
-    parabacteroides_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Parabacteroides"].get_plot()
-    alistipes_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Alistipes"].get_plot()
-    anaerostipes_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Anaerostipes"].get_plot()
-    acidaminococcus_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Acidaminococcus"].get_plot()
-    collinsella_ent_1_plot = global_variables.BACTERIA_ASSORTMENT_GUT1.get_bacteria()["Collinsella"].get_plot()
-
-    bacteria_plots_ent_1 = {"bacteroides": bacteroides_ent_1_plot, "faecalibacterium": faecalibacterium_ent_1_plot,
-                            "roseburia": roseburia_ent_1_plot, "bifidobacterium": bifidobacterium_ent_1_plot,
-                            "lachnospiraceae": lachnospiraceae_ent_1_plot,
-                            "parabacteroides": parabacteroides_ent_1_plot,
-                            "alistipes": alistipes_ent_1_plot, "anaerostipes": anaerostipes_ent_1_plot,
-                            "acidaminococcus": acidaminococcus_ent_1_plot,
-                            "collinsella": collinsella_ent_1_plot}
-
-    antibiotic_plots_ent_1 = {"lincosamides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Lincosamides"].get_plot(),
-                              "macrolides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Macrolides"].get_plot(),
-                              "penicillins": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Penicillins"].get_plot(),
-                              "quinolones": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Quinolones"].get_plot(),
-                              "streptogramins": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Streptogramins"].get_plot(),
-                              "sulfonamides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Sulfonamides"].get_plot(),
-                              "tetacyclines": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Tetacyclines"].get_plot(),
-                              "trimethoprims": global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_antibiotics()[
-        "Trimethoprims"].get_plot()}
-
-    # enterotype 2 plots
-    prevotella_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Prevotella"].get_plot()
-    bacteroides_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Bacteroides"].get_plot()
-    faecalibacterium_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()[
-        "Faecalibacterium"].get_plot()
-    lachnospiraceae_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Lachnospiraceae"].get_plot()
-    roseburia_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Roseburia"].get_plot()
-    collinsella_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Collinsella"].get_plot()
-    bifidobacterium_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Bifidobacterium"].get_plot()
-    alistipes_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Alistipes"].get_plot()
-    streptococcus_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Streptococcus"].get_plot()
-    coprococcus_ent_2_plot = global_variables.BACTERIA_ASSORTMENT_GUT2.get_bacteria()["Coprococcus"].get_plot()
-
-    bacteria_plots_ent_2 = {"prevotella": prevotella_ent_2_plot, "bacteroides": bacteroides_ent_2_plot,
-                            "faecalibacterium": faecalibacterium_ent_2_plot,
-                            "lachnospiraceae": lachnospiraceae_ent_2_plot, "roseburia": roseburia_ent_2_plot,
-                            "collinsella": collinsella_ent_2_plot, "bifidobacterium": bifidobacterium_ent_2_plot,
-                            "alistipes": alistipes_ent_2_plot, "streptococcus": streptococcus_ent_2_plot,
-                            "coprococcus": coprococcus_ent_2_plot}
-
-    antibiotic_plots_ent_2 = {"lincosamides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Lincosamides"].get_plot(),
-                              "macrolides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Macrolides"].get_plot(),
-                              "penicillins": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Penicillins"].get_plot(),
-                              "quinolones": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Quinolones"].get_plot(),
-                              "streptogramins": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Streptogramins"].get_plot(),
-                              "sulfonamides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Sulfonamides"].get_plot(),
-                              "tetacyclines": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Tetacyclines"].get_plot(),
-                              "trimethoprims": global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_antibiotics()[
-        "Trimethoprims"].get_plot()}
-
-    # enterotype 3 plots
-    bacteroides_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Bacteroides"].get_plot()
-    bifidobacterium_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Bifidobacterium"].get_plot()
-    faecalibacterium_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()[
-        "Faecalibacterium"].get_plot()
-    lachnospiraceae_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Lachnospiraceae"].get_plot()
-    alistipes_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Alistipes"].get_plot()
-    akkermansia_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Akkermansia"].get_plot()
-    ruminococcus_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Ruminococcus"].get_plot()
-    collinsella_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Collinsella"].get_plot()
-    blautia_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Blautia"].get_plot()
-    roseburia_ent_3_plot = global_variables.BACTERIA_ASSORTMENT_GUT3.get_bacteria()["Roseburia"].get_plot()
-
-    bacteria_plots_ent_3 = {"bacteroides": bacteroides_ent_3_plot, "bifidobacterium": bifidobacterium_ent_3_plot,
-                            "faecalibacterium": faecalibacterium_ent_3_plot,
-                            "lachnospiraceae": lachnospiraceae_ent_3_plot, "alistipes": alistipes_ent_3_plot,
-                            "akkermansia": akkermansia_ent_3_plot, "ruminococcus": ruminococcus_ent_3_plot,
-                            "collinsella": collinsella_ent_3_plot, "blautia": blautia_ent_3_plot,
-                            "roseburia": roseburia_ent_3_plot}
-
-    antibiotic_plots_ent_3 = {"lincosamides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Lincosamides"].get_plot(),
-                              "macrolides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Macrolides"].get_plot(),
-                              "penicillins": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Penicillins"].get_plot(),
-                              "quinolones": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Quinolones"].get_plot(),
-                              "streptogramins": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Streptogramins"].get_plot(),
-                              "sulfonamides": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Sulfonamides"].get_plot(),
-                              "tetacyclines": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Tetacyclines"].get_plot(),
-                              "trimethoprims": global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_antibiotics()[
-        "Trimethoprims"].get_plot()}
-
-    # enterotype 1 bacteria dead status
-    bacteria_dead_status_ent_1 = {"bacteroides": False, "faecalibacterium": False, "roseburia": False,
-                                  "bifidobacterium": False, "lachnospiraceae": False, "parabacteroides": False,
-                                  "alistipes": False, "anaerostipes": False, "acidaminococcus": False,
-                                  "collinsella": False}
-
-    # enterotype 2 bacteria dead status
-    bacteria_dead_status_ent_2 = {"prevotella": False, "bacteroides": False, "faecalibacterium": False,
-                                  "lachnospiraceae": False, "roseburia": False, "collinsella": False,
-                                  "bifidobacterium": False, "alistipes": False, "streptococcus": False,
-                                  "coprococcus": False}
-
-    # enterotype 3 bacteria dead status
-    bacteria_dead_status_ent_3 = {"bacteroides": False, "bifidobacterium": False, "faecalibacterium": False,
-                                  "lachnospiraceae": False, "alistipes": False, "akkermansia": False,
-                                  "ruminococcus": False, "collinsella": False, "blautia": False, "roseburia": False}
-
-    # scenario 2 bacteria densities
-    # default densities calculated from:
-    #   Arumugam et al (2011). Enterotypes of the human gut microbiome.
-    #   Nature, 473(7346), 174–180. https://doi.org/10.1038/nature09944
-
-    # enterotype 1 bacteria densities
-    bacteria_densities_ent_1 = {"bacteroides": 5793111, "faecalibacterium": 1166914, "roseburia": 832900,
-                                "bifidobacterium": 623495, "lachnospiraceae": 464077, "parabacteroides": 322975,
-                                "alistipes": 221911, "anaerostipes": 208595, "acidaminococcus": 208271,
-                                "collinsella": 157744}
-
-    # enterotype 2 bacteria densities
-    bacteria_densities_ent_2 = {"prevotella": 5141001, "bacteroides": 1591226, "faecalibacterium": 771497,
-                                "lachnospiraceae": 706805, "roseburia": 461321, "collinsella": 381627,
-                                "bifidobacterium": 255327, "alistipes": 246779, "streptococcus": 231394,
-                                "coprococcus": 213016}
-
-    # enterotype 3 bacteria densities
-    bacteria_densities_ent_3 = {"bacteroides": 2585052, "bifidobacterium": 1571051, "faecalibacterium": 1449116,
-                                "lachnospiraceae": 913032, "alistipes": 909552, "akkermansia": 588316,
-                                "ruminococcus": 553816, "collinsella": 506545, "blautia": 455794, "roseburia": 467722}
-
-    # growth rate for each bacteria
-    # default growth rate is the same as in scenario 1
-    bacteria_growth_rate = {"bacteroides": 3.3, "faecalibacterium": 3.3, "roseburia": 3.3,
-                            "bifidobacterium": 3.3, "lachnospiraceae": 3.3, "parabacteroides": 3.3,
-                            "alistipes": 3.3, "anaerostipes": 3.3, "acidaminococcus": 3.3,
-                            "collinsella": 3.3, "prevotella": 3.3, "streptococcus": 3.3,
-                            "coprococcus": 3.3, "akkermansia": 3.3, "ruminococcus": 3.3, "blautia": 3.3}
-
-    # enterotype 1 nutrient consumption rates
-    bacteria_nutrient_consumption_ent_1 = {"bacteroides": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["bacteroides"], 0.01, 5, bacteria_densities_ent_1["bacteroides"]),
-                                           "faecalibacterium": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["faecalibacterium"], 0.01, 5, bacteria_densities_ent_1["faecalibacterium"]),
-                                           "roseburia": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["roseburia"], 0.01, 5, bacteria_densities_ent_1["roseburia"]),
-                                           "bifidobacterium": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["bifidobacterium"], 0.01, 5, bacteria_densities_ent_1["bifidobacterium"]),
-                                           "lachnospiraceae": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["lachnospiraceae"], 0.01, 5, bacteria_densities_ent_1["lachnospiraceae"]),
-                                           "parabacteroides": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["parabacteroides"], 0.01, 5, bacteria_densities_ent_1["parabacteroides"]),
-                                           "alistipes": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["alistipes"], 0.01, 5, bacteria_densities_ent_1["alistipes"]),
-                                           "anaerostipes": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["anaerostipes"], 0.01, 5, bacteria_densities_ent_1["anaerostipes"]),
-                                           "acidaminococcus": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["acidaminococcus"], 0.01, 5, bacteria_densities_ent_1["acidaminococcus"]),
-                                           "collinsella": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["collinsella"], 0.01, 5, bacteria_densities_ent_1["collinsella"])}
-
-    # enterotype 2 nutrient consumption rates
-    bacteria_nutrient_consumption_ent_2 = {"prevotella": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["prevotella"], 0.01, 5, bacteria_densities_ent_2["prevotella"]),
-                                           "bacteroides": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["bacteroides"], 0.01, 5, bacteria_densities_ent_2["bacteroides"]),
-                                           "faecalibacterium": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["faecalibacterium"], 0.01, 5, bacteria_densities_ent_2["faecalibacterium"]),
-                                           "lachnospiraceae": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["lachnospiraceae"], 0.01, 5, bacteria_densities_ent_2["lachnospiraceae"]),
-                                           "roseburia": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["roseburia"], 0.01, 5, bacteria_densities_ent_2["roseburia"]),
-                                           "collinsella": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["collinsella"], 0.01, 5, bacteria_densities_ent_2["collinsella"]),
-                                           "bifidobacterium": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["bifidobacterium"], 0.01, 5, bacteria_densities_ent_2["bifidobacterium"]),
-                                           "alistipes": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["alistipes"], 0.01, 5, bacteria_densities_ent_2["alistipes"]),
-                                           "streptococcus": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["streptococcus"], 0.01, 5, bacteria_densities_ent_2["streptococcus"]),
-                                           "coprococcus": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["coprococcus"], 0.01, 5, bacteria_densities_ent_2["coprococcus"])}
-
-    # enterotype 3 nutrient consumption rates
-    bacteria_nutrient_consumption_ent_3 = {"bacteroides": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["bacteroides"], 0.01, 5, bacteria_densities_ent_3["bacteroides"]),
-                                           "bifidobacterium": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["bifidobacterium"], 0.01, 5, bacteria_densities_ent_3["bifidobacterium"]),
-                                           "faecalibacterium": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["faecalibacterium"], 0.01, 5, bacteria_densities_ent_3["faecalibacterium"]),
-                                           "lachnospiraceae": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["lachnospiraceae"], 0.01, 5, bacteria_densities_ent_3["lachnospiraceae"]),
-                                           "alistipes": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["alistipes"], 0.01, 5, bacteria_densities_ent_3["alistipes"]),
-                                           "akkermansia": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["akkermansia"], 0.01, 5, bacteria_densities_ent_3["akkermansia"]),
-                                           "ruminococcus": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["ruminococcus"], 0.01, 5, bacteria_densities_ent_3["ruminococcus"]),
-                                           "collinsella": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["collinsella"], 0.01, 5, bacteria_densities_ent_3["collinsella"]),
-                                           "blautia": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["blautia"], 0.01, 5, bacteria_densities_ent_3["blautia"]),
-                                           "roseburia": nutrients_for_bacteria_duplication_eq(
-        bacteria_growth_rate["roseburia"], 0.01, 5, bacteria_densities_ent_3["roseburia"])}
+    # enterotype 1 plotted values, a single time column shared by every plot (see build())
+    trajectory_ent_1 = Trajectory(ENTEROTYPE_GENERA["gut_enterotype_1"] + ANTIBIOTICS,
+                                  (1,) * len(ENTEROTYPE_GENERA["gut_enterotype_1"]) + (0,) * len(ANTIBIOTICS),
+                                  WINDOW_ROWS)
+    # csv file of the bacteria densities, written while the simulation runs (see save())
+    recorder_ent_1 = TrajectoryRecorder(trajectory_ent_1, "scenario_2_gut_enterotype_1_plot_points",
+                                        ["Time"] + [genus.capitalize() + " Density"
+                                                    for genus in ENTEROTYPE_GENERA["gut_enterotype_1"]],
+                                        ENTEROTYPE_GENERA["gut_enterotype_1"], save_worker=save_worker)
+
+    # enterotype 2 plotted values, a single time column shared by every plot (see build())
+    trajectory_ent_2 = Trajectory(ENTEROTYPE_GENERA["gut_enterotype_2"] + ANTIBIOTICS,
+                                  (1,) * len(ENTEROTYPE_GENERA["gut_enterotype_2"]) + (0,) * len(ANTIBIOTICS),
+                                  WINDOW_ROWS)
+    # csv file of the bacteria densities, written while the simulation runs (see save())
+    recorder_ent_2 = TrajectoryRecorder(trajectory_ent_2, "scenario_2_gut_enterotype_2_plot_points",
+                                        ["Time"] + [genus.capitalize() + " Density"
+                                                    for genus in ENTEROTYPE_GENERA["gut_enterotype_2"]],
+                                        ENTEROTYPE_GENERA["gut_enterotype_2"], save_worker=save_worker)
+
+    # enterotype 3 plotted values, a single time column shared by every plot (see build())
+    trajectory_ent_3 = Trajectory(ENTEROTYPE_GENERA["gut_enterotype_3"] + ANTIBIOTICS,
+                                  (1,) * len(ENTEROTYPE_GENERA["gut_enterotype_3"]) + (0,) * len(ANTIBIOTICS),
+                                  WINDOW_ROWS)
+    # csv file of the bacteria densities, written while the simulation runs (see save())
+    recorder_ent_3 = TrajectoryRecorder(trajectory_ent_3, "scenario_2_gut_enterotype_3_plot_points",
+                                        ["Time"] + [genus.capitalize() + " Density"
+                                                    for genus in ENTEROTYPE_GENERA["gut_enterotype_3"]],
+                                        ENTEROTYPE_GENERA["gut_enterotype_3"], save_worker=save_worker)
 
     # TODO bibliography, default inhibition (remove random)
     # default antibiotic inhibition for each bacteria
@@ -938,8 +790,7 @@ class SimulATeApp(App):
 
                 # clock
                 self.clock_add_points = Clock.schedule_interval(self.add_points(
-                    self.data_generator_instance, self.sensitive_bacteria_plot, self.resistant_bacteria_plot,
-                    self.antibiotic_plot, self.immune_system_plot, self.total_bacteria_plot), 1/60.)
+                    self.data_generator_instance, self.trajectory_scenario_1), 1/60.)
 
                 graph_layout_instance.restart_in_progress_scenario_1_property = False
                 graph_layout_instance.simulation_going_scenario_1_property = True
@@ -964,8 +815,7 @@ class SimulATeApp(App):
 
                     # clock
                     self.clock_add_points_gut_1 = Clock.schedule_interval(self.add_points_scenario2(
-                        self.data_generator_instance_gut_1, self.bacteria_plots_ent_1, self.antibiotic_plots_ent_1),
-                        1/60.)
+                        self.data_generator_instance_gut_1, self.trajectory_ent_1), 1/60.)
 
                     graph_layout_instance.restart_in_progress_scenario_2_ent_1_property = False
                     graph_layout_instance.simulation_going_scenario_2_ent_1_property = True
@@ -978,8 +828,7 @@ class SimulATeApp(App):
 
                     # clock
                     self.clock_add_points_gut_2 = Clock.schedule_interval(self.add_points_scenario2(
-                        self.data_generator_instance_gut_2, self.bacteria_plots_ent_2, self.antibiotic_plots_ent_2),
-                        1/60.)
+                        self.data_generator_instance_gut_2, self.trajectory_ent_2), 1/60.)
 
                     graph_layout_instance.restart_in_progress_scenario_2_ent_2_property = False
                     graph_layout_instance.simulation_going_scenario_2_ent_2_property = True
@@ -992,8 +841,7 @@ class SimulATeApp(App):
 
                     # clock
                     self.clock_add_points_gut_3 = Clock.schedule_interval(self.add_points_scenario2(
-                        self.data_generator_instance_gut_3, self.bacteria_plots_ent_3, self.antibiotic_plots_ent_3),
-                        1/60.)
+                        self.data_generator_instance_gut_3, self.trajectory_ent_3), 1/60.)
 
                     graph_layout_instance.restart_in_progress_scenario_2_ent_3_property = False
                     graph_layout_instance.simulation_going_scenario_2_ent_3_property = True
@@ -1019,14 +867,15 @@ class SimulATeApp(App):
                     if (not graph_layout_instance.pause_scenario_1_property and
                             graph_layout_instance.simulation_going_scenario_1_property):
                         self.clock_add_points.cancel()
+                        self.control_data_generator(self.data_generator_instance, "pause")
                         graph_layout_instance.simulation_going_scenario_1_property = False
                         graph_layout_instance.pause_scenario_1_property = True
                     # if paused, restart add_points schedule
                     elif (graph_layout_instance.pause_scenario_1_property
                           and not graph_layout_instance.simulation_going_scenario_1_property):
+                        self.control_data_generator(self.data_generator_instance, "resume")
                         self.clock_add_points = Clock.schedule_interval(self.add_points(
-                            self.data_generator_instance, self.sensitive_bacteria_plot, self.resistant_bacteria_plot,
-                            self.antibiotic_plot, self.immune_system_plot, self.total_bacteria_plot), 1/60.)
+                            self.data_generator_instance, self.trajectory_scenario_1), 1/60.)
                         graph_layout_instance.simulation_going_scenario_1_property = True
                         graph_layout_instance.pause_scenario_1_property = False
                 else:
@@ -1039,14 +888,15 @@ class SimulATeApp(App):
                         if (not graph_layout_instance.pause_scenario_2_ent_1_property and
                                 graph_layout_instance.simulation_going_scenario_2_ent_1_property):
                             self.clock_add_points_gut_1.cancel()
+                            self.control_data_generator(self.data_generator_instance_gut_1, "pause")
                             graph_layout_instance.simulation_going_scenario_2_ent_1_property = False
                             graph_layout_instance.pause_scenario_2_ent_1_property = True
                         # if paused, restart add_points schedule
                         elif (graph_layout_instance.pause_scenario_2_ent_1_property
                               and not graph_layout_instance.simulation_going_scenario_2_ent_1_property):
+                            self.control_data_generator(self.data_generator_instance_gut_1, "resume")
                             self.clock_add_points_gut_1 = Clock.schedule_interval(self.add_points_scenario2(
-                                self.data_generator_instance_gut_1, self.bacteria_plots_ent_1,
-                                self.antibiotic_plots_ent_1), 1/60.)
+                                self.data_generator_instance_gut_1, self.trajectory_ent_1), 1/60.)
                             graph_layout_instance.simulation_going_scenario_2_ent_1_property = True
                             graph_layout_instance.pause_scenario_2_ent_1_property = False
                     else:
@@ -1058,14 +908,15 @@ class SimulATeApp(App):
                         if (not graph_layout_instance.pause_scenario_2_ent_2_property and
                                 graph_layout_instance.simulation_going_scenario_2_ent_2_property):
                             self.clock_add_points_gut_2.cancel()
+                            self.control_data_generator(self.data_generator_instance_gut_2, "pause")
                             graph_layout_instance.simulation_going_scenario_2_ent_2_property = False
                             graph_layout_instance.pause_scenario_2_ent_2_property = True
                         # if paused, restart add_points schedule
                         elif (graph_layout_instance.pause_scenario_2_ent_2_property
                               and not graph_layout_instance.simulation_going_scenario_2_ent_2_property):
+                            self.control_data_generator(self.data_generator_instance_gut_2, "resume")
                             self.clock_add_points_gut_2 = Clock.schedule_interval(self.add_points_scenario2(
-                                self.data_generator_instance_gut_2, self.bacteria_plots_ent_2,
-                                self.antibiotic_plots_ent_2), 1/60.)
+                                self.data_generator_instance_gut_2, self.trajectory_ent_2), 1/60.)
                             graph_layout_instance.simulation_going_scenario_2_ent_2_property = True
                             graph_layout_instance.pause_scenario_2_ent_2_property = False
                     else:
@@ -1077,14 +928,15 @@ class SimulATeApp(App):
                         if (not graph_layout_instance.pause_scenario_2_ent_3_property and
                                 graph_layout_instance.simulation_going_scenario_2_ent_3_property):
                             self.clock_add_points_gut_3.cancel()
+                            self.control_data_generator(self.data_generator_instance_gut_3, "pause")
                             graph_layout_instance.simulation_going_scenario_2_ent_3_property = False
                             graph_layout_instance.pause_scenario_2_ent_3_property = True
                         # if paused, restart add_points schedule
                         elif (graph_layout_instance.pause_scenario_2_ent_3_property
                               and not graph_layout_instance.simulation_going_scenario_2_ent_3_property):
+                            self.control_data_generator(self.data_generator_instance_gut_3, "resume")
                             self.clock_add_points_gut_3 = Clock.schedule_interval(self.add_points_scenario2(
-                                self.data_generator_instance_gut_3, self.bacteria_plots_ent_3,
-                                self.antibiotic_plots_ent_3), 1/60.)
+                                self.data_generator_instance_gut_3, self.trajectory_ent_3), 1/60.)
                             graph_layout_instance.simulation_going_scenario_2_ent_3_property = True
                             graph_layout_instance.pause_scenario_2_ent_3_property = False
                     else:
@@ -1120,24 +972,12 @@ class SimulATeApp(App):
 
             # cancel add_points clock
             self.clock_add_points.cancel()
+            self.control_data_generator(self.data_generator_instance, "stop")
 
-            # reset (x,y) points
-            self.sensitive_bacteria_plot.points = [(0, 1)]
-            self.resistant_bacteria_plot.points = [(0, 1)]
-            self.total_bacteria_plot.points = [(0, 1)]
-            self.immune_system_plot.points = [(0, 1)]
-            self.antibiotic_plot.points = [(0, 0)]
+            # reset (x,y) points (axis managers resize the graphs back to their initial size)
+            self.trajectory_scenario_1.reset()
             self.death_limit.points = []
 
-            # resets xy resizes
-            global_variables.BACTERIA_ASSORTMENT.get_graph_widget().xmax = 10
-            global_variables.BACTERIA_ASSORTMENT.get_graph_widget().x_ticks_major = 1
-            global_variables.BACTERIA_ASSORTMENT.get_graph_widget().ymax = 10**3
-            global_variables.ANTIBIOTIC_ASSORTMENT.get_graph_widget().xmax = 10
-            global_variables.ANTIBIOTIC_ASSORTMENT.get_graph_widget().x_ticks_major = 1
-            global_variables.ANTIBIOTIC_ASSORTMENT.get_graph_widget().ymax = 20
-            global_variables.ANTIBIOTIC_ASSORTMENT.get_graph_widget().y_ticks_major = 4
-
             # allows pause_simulation to not activate when a restart is made
             graph_layout_instance.restart_in_progress_scenario_1_property = True
             graph_layout_instance.simulation_going_scenario_1_property = False
@@ -1149,25 +989,10 @@ class SimulATeApp(App):
 
                 # cancel add_points clock
                 self.clock_add_points_gut_1.cancel()
+                self.control_data_generator(self.data_generator_instance_gut_1, "stop")
 
-                # resets bacteria death status
-                for bacteria in self.bacteria_dead_status_ent_1:
-                    self.bacteria_dead_status_ent_1[bacteria] = False
-
-                # reset (x,y) points
-                for bacteria_plot in self.bacteria_plots_ent_1.itervalues():
-                    bacteria_plot.points = [(0, 1)]
-                for antibiotic_plot in self.antibiotic_plots_ent_1.itervalues():
-                    antibiotic_plot.points = [(0, 0)]
-
-                # resets xy resizes
-                global_variables.BACTERIA_ASSORTMENT_GUT1.get_graph_widget().xmax = 10
-                global_variables.BACTERIA_ASSORTMENT_GUT1.get_graph_widget().x_ticks_major = 1
-                global_variables.BACTERIA_ASSORTMENT_GUT1.get_graph_widget().ymax = 1
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_graph_widget().xmax = 10
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_graph_widget().x_ticks_major = 1
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_graph_widget().ymax = 20
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT1.get_graph_widget().y_ticks_major = 4
+                # reset (x,y) points (axis managers resize the graphs back to their initial size)
+                self.trajectory_ent_1.reset()
 
                 # allows pause_simulation to not activate when a restart is made
                 graph_layout_instance.restart_in_progress_scenario_2_ent_1_property = True
@@ -1178,25 +1003,10 @@ class SimulATeApp(App):
 
                 # cancel add_points clock
                 self.clock_add_points_gut_2.cancel()
+                self.control_data_generator(self.data_generator_instance_gut_2, "stop")
 
-                # resets bacteria death status
-                for bacteria in self.bacteria_dead_status_ent_2:
-                    self.bacteria_dead_status_ent_2[bacteria] = False
-
-                # reset (x,y) points
-                for bacteria_plot in self.bacteria_plots_ent_2.itervalues():
-                    bacteria_plot.points = [(0, 1)]
-                for antibiotic_plot in self.antibiotic_plots_ent_2.itervalues():
-                    antibiotic_plot.points = [(0, 0)]
-
-                # resets xy resizes
-                global_variables.BACTERIA_ASSORTMENT_GUT2.get_graph_widget().xmax = 10
-                global_variables.BACTERIA_ASSORTMENT_GUT2.get_graph_widget().x_ticks_major = 1
-                global_variables.BACTERIA_ASSORTMENT_GUT2.get_graph_widget().ymax = 1
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_graph_widget().xmax = 10
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_graph_widget().x_ticks_major = 1
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_graph_widget().ymax = 20
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT2.get_graph_widget().y_ticks_major = 4
+                # reset (x,y) points (axis managers resize the graphs back to their initial size)
+                self.trajectory_ent_2.reset()
 
                 # allows pause_simulation to not activate when a restart is made
                 graph_layout_instance.restart_in_progress_scenario_2_ent_2_property = True
@@ -1207,25 +1017,10 @@ class SimulATeApp(App):
 
                 # cancel add_points clock
                 self.clock_add_points_gut_3.cancel()
+                self.control_data_generator(self.data_generator_instance_gut_3, "stop")
 
-                # resets bacteria death status
-                for bacteria in self.bacteria_dead_status_ent_3:
-                    self.bacteria_dead_status_ent_3[bacteria] = False
-
-                # reset (x,y) points
-                for bacteria_plot in self.bacteria_plots_ent_3.itervalues():
-                    bacteria_plot.points = [(0, 1)]
-                for antibiotic_plot in self.antibiotic_plots_ent_3.itervalues():
-                    antibiotic_plot.points = [(0, 0)]
-
-                # resets xy resizes
-                global_variables.BACTERIA_ASSORTMENT_GUT3.get_graph_widget().xmax = 10
-                global_variables.BACTERIA_ASSORTMENT_GUT3.get_graph_widget().x_ticks_major = 1
-                global_variables.BACTERIA_ASSORTMENT_GUT3.get_graph_widget().ymax = 1
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_graph_widget().xmax = 10
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_graph_widget().x_ticks_major = 1
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_graph_widget().ymax = 20
-                global_variables.ANTIBIOTIC_ASSORTMENT_GUT3.get_graph_widget().y_ticks_major = 4
+                # reset (x,y) points (axis managers resize the graphs back to their initial size)
+                self.trajectory_ent_3.reset()
 
                 # allows pause_simulation to not activate when a restart is made
                 graph_layout_instance.restart_in_progress_scenario_2_ent_3_property = True
@@ -1234,6 +1029,8 @@ class SimulATeApp(App):
     def save(self, graphs_box_id, directory, popup_warning_id, popup_warning_title_and_message):
         """
         Saves current plot data to a csv file and current options in use to a txt file
+        Files are written by the save worker, in a background thread, after the graphs are captured and the plot data
+        and options are copied
         
         PARAMETERS:
             graphs_box_id: object
@@ -1256,699 +1053,444 @@ class SimulATeApp(App):
                                      str(current_datetime.second)])
 
         if self.current_scenario == "scenario_1":
-            # saves screenshot of graph
-            graphs_box_id.export_to_png(os.path.join(directory, "scenario_1_screenshot_" + current_datetime + ".png"))
+            # saves screenshot of graph (only the pixels are captured here, the PNG is encoded by the save worker)
+            self.save_worker.put(write_png, os.path.join(directory, "scenario_1_screenshot_" + current_datetime +
+                                                         ".png"),
+                                 *capture(graphs_box_id))
 
             # save csv file with x-axis and y-axis values for each plot
-            with open(os.path.join(directory, "scenario_1_plot_points_" + current_datetime + ".csv"), "wb") as csv_file:
-                csv_writer = csv.writer(csv_file)
-
-                # csv header
-                csv_writer.writerow(["Time", "Total Bacteria Density", "Sensitive Bacteria Density",
-                                     "Resistant Bacteria Density", "Immune System Density", "Antibiotic Concentration"])
-
-                # csv rows
-                # ignores first value, as it exists only to allow plot instantiation (first y value must not be zero)
-                for i in xrange(len(self.total_bacteria_plot.points[1:])):
-                    # gets time from total_bacteria_plot and y values for each plot
-                    csv_writer.writerow([self.total_bacteria_plot.points[i + 1][0],  # x value, time
-                                         self.total_bacteria_plot.points[i + 1][1],  # y value
-                                         self.sensitive_bacteria_plot.points[i + 1][1],  # y value
-                                         self.resistant_bacteria_plot.points[i + 1][1],  # y value
-                                         self.immune_system_plot.points[i + 1][1],  # y value
-                                         self.antibiotic_plot.points[i + 1][1]  # y value
-                                         ])
+            # (recorded while the simulation runs, the recording is only moved or copied)
+            self.recorder_scenario_1.save(os.path.join(directory, "scenario_1_plot_points_" + current_datetime +
+                                                       ".csv"))
+
+            # save binary columnar file with the same values, and the parameters used, for analysis (written from
+            # snapshots, as the simulation may go on while the file is written)
+            self.save_worker.put(write_columns, os.path.join(directory, "scenario_1_plot_points_" + current_datetime +
+                                                             ".npy"),
+                                 self.trajectory_scenario_1.snapshot(),
+                                 **run_metadata(self.simulation_parameters.get("scenario_1")))
 
             # save options used
-            with open(os.path.join(directory, "scenario_1_options_used_" + current_datetime + ".txt"), "wb"
-                      ) as options_used_file:
-                options_used_file.writelines([
-                    global_variables.LANGUAGE["antibiotic_sensitive_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["bacteria_initial_density"] + ": " + str(self.sensitive_initial_density) +
-                    "\n",
-                    global_variables.LANGUAGE["antibiotic_sensitive_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["bacteria_growth_rate"] + ": " + str(self.sensitive_growth_rate) + "\n",
-                    global_variables.LANGUAGE["antibiotic_sensitive_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["bacteria_antibiotic_inhibition"] + ": " +
-                    str(self.sensitive_antibiotic_inhibition) + "\n",
-                    global_variables.LANGUAGE["antibiotic_resistant_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["bacteria_initial_density"] + ": " + str(self.resistant_initial_density) +
-                    "\n",
-                    global_variables.LANGUAGE["antibiotic_resistant_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["bacteria_growth_rate"] + ": " + str(self.resistant_growth_rate) + "\n",
-                    global_variables.LANGUAGE["antibiotic_resistant_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["bacteria_antibiotic_inhibition"] + ": " +
-                    str(self.resistant_antibiotic_inhibition) + "\n",
-                    global_variables.LANGUAGE["both_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["both_bacteria_lymphocyte_inhibition"] + ": " +
-                    str(self.lymphocyte_inhibition) + "\n",
-                    global_variables.LANGUAGE["both_bacteria_label"].strip() + ", " +
-                    global_variables.LANGUAGE["both_bacteria_density_death"] + ": " +
-                    str(self.host_death_density) + "\n",
-                    global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
-                    global_variables.LANGUAGE["immune_system_initial_density"] + ": " +
-                    str(self.initial_precursor_cell_density) + "\n",
-                    global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
-                    global_variables.LANGUAGE["immune_system_proliferation_rate"] + ": " +
-                    str(self.immune_cell_proliferation_rate) + "\n",
-                    global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
-                    global_variables.LANGUAGE["immune_system_half_maximum_growth"] + ": " +
-                    str(self.immune_cell_half_maximum_growth) + "\n",
-                    global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
-                    global_variables.LANGUAGE["immune_system_effector_decay_rate"] + ": " +
-                    str(self.effector_decay_rate) + "\n",
-                    global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
-                    global_variables.LANGUAGE["immune_system_memory_conversion"] + ": " +
-                    str(self.memory_cell_conversion_rate) + "\n",
-                    global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
-                    global_variables.LANGUAGE["antibiotic_mean_concentration"] + ": " +
-                    str(self.antibiotic_mean_concentration) + "\n",
-                    global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
-                    global_variables.LANGUAGE["toggle_classic"] + ", " +
-                    global_variables.LANGUAGE["treatment_classic_delay"] + ": " + str(self.classic_delay) + "\n",
-                    global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
-                    global_variables.LANGUAGE["toggle_classic"] + ", " +
-                    global_variables.LANGUAGE["treatment_classic_duration"] + ": " + str(self.classic_duration) + "\n",
-                    global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
-                    global_variables.LANGUAGE["toggle_adaptive"] + ", " +
-                    global_variables.LANGUAGE["treatment_adaptive_symptoms"] + ": " +
-                    str(self.adaptive_symptoms_at_bacteria_density) + "\n",
-                    global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
-                    global_variables.LANGUAGE["toggle_user"] + ", " +
-                    global_variables.LANGUAGE["treatment_user_administer"] + ": " + str(self.user_administer)
-                ])
-
-            # popup warning message
-            popup_warning_id.show_message(*popup_warning_title_and_message)
+            self.save_worker.put(write_lines, os.path.join(directory, "scenario_1_options_used_" + current_datetime +
+                                                           ".txt"), [
+                global_variables.LANGUAGE["antibiotic_sensitive_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["bacteria_initial_density"] + ": " + str(self.sensitive_initial_density) +
+                "\n",
+                global_variables.LANGUAGE["antibiotic_sensitive_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["bacteria_growth_rate"] + ": " + str(self.sensitive_growth_rate) + "\n",
+                global_variables.LANGUAGE["antibiotic_sensitive_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["bacteria_antibiotic_inhibition"] + ": " +
+                str(self.sensitive_antibiotic_inhibition) + "\n",
+                global_variables.LANGUAGE["antibiotic_resistant_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["bacteria_initial_density"] + ": " + str(self.resistant_initial_density) +
+                "\n",
+                global_variables.LANGUAGE["antibiotic_resistant_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["bacteria_growth_rate"] + ": " + str(self.resistant_growth_rate) + "\n",
+                global_variables.LANGUAGE["antibiotic_resistant_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["bacteria_antibiotic_inhibition"] + ": " +
+                str(self.resistant_antibiotic_inhibition) + "\n",
+                global_variables.LANGUAGE["both_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["both_bacteria_lymphocyte_inhibition"] + ": " +
+                str(self.lymphocyte_inhibition) + "\n",
+                global_variables.LANGUAGE["both_bacteria_label"].strip() + ", " +
+                global_variables.LANGUAGE["both_bacteria_density_death"] + ": " +
+                str(self.host_death_density) + "\n",
+                global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
+                global_variables.LANGUAGE["immune_system_initial_density"] + ": " +
+                str(self.initial_precursor_cell_density) + "\n",
+                global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
+                global_variables.LANGUAGE["immune_system_proliferation_rate"] + ": " +
+                str(self.immune_cell_proliferation_rate) + "\n",
+                global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
+                global_variables.LANGUAGE["immune_system_half_maximum_growth"] + ": " +
+                str(self.immune_cell_half_maximum_growth) + "\n",
+                global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
+                global_variables.LANGUAGE["immune_system_effector_decay_rate"] + ": " +
+                str(self.effector_decay_rate) + "\n",
+                global_variables.LANGUAGE["immune_system_label"].strip() + ", " +
+                global_variables.LANGUAGE["immune_system_memory_conversion"] + ": " +
+                str(self.memory_cell_conversion_rate) + "\n",
+                global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
+                global_variables.LANGUAGE["antibiotic_mean_concentration"] + ": " +
+                str(self.antibiotic_mean_concentration) + "\n",
+                global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
+                global_variables.LANGUAGE["toggle_classic"] + ", " +
+                global_variables.LANGUAGE["treatment_classic_delay"] + ": " + str(self.classic_delay) + "\n",
+                global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
+                global_variables.LANGUAGE["toggle_classic"] + ", " +
+                global_variables.LANGUAGE["treatment_classic_duration"] + ": " + str(self.classic_duration) + "\n",
+                global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
+                global_variables.LANGUAGE["toggle_adaptive"] + ", " +
+                global_variables.LANGUAGE["treatment_adaptive_symptoms"] + ": " +
+                str(self.adaptive_symptoms_at_bacteria_density) + "\n",
+                global_variables.LANGUAGE["antibiotic_label"].strip() + ", " +
+                global_variables.LANGUAGE["toggle_user"] + ", " +
+                global_variables.LANGUAGE["treatment_user_administer"] + ": " + str(self.user_administer)
+            ])
 
         elif self.current_scenario == "scenario_2":
             if self.current_microbiome == "gut_enterotype_1":
-                # saves screenshot of graph
-                graphs_box_id.export_to_png(os.path.join(directory, "scenario_2_gut_enterotype_1_screenshot_" +
-                                                         current_datetime + ".png"))
+                # saves screenshot of graph (only the pixels are captured here, the PNG is encoded by the save worker)
+                self.save_worker.put(write_png, os.path.join(directory, "scenario_2_gut_enterotype_1_screenshot_" +
+                                                             current_datetime + ".png"),
+                                     *capture(graphs_box_id))
 
                 # save csv file with x-axis and y-axis values for each plot
-                with open(os.path.join(directory, "scenario_2_gut_enterotype_1_plot_points_" + current_datetime +
-                                                  ".csv"), "wb") as csv_file:
-                    csv_writer = csv.writer(csv_file)
-
-                    # csv header
-                    csv_writer.writerow(["Time", "Bacteroides Density", "Faecalibacterium Density",
-                                         "Roseburia Density", "Bifidobacterium Density",
-                                         "Lachnospiraceae Density", "Parabacteroides Density", "Alistipes Density",
-                                         "Anaerostipes Density", "Acidaminococcus Density", "Collinsella Density"])
-
-                    # csv rows
-                    # ignores first value as it exists only to allow plot instantiation (first y value must not be zero)
-                    for i in xrange(len(self.bacteria_plots_ent_1["bacteroides"].points[1:])):
-                        # gets time from bacteroides plot and y values for each plot
-                        csv_writer.writerow([self.bacteria_plots_ent_1["bacteroides"].points[i + 1][0],  # x value, time
-                                             self.bacteria_plots_ent_1["bacteroides"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["faecalibacterium"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["roseburia"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["bifidobacterium"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["lachnospiraceae"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["parabacteroides"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["alistipes"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["anaerostipes"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["acidaminococcus"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_1["collinsella"].points[i + 1][1],  # y value
-                                             ])
-
-                # save options used
-                with open(os.path.join(directory, "scenario_2_gut_enterotype_1_options_used_" + current_datetime +
-                                                  ".txt"), "wb") as options_used_file:
-
-                    antibiotic_concentration_options = ""
-                    go_for_antibiotics = True  # allows for antibiotic_concentration_options to be filled just once
-                    for bacteria in sorted(self.bacteria_plots_ent_1):
-                        for antibiotic in sorted(self.antibiotic_plots_ent_1):
-                            options_used_file.writelines([
-                                global_variables.LANGUAGE[bacteria] + ", " +
-                                global_variables.LANGUAGE[antibiotic] + " inhibition: " +
-                                str(getattr(self, bacteria + "_antibiotic_inhibition_ent_1")[antibiotic]) + "\n"
-                            ])
+                # (recorded while the simulation runs, the recording is only moved or copied)
+                self.recorder_ent_1.save(os.path.join(directory, "scenario_2_gut_enterotype_1_plot_points_" +
+                                                      current_datetime + ".csv"))
 
-                            if go_for_antibiotics:
-                                antibiotic_concentration_options +=\
-                                    global_variables.LANGUAGE[antibiotic] + " concentration: " +\
-                                    str(self.antibiotic_concentrations_ent_1[antibiotic]) + "\n"
+                # save binary columnar file with bacteria densities and antibiotic concentrations, and the parameters
+                # used, for analysis (written from snapshots, as the simulation may go on while the file is written)
+                self.save_worker.put(write_columns, os.path.join(directory, "scenario_2_gut_enterotype_1_plot_points_" +
+                                                                 current_datetime + ".npy"),
+                                     self.trajectory_ent_1.snapshot(),
+                                     **run_metadata(self.simulation_parameters.get("gut_enterotype_1")))
 
-                        go_for_antibiotics = False
-
-                    options_used_file.writelines([antibiotic_concentration_options])
-
-                # popup warning message
-                popup_warning_id.show_message(*popup_warning_title_and_message)
+                # save options used
+                options_used = []
+                antibiotic_concentration_options = ""
+                go_for_antibiotics = True  # allows for antibiotic_concentration_options to be filled just once
+                for bacteria in sorted(ENTEROTYPE_GENERA["gut_enterotype_1"]):
+                    for antibiotic in sorted(ANTIBIOTICS):
+                        options_used.append(
+                            global_variables.LANGUAGE[bacteria] + ", " +
+                            global_variables.LANGUAGE[antibiotic] + " inhibition: " +
+                            str(getattr(self, bacteria + "_antibiotic_inhibition_ent_1")[antibiotic]) + "\n")
+
+                        if go_for_antibiotics:
+                            antibiotic_concentration_options +=\
+                                global_variables.LANGUAGE[antibiotic] + " concentration: " +\
+                                str(self.antibiotic_concentrations_ent_1[antibiotic]) + "\n"
+
+                    go_for_antibiotics = False
+
+                options_used.append(antibiotic_concentration_options)
+                self.save_worker.put(write_lines, os.path.join(directory, "scenario_2_gut_enterotype_1_options_used_" +
+                                                               current_datetime + ".txt"), options_used)
 
             elif self.current_microbiome == "gut_enterotype_2":
-                # saves screenshot of graph
-                graphs_box_id.export_to_png(os.path.join(directory, "scenario_2_gut_enterotype_2_screenshot_" +
-                                                         current_datetime + ".png"))
+                # saves screenshot of graph (only the pixels are captured here, the PNG is encoded by the save worker)
+                self.save_worker.put(write_png, os.path.join(directory, "scenario_2_gut_enterotype_2_screenshot_" +
+                                                             current_datetime + ".png"),
+                                     *capture(graphs_box_id))
 
                 # save csv file with x-axis and y-axis values for each plot
-                with open(os.path.join(directory, "scenario_2_gut_enterotype_2_plot_points_" + current_datetime +
-                                                  ".csv"), "wb") as csv_file:
-                    csv_writer = csv.writer(csv_file)
-
-                    # csv header
-                    csv_writer.writerow(["Time", "Prevotella Density", "Bacteroides Density",
-                                         "Faecalibacterium Density", "Lachnospiraceae Density",
-                                         "Roseburia Density", "Collinsella Density", "Bifidobacterium Density",
-                                         "Alistipes Density", "Streptococcus Density", "Coprococcus Density"])
-
-                    # csv rows
-                    # ignores first value as it exists only to allow plot instantiation (first y value must not be zero)
-                    for i in xrange(len(self.bacteria_plots_ent_2["prevotella"].points[1:])):
-                        # gets time from prevotella plot and y values for each plot
-                        csv_writer.writerow([self.bacteria_plots_ent_2["prevotella"].points[i + 1][0],  # x value, time
-                                             self.bacteria_plots_ent_2["prevotella"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["bacteroides"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["faecalibacterium"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["lachnospiraceae"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["roseburia"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["collinsella"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["bifidobacterium"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["alistipes"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["streptococcus"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_2["coprococcus"].points[i + 1][1],  # y value
-                                             ])
+                # (recorded while the simulation runs, the recording is only moved or copied)
+                self.recorder_ent_2.save(os.path.join(directory, "scenario_2_gut_enterotype_2_plot_points_" +
+                                                      current_datetime + ".csv"))
+
+                # save binary columnar file with bacteria densities and antibiotic concentrations, and the parameters
+                # used, for analysis (written from snapshots, as the simulation may go on while the file is written)
+                self.save_worker.put(write_columns, os.path.join(directory, "scenario_2_gut_enterotype_2_plot_points_" +
+                                                                 current_datetime + ".npy"),
+                                     self.trajectory_ent_2.snapshot(),
+                                     **run_metadata(self.simulation_parameters.get("gut_enterotype_2")))
 
                 # save options used
-                with open(os.path.join(directory, "scenario_2_gut_enterotype_2_options_used_" + current_datetime +
-                                                  ".txt"), "wb") as options_used_file:
+                options_used = []
+                antibiotic_concentration_options = ""
+                go_for_antibiotics = True  # allows for antibiotic_concentration_options to be filled just once
+                for bacteria in sorted(ENTEROTYPE_GENERA["gut_enterotype_2"]):
+                    for antibiotic in sorted(ANTIBIOTICS):
+                        options_used.append(
+                            global_variables.LANGUAGE[bacteria] + ", " +
+                            global_variables.LANGUAGE[antibiotic] + " inhibition: " +
+                            str(getattr(self, bacteria + "_antibiotic_inhibition_ent_2")[antibiotic]) + "\n")
+
+                        if go_for_antibiotics:
+                            antibiotic_concentration_options += \
+                                global_variables.LANGUAGE[antibiotic] + " concentration: " + \
+                                str(self.antibiotic_concentrations_ent_2[antibiotic]) + "\n"
+
+                    go_for_antibiotics = False
+
+                options_used.append(antibiotic_concentration_options)
+                self.save_worker.put(write_lines, os.path.join(directory, "scenario_2_gut_enterotype_2_options_used_" +
+                                                               current_datetime + ".txt"), options_used)
 
-                    antibiotic_concentration_options = ""
-                    go_for_antibiotics = True  # allows for antibiotic_concentration_options to be filled just once
-                    for bacteria in sorted(self.bacteria_plots_ent_2):
-                        for antibiotic in sorted(self.antibiotic_plots_ent_2):
-                            options_used_file.writelines([
-                                global_variables.LANGUAGE[bacteria] + ", " +
-                                global_variables.LANGUAGE[antibiotic] + " inhibition: " +
-                                str(getattr(self, bacteria + "_antibiotic_inhibition_ent_2")[antibiotic]) + "\n"
-                            ])
+            elif self.current_microbiome == "gut_enterotype_3":
+                # saves screenshot of graph (only the pixels are captured here, the PNG is encoded by the save worker)
+                self.save_worker.put(write_png, os.path.join(directory, "scenario_2_gut_enterotype_3_screenshot_" +
+                                                             current_datetime + ".png"),
+                                     *capture(graphs_box_id))
 
-                            if go_for_antibiotics:
-                                antibiotic_concentration_options += \
-                                    global_variables.LANGUAGE[antibiotic] + " concentration: " + \
-                                    str(self.antibiotic_concentrations_ent_2[antibiotic]) + "\n"
+                # save csv file with x-axis and y-axis values for each plot
+                # (recorded while the simulation runs, the recording is only moved or copied)
+                self.recorder_ent_3.save(os.path.join(directory, "scenario_2_gut_enterotype_3_plot_points_" +
+                                                      current_datetime + ".csv"))
 
-                        go_for_antibiotics = False
+                # save binary columnar file with bacteria densities and antibiotic concentrations, and the parameters
+                # used, for analysis (written from snapshots, as the simulation may go on while the file is written)
+                self.save_worker.put(write_columns, os.path.join(directory, "scenario_2_gut_enterotype_3_plot_points_" +
+                                                                 current_datetime + ".npy"),
+                                     self.trajectory_ent_3.snapshot(),
+                                     **run_metadata(self.simulation_parameters.get("gut_enterotype_3")))
 
-                    options_used_file.writelines([antibiotic_concentration_options])
+                # save options used
+                options_used = []
+                antibiotic_concentration_options = ""
+                go_for_antibiotics = True  # allows for antibiotic_concentration_options to be filled just once
+                for bacteria in sorted(ENTEROTYPE_GENERA["gut_enterotype_3"]):
+                    for antibiotic in sorted(ANTIBIOTICS):
+                        options_used.append(
+                            global_variables.LANGUAGE[bacteria] + ", " +
+                            global_variables.LANGUAGE[antibiotic] + " inhibition: " +
+                            str(getattr(self, bacteria + "_antibiotic_inhibition_ent_3")[antibiotic]) + "\n")
+
+                        if go_for_antibiotics:
+                            antibiotic_concentration_options += \
+                                global_variables.LANGUAGE[antibiotic] + " concentration: " + \
+                                str(self.antibiotic_concentrations_ent_3[antibiotic]) + "\n"
+
+                    go_for_antibiotics = False
+
+                options_used.append(antibiotic_concentration_options)
+                self.save_worker.put(write_lines, os.path.join(directory, "scenario_2_gut_enterotype_3_options_used_" +
+                                                               current_datetime + ".txt"), options_used)
 
-                # popup warning message
-                popup_warning_id.show_message(*popup_warning_title_and_message)
+            else:
+                # no microbiome selected, nothing to save
+                return
 
-            elif self.current_microbiome == "gut_enterotype_3":
-                # saves screenshot of graph
-                graphs_box_id.export_to_png(os.path.join(directory, "scenario_2_gut_enterotype_3_screenshot_" +
-                                                         current_datetime + ".png"))
+        else:
+            # nothing to save
+            return
+
+        # popup warning message, showing the progress of the save worker until every file is written (see
+        # save_progress())
+        self.saving_popup = (popup_warning_id,) + tuple(popup_warning_title_and_message)
+        done, queued = self.save_worker.progress()
+        if done < queued:
+            popup_warning_id.show_progress(global_variables.LANGUAGE["popup_saving_progress_title"],
+                                           global_variables.LANGUAGE["popup_saving_progress_message"].format(done,
+                                                                                                              queued))
+
+    @mainthread
+    def save_progress(self, done, queued, error):
+        """
+        Updates the popup warning message of the save in progress, after each file is written (called by the save
+        worker thread, runs in the UI thread)
 
-                # save csv file with x-axis and y-axis values for each plot
-                with open(os.path.join(directory, "scenario_2_gut_enterotype_3_plot_points_" + current_datetime +
-                                                  ".csv"), "wb") as csv_file:
-                    csv_writer = csv.writer(csv_file)
-
-                    # csv header
-                    csv_writer.writerow(["Time", "Bacteroides Density", "Bifidobacterium Density",
-                                         "Faecalibacterium Density", "Lachnospiraceae Density",
-                                         "Alistipes Density", "Akkermansia Density", "Ruminococcus Density",
-                                         "Collinsella Density", "Blautia Density", "Roseburia Density"])
-
-                    # csv rows
-                    # ignores first value as it exists only to allow plot instantiation (first y value must not be zero)
-                    for i in xrange(len(self.bacteria_plots_ent_3["bacteroides"].points[1:])):
-                        # gets time from bacteroides plot and y values for each plot
-                        csv_writer.writerow([self.bacteria_plots_ent_3["bacteroides"].points[i + 1][0],  # x value, time
-                                             self.bacteria_plots_ent_3["bacteroides"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["bifidobacterium"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["faecalibacterium"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["lachnospiraceae"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["alistipes"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["akkermansia"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["ruminococcus"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["collinsella"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["blautia"].points[i + 1][1],  # y value
-                                             self.bacteria_plots_ent_3["roseburia"].points[i + 1][1],  # y value
-                                             ])
+        PARAMETERS:
+            done : int
+                Files written
+            queued : int
+                Files to write
+            error : Exception or None
+                Error writing the last file
+        """
+        if self.saving_popup is None:
+            # files of previous simulation runs removed, no save in progress
+            return
+        if error is not None:
+            self.saving_errors.append(str(error) or type(error).__name__)
+
+        popup_warning_id, title, message = self.saving_popup
+        if done < queued:
+            popup_warning_id.show_progress(global_variables.LANGUAGE["popup_saving_progress_title"],
+                                           global_variables.LANGUAGE["popup_saving_progress_message"].format(done,
+                                                                                                              queued))
+            return
+
+        if self.saving_errors:
+            popup_warning_id.show_message(global_variables.LANGUAGE["popup_saving_error_title"],
+                                          "\n".join(self.saving_errors))
+        else:
+            popup_warning_id.show_message(title, message)
+        self.saving_popup = None
+        self.saving_errors = []
 
-                # save options used
-                with open(os.path.join(directory, "scenario_2_gut_enterotype_3_options_used_" + current_datetime +
-                                                  ".txt"), "wb") as options_used_file:
+    def scenario_1_parameters(self):
+        """
+        Gets the current scenario 1 options as simulation engine parameters
 
-                    antibiotic_concentration_options = ""
-                    go_for_antibiotics = True  # allows for antibiotic_concentration_options to be filled just once
-                    for bacteria in sorted(self.bacteria_plots_ent_3):
-                        for antibiotic in sorted(self.antibiotic_plots_ent_3):
-                            options_used_file.writelines([
-                                global_variables.LANGUAGE[bacteria] + ", " +
-                                global_variables.LANGUAGE[antibiotic] + " inhibition: " +
-                                str(getattr(self, bacteria + "_antibiotic_inhibition_ent_3")[antibiotic]) + "\n"
-                            ])
+        RETURNS: Scenario1Parameters
+            Scenario 1 parameters
+        """
+        parameters = dict((field, getattr(self, field)) for field in Scenario1Parameters.FIELDS if field != "time_step")
+        return Scenario1Parameters(time_step=self.simulation_speed, **parameters)
 
-                            if go_for_antibiotics:
-                                antibiotic_concentration_options += \
-                                    global_variables.LANGUAGE[antibiotic] + " concentration: " + \
-                                    str(self.antibiotic_concentrations_ent_3[antibiotic]) + "\n"
+    def scenario_2_parameters(self, enterotype):
+        """
+        Gets the current options of a scenario 2 enterotype as simulation engine parameters
+        Antibiotic concentration and uptake dicts are shared with the app, so changes made while the simulation is
+        running are seen by the engine
 
-                        go_for_antibiotics = False
+        PARAMETERS:
+            enterotype : str
+                "gut_enterotype_1", "gut_enterotype_2" or "gut_enterotype_3"
 
-                    options_used_file.writelines([antibiotic_concentration_options])
+        RETURNS: Scenario2Parameters
+            Enterotype parameters
+        """
+        enterotype_number = enterotype[-1]
+        antibiotic_inhibition = dict(
+            (bacteria, getattr(self, bacteria + "_antibiotic_inhibition_ent_" + enterotype_number))
+            for bacteria in ENTEROTYPE_GENERA[enterotype])
 
-                # popup warning message
-                popup_warning_id.show_message(*popup_warning_title_and_message)
+        return Scenario2Parameters.enterotype(
+            enterotype, antibiotic_inhibition,
+            antibiotic_concentrations=getattr(self, "antibiotic_concentrations_ent_" + enterotype_number),
+            antibiotic_uptakes=getattr(self, "antibiotic_uptake_ent_" + enterotype_number),
+            time_step=self.simulation_speed)
 
     def data_generator(self):
         """
-        Generates time (x-axis) and data (y-axis) points for each variable/graph
+        Generates time (x-axis) and data (y-axis) points for each variable/graph, using the simulation engine
+
+        RETURNS: generator or SimulationWorker
+            scenario_1_generator() or scenario_2_generator(), depending on the current scenario, or a started
+            SimulationWorker if simulation_in_background is True
         """
         if self.current_scenario == "scenario_1":
-            # initial values
-            current_time_point = 0.0
-            sensitive_density = self.sensitive_initial_density
-            resistant_density = self.resistant_initial_density
-            precursor_density = self.initial_precursor_cell_density
-            effector_density = 0.0
-            memory_cells_density = 0.0
-
-            while True:
-                # initial values are yielded at first
-                yield (current_time_point, sensitive_density, resistant_density, precursor_density, effector_density,
-                       memory_cells_density)
-
-                antibiotic_uptake_args = {}
-                if self.treatment_type == "Classic":
-                    # time is added in calculate_next_time_step()
-                    antibiotic_uptake_args = {"delay": self.classic_delay, "duration": self.classic_duration}
-                elif self.treatment_type == "Adaptive":
-                    # total_bacteria_density is added in calculate_next_time_step()
-                    antibiotic_uptake_args = {
-                        "bacteria_density_causing_symptoms": self.adaptive_symptoms_at_bacteria_density}
-                elif self.treatment_type == "User":
-                    antibiotic_uptake_args = {"taking_antibiotic": self.user_administer}
-
-                (current_time_point, sensitive_density, resistant_density, precursor_density, effector_density,
-                 memory_cells_density) = calculate_next_time_step(current_time_point, sensitive_density,
-                                                                  resistant_density, precursor_density,
-                                                                  effector_density, memory_cells_density,
-                                                                  self.immune_cell_proliferation_rate,
-                                                                  self.lymphocyte_inhibition,
-                                                                  self.memory_cell_conversion_rate,
-                                                                  self.effector_decay_rate,
-                                                                  self.antibiotic_mean_concentration,
-                                                                  self.immune_cell_half_maximum_growth,
-                                                                  self.treatment_type, antibiotic_uptake_args,
-                                                                  (self.sensitive_growth_rate,
-                                                                   self.sensitive_antibiotic_inhibition),
-                                                                  (self.resistant_growth_rate,
-                                                                   self.resistant_antibiotic_inhibition),
-                                                                  self.simulation_speed)
+            parameters = self.scenario_1_parameters()
+            self.simulation_parameters["scenario_1"] = parameters
+            if self.simulation_in_background:
+                worker = SimulationWorker(SCENARIO_1, parameters)
+                worker.start()
+                return worker
+            return scenario_1_generator(parameters)
 
         elif self.current_scenario == "scenario_2":
-            if self.current_microbiome == "gut_enterotype_1":
-                current_time_point = 0.0
-
-                bacteria_densities = dict(self.bacteria_densities_ent_1)
-                bacteria_densities_relative_frequency = {}
-
-                nutrient_concentrations = {}
-                for bacteria in bacteria_densities:
-                    # bacterias, at initial density, are stable at this value, Qω/ψ-ω
-                    nutrient_concentrations[bacteria] = (5 * 0.01) / (3.3 - 0.01)
-
-                bacteria_antibiotic_inhibition = {"bacteroides": self.bacteroides_antibiotic_inhibition_ent_1,
-                                                  "faecalibacterium": self.faecalibacterium_antibiotic_inhibition_ent_1,
-                                                  "roseburia": self.roseburia_antibiotic_inhibition_ent_1,
-                                                  "bifidobacterium": self.bifidobacterium_antibiotic_inhibition_ent_1,
-                                                  "lachnospiraceae": self.lachnospiraceae_antibiotic_inhibition_ent_1,
-                                                  "parabacteroides": self.parabacteroides_antibiotic_inhibition_ent_1,
-                                                  "alistipes": self.alistipes_antibiotic_inhibition_ent_1,
-                                                  "anaerostipes": self.anaerostipes_antibiotic_inhibition_ent_1,
-                                                  "acidaminococcus": self.acidaminococcus_antibiotic_inhibition_ent_1,
-                                                  "collinsella": self.collinsella_antibiotic_inhibition_ent_1}
-
-                while True:
-                    # relative frequency total density
-                    total_density = 1.0  # (instead of 0.0) allows a single survivor bacteria genus to die
-                    for bacteria, density in bacteria_densities.iteritems():
-                        # if bacteria is dead set its value to 0.0000000001
-                        if self.bacteria_dead_status_ent_1[bacteria]:
-                            bacteria_densities[bacteria] = 0.0000000001
-                        else:  # count towards total_density
-                            total_density += density
-
-                    # individual bacteria relative frequency
-                    for bacteria, density in bacteria_densities.iteritems():
-                        if self.bacteria_dead_status_ent_1[bacteria]:
-                            bacteria_densities_relative_frequency[bacteria] = 0.0000000001
-                        else:
-                            bacteria_densities_relative_frequency[bacteria] = density/total_density
-
-                    # initial values are yielded at first
-                    yield [current_time_point, bacteria_densities_relative_frequency["bacteroides"],
-                           bacteria_densities_relative_frequency["faecalibacterium"],
-                           bacteria_densities_relative_frequency["roseburia"],
-                           bacteria_densities_relative_frequency["bifidobacterium"],
-                           bacteria_densities_relative_frequency["lachnospiraceae"],
-                           bacteria_densities_relative_frequency["parabacteroides"],
-                           bacteria_densities_relative_frequency["alistipes"],
-                           bacteria_densities_relative_frequency["anaerostipes"],
-                           bacteria_densities_relative_frequency["acidaminococcus"],
-                           bacteria_densities_relative_frequency["collinsella"]]
-
-                    current_time_point, bacteria_densities, nutrient_concentrations = \
-                        calculate_next_time_step_scenario2(
-                            current_time_point, bacteria_densities, self.bacteria_growth_rate,
-                            bacteria_antibiotic_inhibition, self.antibiotic_concentrations_ent_1,
-                            self.antibiotic_uptake_ent_1, nutrient_concentrations, 0.01,
-                            self.bacteria_nutrient_consumption_ent_1, 5, self.simulation_speed)
+            parameters = self.scenario_2_parameters(self.current_microbiome)
+            self.simulation_parameters[self.current_microbiome] = parameters
+            if self.simulation_in_background:
+                worker = SimulationWorker(SCENARIO_2, parameters)
+                worker.start()
+                return worker
+            return scenario_2_generator(parameters)
 
-            elif self.current_microbiome == "gut_enterotype_2":
-                current_time_point = 0.0
-
-                bacteria_densities = dict(self.bacteria_densities_ent_2)
-                bacteria_densities_relative_frequency = {}
-
-                nutrient_concentrations = {}
-                for bacteria in bacteria_densities:
-                    # bacterias, at initial density, are stable at this value, Qω/ψ-ω
-                    nutrient_concentrations[bacteria] = (5 * 0.01) / (3.3 - 0.01)
-
-                bacteria_antibiotic_inhibition = {"prevotella": self.prevotella_antibiotic_inhibition_ent_2,
-                                                  "bacteroides": self.bacteroides_antibiotic_inhibition_ent_2,
-                                                  "faecalibacterium": self.faecalibacterium_antibiotic_inhibition_ent_2,
-                                                  "lachnospiraceae": self.lachnospiraceae_antibiotic_inhibition_ent_2,
-                                                  "roseburia": self.roseburia_antibiotic_inhibition_ent_2,
-                                                  "collinsella": self.collinsella_antibiotic_inhibition_ent_2,
-                                                  "bifidobacterium": self.bifidobacterium_antibiotic_inhibition_ent_2,
-                                                  "alistipes": self.alistipes_antibiotic_inhibition_ent_2,
-                                                  "streptococcus": self.streptococcus_antibiotic_inhibition_ent_2,
-                                                  "coprococcus": self.coprococcus_antibiotic_inhibition_ent_2}
-
-                while True:
-                    # relative frequency total density
-                    total_density = 1.0  # (instead of 0.0) allows a single survivor bacteria genus to die
-                    for bacteria, density in bacteria_densities.iteritems():
-                        # if bacteria is dead set its value to 0.0000000001
-                        if self.bacteria_dead_status_ent_2[bacteria]:
-                            bacteria_densities[bacteria] = 0.0000000001
-                        else:  # count towards total_density
-                            total_density += density
-
-                    # individual bacteria relative frequency
-                    for bacteria, density in bacteria_densities.iteritems():
-                        if self.bacteria_dead_status_ent_2[bacteria]:
-                            bacteria_densities_relative_frequency[bacteria] = 0.0000000001
-                        else:
-                            bacteria_densities_relative_frequency[bacteria] = density / total_density
-
-                    # initial values are yielded at first
-                    yield [current_time_point, bacteria_densities_relative_frequency["prevotella"],
-                           bacteria_densities_relative_frequency["bacteroides"],
-                           bacteria_densities_relative_frequency["faecalibacterium"],
-                           bacteria_densities_relative_frequency["lachnospiraceae"],
-                           bacteria_densities_relative_frequency["roseburia"],
-                           bacteria_densities_relative_frequency["collinsella"],
-                           bacteria_densities_relative_frequency["bifidobacterium"],
-                           bacteria_densities_relative_frequency["alistipes"],
-                           bacteria_densities_relative_frequency["streptococcus"],
-                           bacteria_densities_relative_frequency["coprococcus"]]
-
-                    current_time_point, bacteria_densities, nutrient_concentrations = \
-                        calculate_next_time_step_scenario2(
-                            current_time_point, bacteria_densities, self.bacteria_growth_rate,
-                            bacteria_antibiotic_inhibition, self.antibiotic_concentrations_ent_2,
-                            self.antibiotic_uptake_ent_2, nutrient_concentrations, 0.01,
-                            self.bacteria_nutrient_consumption_ent_2, 5, self.simulation_speed)
+    @staticmethod
+    def control_data_generator(data_generator_instance, command):
+        """
+        Pauses, resumes or stops a simulation running in a separate process (generators need nothing, they only run
+        while their clock is scheduled)
 
-            elif self.current_microbiome == "gut_enterotype_3":
-                current_time_point = 0.0
-
-                bacteria_densities = dict(self.bacteria_densities_ent_3)
-                bacteria_densities_relative_frequency = {}
-
-                nutrient_concentrations = {}
-                for bacteria in bacteria_densities:
-                    # bacterias, at initial density, are stable at this value, Qω/ψ-ω
-                    nutrient_concentrations[bacteria] = (5 * 0.01) / (3.3 - 0.01)
-
-                bacteria_antibiotic_inhibition = {"bacteroides": self.bacteroides_antibiotic_inhibition_ent_3,
-                                                  "bifidobacterium": self.bifidobacterium_antibiotic_inhibition_ent_3,
-                                                  "faecalibacterium": self.faecalibacterium_antibiotic_inhibition_ent_3,
-                                                  "lachnospiraceae": self.lachnospiraceae_antibiotic_inhibition_ent_3,
-                                                  "alistipes": self.alistipes_antibiotic_inhibition_ent_3,
-                                                  "akkermansia": self.akkermansia_antibiotic_inhibition_ent_3,
-                                                  "ruminococcus": self.ruminococcus_antibiotic_inhibition_ent_3,
-                                                  "collinsella": self.collinsella_antibiotic_inhibition_ent_3,
-                                                  "blautia": self.blautia_antibiotic_inhibition_ent_3,
-                                                  "roseburia": self.roseburia_antibiotic_inhibition_ent_3}
-
-                while True:
-                    # relative frequency total density
-                    total_density = 1.0  # (instead of 0.0) allows a single survivor bacteria genus to die
-                    for bacteria, density in bacteria_densities.iteritems():
-                        # if bacteria is dead set its value to 0.0000000001
-                        if self.bacteria_dead_status_ent_3[bacteria]:
-                            bacteria_densities[bacteria] = 0.0000000001
-                        else:  # count towards total_density
-                            total_density += density
-
-                    # individual bacteria relative frequency
-                    for bacteria, density in bacteria_densities.iteritems():
-                        if self.bacteria_dead_status_ent_3[bacteria]:
-                            bacteria_densities_relative_frequency[bacteria] = 0.0000000001
-                        else:
-                            bacteria_densities_relative_frequency[bacteria] = density / total_density
-
-                    # initial values are yielded at first
-                    yield [current_time_point, bacteria_densities_relative_frequency["bacteroides"],
-                           bacteria_densities_relative_frequency["bifidobacterium"],
-                           bacteria_densities_relative_frequency["faecalibacterium"],
-                           bacteria_densities_relative_frequency["lachnospiraceae"],
-                           bacteria_densities_relative_frequency["alistipes"],
-                           bacteria_densities_relative_frequency["akkermansia"],
-                           bacteria_densities_relative_frequency["ruminococcus"],
-                           bacteria_densities_relative_frequency["collinsella"],
-                           bacteria_densities_relative_frequency["blautia"],
-                           bacteria_densities_relative_frequency["roseburia"]]
-
-                    current_time_point, bacteria_densities, nutrient_concentrations = \
-                        calculate_next_time_step_scenario2(
-                            current_time_point, bacteria_densities, self.bacteria_growth_rate,
-                            bacteria_antibiotic_inhibition, self.antibiotic_concentrations_ent_3,
-                            self.antibiotic_uptake_ent_3, nutrient_concentrations, 0.01,
-                            self.bacteria_nutrient_consumption_ent_3, 5, self.simulation_speed)
-
-    def add_points(self, data_yielder, sensitive_bacteria_plot, resistant_bacteria_plot, antibiotic_plot, immune_plot,
-                   total_bacteria_plot):
+        PARAMETERS:
+            data_generator_instance : generator or SimulationWorker
+                Generator or worker returned by data_generator()
+            command : str
+                "pause", "resume" or "stop"
+        """
+        if isinstance(data_generator_instance, SimulationWorker):
+            getattr(data_generator_instance, command)()
+
+    def add_points(self, data_yielder, trajectory):
         """
         Add points to scenario 1 plots
 
         PARAMETERS:
-            data_yielder : generator
-                Generator data_generator()
-            sensitive_bacteria_plot : Plot
-                Plot object
-            resistant_bacteria_plot : Plot
-                Plot object
-            antibiotic_plot : Plot
-                Plot object
-            immune_plot : Plot
-                Plot object
-            total_bacteria_plot : Plot
-                Plot object
+            data_yielder : generator or SimulationWorker
+                Generator or worker returned by data_generator()
+            trajectory : Trajectory
+                Scenario 1 trajectory, whose columns are plotted
             
         RETURNS: lambda function
         """
-        def add_points_function(_self, _data_yielder, _sensitive_bacteria_plot, _resistant_bacteria_plot,
-                                _antibiotic_plot, _immune_plot, _total_bacteria_plot):
-            data = _data_yielder.next()
+        def end_function(_self, outcome):
+            # cancel clock
+            _self.clock_add_points.cancel()
 
-            time = data[0]
+            # complete csv file of the run
+            _self.recorder_scenario_1.close()
 
-            # avoids zero division errors
-            sensitive_bacteria_density = data[1] if data[1] > 0 else 0.0001
-            resistant_bacteria_density = data[2] if data[2] > 0 else 0.0001
-            immune_cells_density = data[3] + data[4] + data[5] if data[3] + data[4] + data[5] > 0 else 0.0001
-            antibiotic_concentration = _self.antibiotic_mean_concentration
-
-            # if both bacteria are dead or host death threshold is reached, stop generating values
-            if (not (sensitive_bacteria_density < 1 and resistant_bacteria_density < 1)) and (
-                            sensitive_bacteria_density + resistant_bacteria_density < _self.host_death_density):
-                _sensitive_bacteria_plot.points.append((time, sensitive_bacteria_density))
-                _resistant_bacteria_plot.points.append((time, resistant_bacteria_density))
-                _immune_plot.points.append((time, immune_cells_density))
-                _total_bacteria_plot.points.append((time, sensitive_bacteria_density + resistant_bacteria_density))
-
-                # treatment type logic
-                if _self.treatment_type == "Classic":
-                    if _self.classic_delay < time < _self.classic_delay + _self.classic_duration:
-                        _antibiotic_plot.points.append((time, antibiotic_concentration))
-                    else:
-                        _antibiotic_plot.points.append((time, 0))
-                elif _self.treatment_type == "Adaptive":
-                    if _self.adaptive_symptoms_at_bacteria_density <\
-                                    sensitive_bacteria_density + resistant_bacteria_density:
-                        _antibiotic_plot.points.append((time, antibiotic_concentration))
-                    else:
-                        _antibiotic_plot.points.append((time, 0))
-                elif _self.treatment_type == "User":
-                    if _self.user_administer:
-                        _antibiotic_plot.points.append((time, antibiotic_concentration))
-                    else:
-                        _antibiotic_plot.points.append((time, 0))
+            # checks whether host death or bacteria death
+            if outcome == HOST_DEATH:
+                title = "popup_host_death_title"
+                message = "popup_host_death_message"
             else:
-                # cancel clock
-                _self.clock_add_points.cancel()
+                title = "popup_bacteria_death_title"
+                message = "popup_bacteria_death_message"
 
-                # checks whether host death or bacteria death
-                if sensitive_bacteria_density + resistant_bacteria_density >= _self.host_death_density:
-                    title = "popup_host_death_title"
-                    message = "popup_host_death_message"
-                else:
-                    title = "popup_bacteria_death_title"
-                    message = "popup_bacteria_death_message"
+            # show popup message
+            _self.root.ids.popup_warning.show_message(global_variables.LANGUAGE[title],
+                                                      global_variables.LANGUAGE[message])
 
-                # show popup message
-                _self.root.ids.popup_warning.show_message(global_variables.LANGUAGE[title],
-                                                          global_variables.LANGUAGE[message])
+        def step_function(_self, _data_yielder, _trajectory):
+            time, values, outcome = scenario_1_row(_self.simulation_parameters["scenario_1"], _data_yielder.next())
 
-        return lambda _: add_points_function(self, data_yielder, sensitive_bacteria_plot, resistant_bacteria_plot,
-                                             antibiotic_plot, immune_plot, total_bacteria_plot)
+            # if both bacteria are dead or host death threshold is reached, stop generating values
+            if outcome is None:
+                # plots are notified once per frame, by add_points_function()
+                _trajectory.append(time, values, notify=False)
+                return True
+            else:
+                end_function(_self, outcome)
+                return False
 
-    def add_points_scenario2(self, data_yielder, bacteria_plot_dict, antibiotic_plot_dict):
+        def add_points_function(_self, _data_yielder, _trajectory, _scheduler, frame_time):
+            # as many steps as the simulation rate asks for, within the frame budget
+            time_step = _self.simulation_parameters["scenario_1"].time_step
+            if isinstance(_data_yielder, SimulationWorker):
+                # steps are run by the worker process, rows are only read here
+                count, outcome = _data_yielder.drain(_trajectory, _scheduler.steps(frame_time, time_step,
+                                                                                   _self.simulation_rate))
+                _scheduler.consume(count)
+                if outcome is not None:
+                    end_function(_self, outcome)
+            elif _scheduler.run(lambda: step_function(_self, _data_yielder, _trajectory), frame_time, time_step,
+                                _self.simulation_rate):
+                _trajectory.notify()
+
+        scheduler = StepScheduler()
+        return lambda dt: add_points_function(self, data_yielder, trajectory, scheduler, dt)
+
+    def add_points_scenario2(self, data_yielder, trajectory):
         """
         Add points to scenario 2 plots 
 
         PARAMETERS:
-            data_yielder : generator
-                Generator data_generator()
-            bacteria_plot_dict : dict[Plot]
-                Dictionary associating bacteria with its Plot object, {"bacteria1: Plot, ...}
-            antibiotic_plot_dict : dict[Plot]
-                Dictionary associating antibiotic with its Plot object, {"antibiotic1: Plot, ...}
+            data_yielder : generator or SimulationWorker
+                Generator or worker returned by data_generator()
+            trajectory : Trajectory
+                Enterotype trajectory, whose columns (genera, then antibiotics) are plotted
 
         RETURNS: lambda function
         """
-        def add_points_scenario2_function(_self, _data_yielder, _bacteria_plot_dict, _antibiotic_plot_dict):
-            data = _data_yielder.next()
-
-            time = data[0]
+        def end_function(_self, _microbiome):
+            # cancel clock
+            getattr(_self, "clock_add_points_gut_" + _microbiome[-1]).cancel()
 
-            # assumes 0.0001 of relative frequency as bacteria death
-            data[1] = data[1] if data[1] > 0.0001 else 0.0000000001
-            data[2] = data[2] if data[2] > 0.0001 else 0.0000000001
-            data[3] = data[3] if data[3] > 0.0001 else 0.0000000001
-            data[4] = data[4] if data[4] > 0.0001 else 0.0000000001
-            data[5] = data[5] if data[5] > 0.0001 else 0.0000000001
-            data[6] = data[6] if data[6] > 0.0001 else 0.0000000001
-            data[7] = data[7] if data[7] > 0.0001 else 0.0000000001
-            data[8] = data[8] if data[8] > 0.0001 else 0.0000000001
-            data[9] = data[9] if data[9] > 0.0001 else 0.0000000001
-            data[10] = data[10] if data[10] > 0.0001 else 0.0000000001
+            # complete csv file of the run
+            getattr(_self, "recorder_ent_" + _microbiome[-1]).close()
 
-            # check if bacteria are all dead
-            all_bacteria_dead = False
-            if sum(data[1:]) <= 0.000000001:
-                all_bacteria_dead = True
+            # show popup message
+            _self.root.ids.popup_warning.show_message(global_variables.LANGUAGE["popup_bacteria_death_title"],
+                                                      global_variables.LANGUAGE["popup_bacteria_death_message"])
 
+        def step_function(_self, _microbiome, _data_yielder, _trajectory):
             # this always happens if current_scenario == "scenario_2"
-            if _self.current_microbiome == "gut_enterotype_1":
-                bacteria_densities = {"bacteroides": data[1], "faecalibacterium": data[2],
-                                      "roseburia": data[3], "bifidobacterium": data[4],
-                                      "lachnospiraceae": data[5], "parabacteroides": data[6],
-                                      "alistipes": data[7], "anaerostipes": data[8],
-                                      "acidaminococcus": data[9], "collinsella": data[10]}
-                for bacteria, density in bacteria_densities.iteritems():
-                    # marks bacteria death
-                    if density <= 0.0001:
-                        _self.bacteria_dead_status_ent_1[bacteria] = True
-
-                    # append bacteria plot points
-                    _bacteria_plot_dict[bacteria].points.append((time, density))
-
-                # append antibiotic plot points
-                for antibiotic, uptake_value in _self.antibiotic_uptake_ent_1.iteritems():
-                    if bool(uptake_value):
-                        _antibiotic_plot_dict[antibiotic].points.append(
-                            (time, _self.antibiotic_concentrations_ent_1[antibiotic]))
-                    else:
-                        _antibiotic_plot_dict[antibiotic].points.append((time, 0))
-
-                # if all bacteria are dead, stop generating values
-                if all_bacteria_dead:
-                    # cancel clock
-                    _self.clock_add_points_gut_1.cancel()
-
-                    # show popup message
-                    _self.root.ids.popup_warning.show_message(global_variables.LANGUAGE["popup_bacteria_death_title"],
-                                                              global_variables.LANGUAGE["popup_bacteria_death_message"])
-
-            elif _self.current_microbiome == "gut_enterotype_2":
-                bacteria_densities = {"prevotella": data[1], "bacteroides": data[2],
-                                      "faecalibacterium": data[3], "lachnospiraceae": data[4],
-                                      "roseburia": data[5], "collinsella": data[6],
-                                      "bifidobacterium": data[7], "alistipes": data[8],
-                                      "streptococcus": data[9], "coprococcus": data[10]}
-                for bacteria, density in bacteria_densities.iteritems():
-                    # marks bacteria death
-                    if density <= 0.0001:
-                        _self.bacteria_dead_status_ent_2[bacteria] = True
-
-                    # append bacteria plot points
-                    _bacteria_plot_dict[bacteria].points.append((time, density))
-
-                # append antibiotic plot points
-                for antibiotic, uptake_value in _self.antibiotic_uptake_ent_2.iteritems():
-                    if bool(uptake_value):
-                        _antibiotic_plot_dict[antibiotic].points.append(
-                            (time, _self.antibiotic_concentrations_ent_2[antibiotic]))
-                    else:
-                        _antibiotic_plot_dict[antibiotic].points.append((time, 0))
-
-                # if all bacteria are dead, stop generating values
-                if all_bacteria_dead:
-                    # cancel clock
-                    _self.clock_add_points_gut_2.cancel()
-
-                    # show popup message
-                    _self.root.ids.popup_warning.show_message(global_variables.LANGUAGE["popup_bacteria_death_title"],
-                                                              global_variables.LANGUAGE["popup_bacteria_death_message"])
-
-            else:  # _self.current_microbiome == "gut_enterotype_3":
-                bacteria_densities = {"bacteroides": data[1], "bifidobacterium": data[2],
-                                      "faecalibacterium": data[3], "lachnospiraceae": data[4],
-                                      "alistipes": data[5], "akkermansia": data[6],
-                                      "ruminococcus": data[7], "collinsella": data[8],
-                                      "blautia": data[9], "roseburia": data[10]}
-
-                for bacteria, density in bacteria_densities.iteritems():
-                    # marks bacteria death
-                    if density <= 0.0001:
-                        _self.bacteria_dead_status_ent_3[bacteria] = True
-
-                    # append bacteria plot points
-                    _bacteria_plot_dict[bacteria].points.append((time, density))
-
-                # append antibiotic plot points
-                for antibiotic, uptake_value in _self.antibiotic_uptake_ent_3.iteritems():
-                    if bool(uptake_value):
-                        _antibiotic_plot_dict[antibiotic].points.append(
-                            (time, _self.antibiotic_concentrations_ent_3[antibiotic]))
-                    else:
-                        _antibiotic_plot_dict[antibiotic].points.append((time, 0))
+            # bacteria densities and antibiotic concentrations, in the order of the trajectory series
+            # (bacteria death, at 0.0001 of relative frequency, is already accounted for by the engine)
+            time, values, outcome = scenario_2_row(_self.simulation_parameters[_microbiome], _data_yielder.next())
 
-                # if all bacteria are dead, stop generating values
-                if all_bacteria_dead:
-                    # cancel clock
-                    _self.clock_add_points_gut_3.cancel()
+            # plots are notified once per frame, by add_points_scenario2_function()
+            _trajectory.append(time, values, notify=False)
 
-                    # show popup message
-                    _self.root.ids.popup_warning.show_message(global_variables.LANGUAGE["popup_bacteria_death_title"],
-                                                              global_variables.LANGUAGE["popup_bacteria_death_message"])
-
-        return lambda _: add_points_scenario2_function(self, data_yielder, bacteria_plot_dict, antibiotic_plot_dict)
+            # if all bacteria are dead, stop generating values
+            if outcome is not None:
+                end_function(_self, _microbiome)
+                return False
+            return True
+
+        def add_points_scenario2_function(_self, _data_yielder, _trajectory, _scheduler, frame_time):
+            # as many steps as the simulation rate asks for, within the frame budget
+            microbiome = _self.current_microbiome
+            time_step = _self.simulation_parameters[microbiome].time_step
+            if isinstance(_data_yielder, SimulationWorker):
+                # steps are run by the worker process, rows are only read here
+                count, outcome = _data_yielder.drain(_trajectory, _scheduler.steps(frame_time, time_step,
+                                                                                   _self.simulation_rate))
+                _scheduler.consume(count)
+                if outcome is not None:
+                    end_function(_self, microbiome)
+            elif _scheduler.run(lambda: step_function(_self, microbiome, _data_yielder, _trajectory), frame_time,
+                                time_step, _self.simulation_rate):
+                _trajectory.notify()
+
+        scheduler = StepScheduler()
+        return lambda dt: add_points_scenario2_function(self, data_yielder, trajectory, scheduler, dt)
 
     def enable_disable(self, what):
         """
@@ -2102,13 +1644,62 @@ class SimulATeApp(App):
         self.adaptive_symptoms_at_bacteria_density = (self.adaptive_symptoms_at_bacteria_density_value *
                                                       self.adaptive_symptoms_at_bacteria_density_exponent)
 
+    def on_simulation_speed(self, *args):
+        """
+        Sets the time step of every simulation
+        """
+        for parameters in self.simulation_parameters.itervalues():
+            parameters.time_step = self.simulation_speed
+
+    def on_user_administer(self, *args):
+        """
+        Sets user treatment antibiotic administration of the scenario 1 simulation
+        """
+        if "scenario_1" in self.simulation_parameters:
+            self.simulation_parameters["scenario_1"].user_administer = self.user_administer
+
     def on_pause(self, *args):
         """
         Needed to override so that the default behaviour was inhibited
         """
         pass
 
+    def on_stop(self, *args):
+        """
+        Stops simulations running in a separate process, waits for files being saved to be written, and removes the
+        recordings that were not saved
+        """
+        for data_generator_instance in (self.data_generator_instance, self.data_generator_instance_gut_1,
+                                        self.data_generator_instance_gut_2, self.data_generator_instance_gut_3):
+            self.control_data_generator(data_generator_instance, "stop")
+        self.save_worker.join()
+        for recorder in (self.recorder_scenario_1, self.recorder_ent_1, self.recorder_ent_2, self.recorder_ent_3):
+            recorder.release()
+        remove_recordings()
+
     def build(self):
+        self.save_worker.set_progress(self.save_progress)
+
+        # plots are views of the trajectories (bacteria and antibiotic plots are created with their graphs)
+        trajectory_plots(self.trajectory_scenario_1, {"immune_system": self.immune_system_plot})
+        global_variables.BACTERIA_ASSORTMENT.set_trajectory(self.trajectory_scenario_1,
+                                                            {"Total": "total_bacteria",
+                                                             "Sensitive": "sensitive_bacteria",
+                                                             "Resistant": "resistant_bacteria"})
+        global_variables.ANTIBIOTIC_ASSORTMENT.set_trajectory(self.trajectory_scenario_1,
+                                                              {"Generic Antibiotic": "antibiotic"})
+        for trajectory, bacteria_assortment, antibiotic_assortment, enterotype in (
+                (self.trajectory_ent_1, global_variables.BACTERIA_ASSORTMENT_GUT1,
+                 global_variables.ANTIBIOTIC_ASSORTMENT_GUT1, "gut_enterotype_1"),
+                (self.trajectory_ent_2, global_variables.BACTERIA_ASSORTMENT_GUT2,
+                 global_variables.ANTIBIOTIC_ASSORTMENT_GUT2, "gut_enterotype_2"),
+                (self.trajectory_ent_3, global_variables.BACTERIA_ASSORTMENT_GUT3,
+                 global_variables.ANTIBIOTIC_ASSORTMENT_GUT3, "gut_enterotype_3")):
+            bacteria_assortment.set_trajectory(trajectory, dict((genus.capitalize(), genus)
+                                                                for genus in ENTEROTYPE_GENERA[enterotype]))
+            antibiotic_assortment.set_trajectory(trajectory, dict((antibiotic.capitalize(), antibiotic)
+                                                                  for antibiotic in ANTIBIOTICS))
+
         self.icon = os.path.join("bin", "ui", "icon.ico")
         self.title = "Simulator of Antibiotic Therapy Effects on the Dynamics of Bacterial Populations"
         return Builder.load_file(os.path.join('bin', 'ui', 'main_layout.kv'))
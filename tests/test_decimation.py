@@ -0,0 +1,81 @@
+#!python2
+# coding: utf-8
+
+"""
+DECIMATION TESTS
+Checks the min/max pixel column decimation of LinePlot
+
+DEPENDENCIES:
+    - Python 2.7
+    - Kivy 1.9.1
+"""
+
+import unittest
+from bin.deps.kivy_graph import LinePlot
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+class Decimator(object):
+    """
+    LinePlot decimation state and methods, without the plot graphics
+    """
+    _decimate = LinePlot.__dict__['_decimate']
+    _column_points = LinePlot.__dict__['_column_points']
+    _reset_columns = LinePlot.__dict__['_reset_columns']
+
+    def __init__(self):
+        self._reset_columns()
+
+    def vertices(self, flat):
+        """
+        Decimates flattened screen coordinates
+
+        PARAMETERS:
+            flat : list[float]
+                [x0, y0, x1, y1, ...]
+
+        RETURNS: list[float]
+            Flattened vertices of every pixel column, the open one included
+        """
+        return self._decimate(flat) + self._column_points()
+
+
+class DecimationTest(unittest.TestCase):
+    def assert_vertex_pairs(self, vertices, points):
+        # even length, every vertex is one of the points and x values are in order
+        self.assertEqual(len(vertices) % 2, 0)
+        pairs = zip(vertices[0::2], vertices[1::2])
+        for pair in pairs:
+            self.assertIn(pair, points)
+        self.assertEqual([x for x, y in pairs], sorted(x for x, y in pairs))
+
+    def test_flat_line(self):
+        points = [(10.0 + i, 50.0) for i in range(5)]
+        flat = [value for point in points for value in point]
+        vertices = Decimator().vertices(flat)
+        self.assert_vertex_pairs(vertices, points)
+        self.assertEqual(vertices, flat)
+
+    def test_one_point_per_column(self):
+        points = [(10.5 + i, float(i % 3)) for i in range(20)]
+        flat = [value for point in points for value in point]
+        vertices = Decimator().vertices(flat)
+        self.assert_vertex_pairs(vertices, points)
+        self.assertEqual(vertices, flat)
+
+    def test_flat_columns(self):
+        points = [(10 + i / 4.0, 50.0) for i in range(20)]
+        vertices = Decimator().vertices([value for point in points for value in point])
+        self.assert_vertex_pairs(vertices, points)
+        self.assertEqual(len(vertices), 2 * 5)
+
+    def test_min_max_columns(self):
+        points = [(10 + i / 4.0, float((i * 7) % 5)) for i in range(40)]
+        vertices = Decimator().vertices([value for point in points for value in point])
+        self.assert_vertex_pairs(vertices, points)
+
+
+if __name__ == '__main__':
+    unittest.main()
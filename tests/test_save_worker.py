@@ -0,0 +1,48 @@
+#!python2
+# coding: utf-8
+
+"""
+SAVE WORKER TESTS
+Checks that the save worker keeps running queued functions after one of them fails
+
+DEPENDENCIES:
+    - Python 2.7
+"""
+
+import unittest
+from bin.classes.SaveWorker import SaveWorker
+
+__author__ = 'Pedro HC David, https://github.com/Kronopt'
+__credits__ = ['Pedro HC David']
+
+
+class SaveWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.worker = SaveWorker(lambda done, queued, error: self.events.append((done, queued, error)))
+
+    def test_failing_function_reported(self):
+        written = []
+        self.worker.put(lambda: 1 / 0)
+        self.worker.put(written.append, "file")
+        self.worker.join()
+
+        self.assertEqual(written, ["file"])
+        self.assertEqual([event[:2] for event in self.events], [(1, 2), (2, 2)])
+        self.assertIsInstance(self.events[0][2], ZeroDivisionError)
+        self.assertIsNone(self.events[1][2])
+        self.assertEqual(self.worker.progress(), (0, 0))
+
+    def test_later_saves_run(self):
+        written = []
+        self.worker.put(lambda: 1 / 0)
+        self.worker.join()
+        self.worker.put(written.append, "file")
+        self.worker.join()
+
+        self.assertEqual(written, ["file"])
+        self.assertIsNone(self.events[-1][2])
+
+
+if __name__ == "__main__":
+    unittest.main()